@@ -0,0 +1,170 @@
+"""Canvas announcement HTML-to-text benchmark.
+
+Converts a corpus of announcement bodies shaped like what the Canvas rich
+content editor produces (or the Canvas announcements stored in tick.db)
+with the lxml streaming converter and with the BeautifulSoup path it
+replaced, and reports the speedup::
+
+    python benchmarks/bench_html_text.py
+    python benchmarks/bench_html_text.py --db
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Callable, List
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ticked.core.database.ticked_db import CalendarDB  # noqa: E402
+from ticked.utils.html_text import html_to_text  # noqa: E402
+
+CORPUS = [
+    # Short reminder
+    """<p>Hi everyone,</p>
+<p>Just a reminder that <strong>Homework 3</strong> is due tonight at 11:59pm.
+Please submit it through <a href="https://canvas.example.edu/courses/1201/assignments/55102">the
+assignment page</a>.</p>
+<p>Best,<br>Prof. Rivera</p>""",
+    # Exam logistics with nested lists and styled spans
+    """<p><span style="font-size: 14pt;"><strong>Midterm Exam Logistics</strong></span></p>
+<p>&nbsp;</p>
+<p><span style="font-weight: 400;">The midterm will be held on <span style="text-decoration: underline;">Thursday, March 6</span> during lecture. Here is what you need to know:</span></p>
+<ul>
+<li style="font-weight: 400;"><span style="font-weight: 400;">Bring a calculator (no phones)</span></li>
+<li style="font-weight: 400;"><span style="font-weight: 400;">One double-sided page of notes is allowed</span></li>
+<li style="font-weight: 400;"><span style="font-weight: 400;">Topics covered:</span>
+<ol>
+<li>Chapters 1&ndash;5</li>
+<li>Lab 1 through Lab 4</li>
+<li>Lecture slides, see <a class="instructure_file_link instructure_scribd_file" title="slides.pdf" href="https://canvas.example.edu/courses/1201/files/889201?wrap=1" data-api-endpoint="https://canvas.example.edu/api/v1/courses/1201/files/889201" data-api-returntype="File">slides.pdf</a></li>
+</ol>
+</li>
+</ul>
+<p>Office hours this week are extended: <em>Tue 2&ndash;5pm</em> and <em>Wed 10&ndash;12</em> in ENG 210.</p>
+<p>&nbsp;</p>
+<p>Good luck!</p>""",
+    # Table of section changes and an embedded video
+    """<div class="content-box">
+<h2>Section changes</h2>
+<table style="border-collapse: collapse; width: 100%;" border="1">
+<tbody>
+<tr><th>Section</th><th>Old room</th><th>New room</th></tr>
+<tr><td>001</td><td>SCI 101</td><td>SCI 140</td></tr>
+<tr><td>002</td><td>SCI 102</td><td>LIB 020</td></tr>
+<tr><td>003</td><td>SCI 103</td><td>SCI 103</td></tr>
+</tbody>
+</table>
+<p>The recording of Monday's review session is below.</p>
+<p><iframe style="width: 400px; height: 225px;" title="Review" src="https://canvas.example.edu/media_objects_iframe/m-4abc?type=video" allowfullscreen="allowfullscreen"></iframe></p>
+<p>Questions? Post them in the <a href="https://canvas.example.edu/courses/1201/discussion_topics/77012">Q&amp;A discussion</a>.</p>
+</div>""",
+    # Long weekly update
+    "<p>Weekly update</p>"
+    + "".join(
+        f"""<h3>Week {week}</h3>
+<p><span style="font-family: arial, helvetica, sans-serif;">This week we cover topic {week}. Read
+<a href="https://canvas.example.edu/courses/1201/pages/week-{week}">the week {week} page</a> before
+Tuesday's lecture and complete the pre-lab quiz.</span></p>
+<ul><li>Reading: section {week}.1&ndash;{week}.4</li><li>Lab {week}: <strong>due Friday</strong></li>
+<li>Optional: practice set {week}</li></ul>"""
+        for week in range(1, 9)
+    ),
+    # Pasted from a word processor
+    """<p class="MsoNormal" style="margin-bottom: 0.0001pt; line-height: normal;"><span style="font-size: 12.0pt; font-family: 'Times New Roman',serif;">Dear students,<o:p></o:p></span></p>
+<p class="MsoNormal"><span style="font-size: 12.0pt;">Grades for Project 1 have been posted. The class average was 84%.
+If you believe there was a grading error, submit a regrade request within <b>one week</b> using
+<a href="https://forms.example.edu/regrade">this form</a>.<o:p></o:p></span></p>
+<p class="MsoNormal"><span style="font-size: 12.0pt;"><o:p>&nbsp;</o:p></span></p>
+<p class="MsoNormal"><span style="font-size: 12.0pt;">-- The course staff<o:p></o:p></span></p>""",
+]
+
+
+def legacy_clean_html(html_content: str) -> str:
+    """The BeautifulSoup conversion AnnouncementsList used before lxml."""
+    if not html_content:
+        return ""
+
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    for tag in soup.find_all(["br", "p", "div"]):
+        tag.replace_with("\n" + tag.get_text() + "\n")
+
+    text = soup.get_text()
+
+    text = re.sub(r"\n\s*\n", "\n\n", text)
+    text = re.sub(r"^\s+|\s+$", "", text)
+    return text
+
+
+def legacy_wrap_text(text: str, width: int = 80) -> str:
+    words = text.split()
+    lines = []
+    current_line = []
+    current_length = 0
+
+    for word in words:
+        if current_length + len(word) + 1 <= width:
+            current_line.append(word)
+            current_length += len(word) + 1
+        else:
+            if current_line:
+                lines.append(" ".join(current_line))
+            current_line = [word]
+            current_length = len(word)
+
+    if current_line:
+        lines.append(" ".join(current_line))
+
+    return "\n".join(lines)
+
+
+def legacy(html: str) -> str:
+    return legacy_wrap_text(legacy_clean_html(html), width=80)
+
+
+def run(label: str, convert: Callable[[str], str], corpus: List[str], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in corpus:
+            convert(html)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    size = sum(len(html) for html in corpus) / 1024 / 1024
+    print(
+        f"{label:<14} {best * 1000:8.1f} ms  {size / best:6.1f} MB/s  "
+        f"{len(corpus) / best:8.0f} announcements/s"
+    )
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--db",
+        nargs="?",
+        const="",
+        help="convert the Canvas announcements of a tick.db (default: the app's)",
+    )
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = CORPUS
+    if args.db is not None:
+        db = CalendarDB(args.db or None)
+        corpus = [a["message"] or "" for a in db.get_canvas_announcements(-1)]
+    corpus = corpus * args.copies
+
+    old = run("beautifulsoup", legacy, corpus, args.repeat)
+    new = run("lxml", html_to_text, corpus, args.repeat)
+    print(f"speedup        {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Find-in-files throughput benchmark.
+
+Builds a synthetic source tree (or searches an existing one) and reports
+search throughput in MB/s for the thread pool at a few sizes and for a
+process pool::
+
+    python benchmarks/bench_text_search.py
+    python benchmarks/bench_text_search.py --root ~/src/project --query TODO
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ticked.utils.text_search import compile_query, search_tree  # noqa: E402
+
+
+def build_tree(root: str, files: int, lines: int) -> None:
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(2000)
+    ]
+    for i in range(files):
+        directory = os.path.join(root, f"pkg{i % 50}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.py"), "w") as file:
+            for _ in range(lines):
+                file.write("    " + " ".join(rng.choices(words, k=8)) + "\n")
+            if i % 10 == 0:
+                file.write("    # TODO: needle in a haystack\n")
+        if i % 100 == 0:
+            with open(os.path.join(directory, f"blob{i}.bin"), "wb") as file:
+                file.write(b"\x00" * 65536)
+    with open(os.path.join(root, ".gitignore"), "w") as file:
+        file.write("build/\n")
+
+
+def run(label: str, root: str, query: str, regex: bool, repeat: int, **kwargs) -> None:
+    pattern = compile_query(query, regex=regex)
+    best = None
+    for _ in range(repeat):
+        stats = search_tree(root, pattern, lambda matches: None, **kwargs)
+        if best is None or stats.throughput > best.throughput:
+            best = stats
+    print(
+        f"{label:<16} {best.throughput:8.1f} MB/s  "
+        f"{best.files} files, {best.bytes / 1024 / 1024:.1f} MB, "
+        f"{best.matches} matches, {best.seconds * 1000:.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", help="search this tree instead of a synthetic one")
+    parser.add_argument("--query", default="needle")
+    parser.add_argument("--regex", action="store_true")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        root = args.root
+        if root is None:
+            root = temp
+            build_tree(root, args.files, args.lines)
+        query = (args.query, args.regex, args.repeat)
+        for workers in (1, 2, 4, 8):
+            run(f"threads={workers}", root, *query, workers=workers)
+        workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            run(f"processes={workers}", root, *query, workers=workers, executor=pool)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ticked.utils.async_spotify import AsyncSpotify, create_client, shared_session
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+
+    def playlist(self, playlist_id, fields=None):
+        self._record("playlist", playlist_id, fields)
+        return {"id": playlist_id}
+
+    def search(self, q, type="track", limit=10):
+        self._record("search", q)
+        raise ValueError("search failed")
+
+    def next_track(self):
+        self._record("next_track")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_reads_share_one_request():
+    client = FakeClient()
+    spotify = AsyncSpotify(client)
+    first, second, other = await asyncio.gather(
+        spotify.playlist("a"), spotify.playlist("a"), spotify.playlist("b")
+    )
+    assert first == second == {"id": "a"} and other == {"id": "b"}
+    assert sorted(call[1] for call in client.calls) == ["a", "b"]
+    assert all(name.startswith("spotify") for name in client.threads)
+
+    # Once answered, the next call goes to Spotify again
+    await spotify.playlist("a", fields="name")
+    await spotify.playlist("a")
+    assert len(client.calls) == 4
+
+    # Errors reach every waiter
+    results = await asyncio.gather(
+        spotify.search(q="x"), spotify.search(q="x"), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(client.calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_commands_are_never_coalesced():
+    client = FakeClient()
+    spotify = AsyncSpotify(client)
+    await asyncio.gather(spotify.next_track(), spotify.next_track())
+    assert client.calls == [("next_track",), ("next_track",)]
+
+
+def test_clients_share_one_session():
+    first, second = create_client("token-a"), create_client("token-b")
+    assert first._session is second._session is shared_session()
+    assert first._auth == "token-a"
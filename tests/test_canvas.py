@@ -0,0 +1,390 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from textual._context import active_app
+from textual.app import App, ComposeResult
+
+from ticked.ui.views import canvas
+from ticked.ui.views.canvas import (
+    AnnouncementItem,
+    AnnouncementsList,
+    CanvasAPI,
+    CanvasSettings,
+    CanvasView,
+)
+from ticked.core.database.ticked_db import CalendarDB
+from ticked.utils.canvas_cache import SyncState, conditional_headers
+
+
+class FakeCourse:
+    def __init__(self, n: int, tracker: "FakeCanvas") -> None:
+        self.id = n
+        self.name = f"Course {n}"
+        self.course_code = f"CS{n}-2501" if n % 4 else f"CS{n}-2409"
+        self.enrollment_term_id = 7 if n % 4 else 6
+        self.enrollments = [
+            {"computed_current_letter_grade": "A", "computed_current_score": 95}
+        ]
+        self._tracker = tracker
+
+    def get_assignments(self, **kwargs):
+        with self._tracker.request():
+            return [
+                SimpleNamespace(
+                    id=self.id * 10,
+                    name=f"Homework {self.id}",
+                    due_at="2999-01-0%dT12:00:00Z" % (self.id % 9 + 1),
+                    submission=None,
+                )
+            ]
+
+    def get_discussion_topics(self, **kwargs):
+        with self._tracker.request():
+            return [
+                SimpleNamespace(
+                    id=self.id * 100,
+                    title=f"News {self.id}",
+                    message="<p>hi</p>",
+                    # Newer for higher ids, all within the default window
+                    posted_at=(
+                        datetime.now(timezone.utc)
+                        - timedelta(hours=100 - self.id, minutes=30)
+                    ).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                )
+            ]
+
+
+class FakeCanvas:
+    def __init__(self, count: int) -> None:
+        self.course_pages = 0
+        self.course_kwargs = None
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._courses = [FakeCourse(n, self) for n in range(1, count + 1)]
+
+    def get_courses(self, **kwargs):
+        with self._lock:
+            self.course_pages += 1
+            self.course_kwargs = kwargs
+        time.sleep(0.02)
+        return iter(self._courses)
+
+    def request(self):
+        tracker = self
+
+        class _Request:
+            def __enter__(self):
+                with tracker._lock:
+                    tracker.in_flight += 1
+                    tracker.peak = max(tracker.peak, tracker.in_flight)
+                time.sleep(0.01)
+
+            def __exit__(self, *exc):
+                with tracker._lock:
+                    tracker.in_flight -= 1
+
+        return _Request()
+
+
+def _api(count: int, **settings) -> CanvasAPI:
+    api = CanvasAPI(CanvasSettings(**settings))
+    api.canvas = FakeCanvas(count)
+    return api
+
+
+def test_fetchers_share_one_course_enumeration():
+    api = _api(8, enrollment_term_id=7, per_page=20)
+    api.begin_refresh()
+    with ThreadPoolExecutor(3) as pool:
+        courses, todos, announcements = [
+            future.result()
+            for future in [
+                pool.submit(api.get_courses),
+                pool.submit(api.get_todo_assignments),
+                pool.submit(api.get_announcements),
+            ]
+        ]
+    assert api.canvas.course_pages == 1
+    assert api.canvas.course_kwargs["enrollment_state"] == "active"
+    assert api.canvas.course_kwargs["per_page"] == 20
+    # Courses outside the term are filtered out
+    assert len(courses) == len(todos) == len(announcements) == 6
+    # Ordering is left to tick.db
+    assert max(announcements, key=lambda a: a["posted_at"])["title"] == "News 7"
+    assert todos[0]["course_id"] == todos[0]["id"] // 10
+
+    # The next refresh enumerates courses again
+    api.begin_refresh()
+    api.get_courses()
+    assert api.canvas.course_pages == 2
+
+
+def test_per_course_requests_are_bounded(monkeypatch):
+    monkeypatch.setattr(canvas, "MAX_CONCURRENT_REQUESTS", 3)
+    api = _api(24, course_code="2501")
+    with ThreadPoolExecutor(2) as pool:
+        todos = pool.submit(api.get_todo_assignments)
+        announcements = pool.submit(api.get_announcements)
+        assert len(todos.result()) == len(announcements.result()) == 18
+    assert 1 < api.canvas.peak <= 3
+
+
+class FakeRequester:
+    """Answers 304 when the client's ETag matches the endpoint's version."""
+
+    def __init__(self) -> None:
+        self.versions = {}
+        self.calls = []
+
+    def request(self, method, endpoint, headers=None, _kwargs=None):
+        self.calls.append((endpoint, dict(_kwargs)))
+        etag = f'"{self.versions.get(endpoint, 1)}"'
+        if headers.get("If-None-Match") == etag:
+            return SimpleNamespace(status_code=304, headers={})
+        return SimpleNamespace(status_code=200, headers={"ETag": etag})
+
+
+def test_revalidate_uses_conditional_requests():
+    api = _api(0)
+    requester = api.requester = FakeRequester()
+
+    validators = api.revalidate("todos", {}, [1, 2])
+    assert validators == {
+        "courses/1/assignments": {"etag": '"1"', "last_modified": None},
+        "courses/2/assignments": {"etag": '"1"', "last_modified": None},
+    }
+    assert requester.calls[0][1]["per_page"] == 100
+    assert api.revalidate("todos", validators, [1, 2]) is None
+
+    requester.versions["courses/2/assignments"] = 2
+    changed = api.revalidate("todos", validators, [1, 2])
+    assert changed["courses/2/assignments"]["etag"] == '"2"'
+    # A new course is a change even if the others are unchanged
+    assert api.revalidate("todos", changed, [1, 2, 3]) is not None
+    # Without known courses a per-course resource can't be checked
+    assert api.revalidate("announcements", changed, None) == {}
+
+
+def test_sync_state_expires_by_resource():
+    fetched_at = datetime.now() - timedelta(minutes=30)
+    state = SyncState.from_row(
+        {"fetched_at": fetched_at.isoformat(), "validators": {}, "params": None}
+    )
+    assert state.is_fresh("courses")
+    assert not state.is_fresh("todos")
+    assert state.is_fresh("todos", now=fetched_at + timedelta(minutes=5))
+
+    settings = CanvasSettings(enrollment_term_id=7)._asdict()
+    assert not state.fetched_with(settings)
+    assert state._replace(params={**settings}).fetched_with(settings)
+    assert conditional_headers({"etag": '"1"', "last_modified": "Wed"}) == {
+        "If-None-Match": '"1"',
+        "If-Modified-Since": "Wed",
+    }
+
+
+@pytest.fixture
+def canvas_view(tmp_path):
+    """A CanvasView of an app with a tick.db of its own."""
+    app = App()
+    app.db = CalendarDB(str(tmp_path / "tick.db"))
+    token = active_app.set(app)
+    view = CanvasView()
+    object.__setattr__(view, "_app", app)
+    view.canvas_api = _api(0)
+    yield view
+    active_app.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_view_only_downloads_changed_resources(canvas_view):
+    view = canvas_view
+    db = view.app.db
+    requester = view.canvas_api.requester = FakeRequester()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return [{"id": 7, "name": "Course 7"}]
+
+    def refresh(force):
+        return view._refresh_resource("courses", fetch, db.save_canvas_courses, force)
+
+    assert await refresh(force=False)
+    assert db.get_canvas_courses()[0]["name"] == "Course 7"
+    # Within the TTL nothing is requested at all
+    requests = len(requester.calls)
+    assert not await refresh(force=False)
+    assert len(requester.calls) == requests
+    # A forced refresh asks the server, which says nothing changed
+    assert not await refresh(force=True)
+    assert len(requester.calls) == requests + 1 and len(fetches) == 1
+
+    requester.versions["courses"] = 2
+    assert await refresh(force=True)
+    assert len(fetches) == 2
+    assert view._cached_course_ids() == [7]
+
+    # Data fetched with other settings is downloaded again
+    view.canvas_api = _api(0, course_code="2501")
+    view.canvas_api.requester = requester
+    assert await refresh(force=False)
+    assert len(fetches) == 3
+
+
+class CanvasApp(App):
+    def __init__(self, db: CalendarDB) -> None:
+        super().__init__()
+        self.db = db
+
+    def compose(self) -> ComposeResult:
+        yield CanvasView()
+
+
+@pytest.mark.asyncio
+async def test_logging_in_loads_data_with_saved_settings(tmp_path, monkeypatch):
+    db = CalendarDB(str(tmp_path / "tick.db"))
+    db.save_canvas_settings({"course_code": "2501"})
+    fake = FakeCanvas(4)
+    fake.get_current_user = lambda: SimpleNamespace(name="Student")
+    monkeypatch.setattr(canvas, "Canvas", lambda url, token: fake)
+    monkeypatch.setattr(canvas, "Requester", lambda url, token: FakeRequester())
+    monkeypatch.setattr(canvas.CanvasLogin, "load_credentials", lambda self: ("", ""))
+
+    app = CanvasApp(db)
+    async with app.run_test(size=(120, 40)) as pilot:
+        view = app.query_one(CanvasView)
+        view.initialize_canvas("https://canvas.example.edu", "token")
+        for _ in range(100):
+            await pilot.pause(0.05)
+            if db.get_canvas_sync("announcements") is not None:
+                break
+
+        assert view.is_authenticated
+        assert view.canvas_api.settings.course_code == "2501"
+        assert not view.query(canvas.CanvasLogin)
+        # Course 4 is from another term, so the saved settings leave it out
+        names = sorted(course["name"].strip() for course in db.get_canvas_courses())
+        assert names == ["Course 1", "Course 2", "Course 3"]
+
+
+def _announcement(n: int) -> dict:
+    return {
+        "id": n,
+        "title": f"News {n}",
+        "message": f"<p>Body {n}</p>",
+        "posted_at": "2025-03-01T10:%02d:00Z" % (n % 60),
+        "course_name": "Course",
+    }
+
+
+class AnnouncementsApp(App):
+    def compose(self) -> ComposeResult:
+        yield AnnouncementsList()
+
+
+@pytest.mark.asyncio
+async def test_announcements_render_incrementally(monkeypatch):
+    cleaned = []
+    clean_html = AnnouncementsList.clean_html
+
+    def counting_clean_html(self, html_content):
+        cleaned.append(html_content)
+        return clean_html(self, html_content)
+
+    monkeypatch.setattr(AnnouncementsList, "clean_html", counting_clean_html)
+    app = AnnouncementsApp()
+    async with app.run_test(size=(80, 24)) as pilot:
+        announcements = app.query_one(AnnouncementsList)
+        older = [_announcement(n) for n in range(30, 5, -1)]
+        announcements.populate(older)
+        await pilot.pause()
+        items = list(announcements.query(AnnouncementItem))
+        assert len(items) == AnnouncementsList.PAGE_SIZE
+        assert len(cleaned) == AnnouncementsList.PAGE_SIZE
+
+        # Two new announcements are mounted above the ones already shown
+        announcements.populate([_announcement(32), _announcement(31)] + older)
+        await pilot.pause()
+        updated = list(announcements.query(AnnouncementItem))
+        assert [item.key[0] for item in updated[:3]] == [32, 31, 30]
+        assert updated[2:] == items
+        assert len(cleaned) == AnnouncementsList.PAGE_SIZE + 2
+
+        # Scrolling to the end renders the next page of older ones
+        announcements.scroll_end(animate=False)
+        await pilot.pause()
+        assert len(announcements.query(AnnouncementItem)) > len(updated)
+
+
+def test_assignment_tasks_use_local_deadlines(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        tasks = canvas.assignment_tasks(
+            [
+                {
+                    "id": 5,
+                    "name": "Essay",
+                    "course": "Writing",
+                    "due_at": "2025-03-04T04:59:00Z",
+                    "status": "Submitted",
+                },
+                # Cached before ids were kept
+                {"name": "Old", "due_at": "2025-03-04T04:59:00Z"},
+            ]
+        )
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+    assert tasks == [
+        {
+            "external_id": 5,
+            "title": "Essay",
+            "description": "Writing",
+            "due_date": "2025-03-03",
+            "start_time": "23:59",
+            "end_time": "23:59",
+            "completed": True,
+        }
+    ]
+
+
+def test_announcements_outside_the_window_are_skipped():
+    api = _api(8, announcement_days=4)
+    # Course n posted 100.5 - n hours ago; only the last 96 hours are kept
+    assert sorted(a["title"] for a in api.get_announcements()) == [
+        "News 5",
+        "News 6",
+        "News 7",
+        "News 8",
+    ]
+    assert CanvasSettings.from_dict({"per_page": 10, "unknown": 1}) == CanvasSettings(
+        per_page=10
+    )
+
+
+@pytest.mark.asyncio
+async def test_older_announcements_are_fetched_as_needed():
+    app = AnnouncementsApp()
+    async with app.run_test(size=(80, 24)) as pilot:
+        announcements = app.query_one(AnnouncementsList)
+        pages = []
+
+        def fetch_page(limit, offset):
+            pages.append((limit, offset))
+            return [_announcement(n) for n in range(60 - offset, 60 - offset - limit, -1)]
+
+        announcements.fetch_page = fetch_page
+        announcements.populate([_announcement(n) for n in range(60, 50, -1)])
+        await pilot.pause()
+        announcements.load_more()
+        await pilot.pause()
+        assert pages == [(AnnouncementsList.PAGE_SIZE, 10)]
+        assert announcements.shown == 20
+        assert list(announcements.query(AnnouncementItem))[-1].key[0] == 41
@@ -440,3 +440,179 @@ def test_first_launch(temp_db):
 
     temp_db.mark_first_launch_complete()
     assert temp_db.is_first_launch() is False
+
+
+def test_tree_ignore_patterns(temp_db):
+    assert temp_db.get_tree_ignore_patterns() is None
+    temp_db.save_tree_ignore_patterns(["node_modules/", "*.log"])
+    assert temp_db.get_tree_ignore_patterns() == ["node_modules/", "*.log"]
+
+
+def test_editor_session(temp_db):
+    assert temp_db.get_editor_session() == []
+
+    tab = {
+        "path": "/tmp/a.py",
+        "cursor_row": 3,
+        "cursor_column": 4,
+        "scroll_x": 0,
+        "scroll_y": 2,
+        "active": False,
+    }
+    temp_db.save_editor_session([tab, dict(tab, path="/tmp/b.py", active=True)])
+    session = temp_db.get_editor_session()
+    assert [entry["path"] for entry in session] == ["/tmp/a.py", "/tmp/b.py"]
+    assert session[0]["cursor_row"] == 3
+    assert [entry["active"] for entry in session] == [0, 1]
+
+    # Saving replaces the previous session
+    temp_db.save_editor_session([tab])
+    assert len(temp_db.get_editor_session()) == 1
+
+
+def test_upsert_external_tasks_is_incremental(temp_db):
+    tasks = [
+        {
+            "external_id": 101,
+            "title": "Homework 1",
+            "description": "Algorithms",
+            "due_date": "2025-03-01",
+            "start_time": "23:59",
+            "end_time": "23:59",
+        },
+        {
+            "external_id": 102,
+            "title": "Lab 1",
+            "due_date": "2025-03-02",
+            "start_time": "12:00",
+            "end_time": "12:00",
+            "completed": True,
+        },
+    ]
+    assert temp_db.upsert_external_tasks("canvas", tasks) == 2
+    # Unchanged tasks aren't written again
+    assert temp_db.upsert_external_tasks("canvas", tasks) == 0
+
+    [homework, lab] = temp_db.get_external_tasks("canvas")
+    assert (homework["external_id"], homework["source"]) == ("101", "canvas")
+    assert lab["completed"] == 1
+    temp_db.update_task(homework["id"], completed=True)
+
+    tasks[0] = dict(tasks[0], due_date="2025-03-05")
+    assert temp_db.upsert_external_tasks("canvas", tasks) == 1
+    homework = temp_db.get_tasks_for_date("2025-03-05")[0]
+    assert homework["id"] == lab["id"] - 1
+    assert homework["completed"] == 1  # completed locally
+    assert temp_db.get_tasks_for_date("2025-03-01") == []
+
+    # The same id from another source is a different task
+    assert temp_db.upsert_external_tasks("other", tasks[:1]) == 1
+    assert temp_db.upsert_external_tasks("canvas", []) == 0
+
+
+def test_migration_adds_external_task_columns(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "old.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                due_date TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                end_time TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed BOOLEAN DEFAULT 0,
+                in_progress BOOLEAN DEFAULT 0,
+                caldav_uid TEXT
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO tasks (title, due_date, start_time, end_time)"
+            " VALUES ('Old', '2025-01-01', '09:00', '10:00')"
+        )
+
+    db = CalendarDB(db_path)
+    assert db.get_tasks_for_date("2025-01-01")[0]["source"] is None
+    task = {
+        "external_id": "7",
+        "title": "New",
+        "due_date": "2025-01-01",
+        "start_time": "10:00",
+        "end_time": "10:00",
+    }
+    assert db.upsert_external_tasks("canvas", [task]) == 1
+    assert len(db.get_tasks_for_date("2025-01-01")) == 2
+
+
+def _canvas_announcement(n: int, course_id: int = 1) -> dict:
+    return {
+        "id": n,
+        "course_id": course_id,
+        "course_name": f"Course {course_id}",
+        "title": f"News {n}",
+        "message": "<p>hi</p>",
+        "posted_at": "2025-03-%02dT10:00:00Z" % n,
+    }
+
+
+def test_canvas_tables(temp_db):
+    assert temp_db.get_canvas_sync("courses") is None
+    validators = {"courses": {"etag": '"1"', "last_modified": None}}
+    temp_db.save_canvas_courses(
+        [{"id": 2, "name": "B"}, {"id": 1, "name": "A"}], validators, {"per_page": 50}
+    )
+    assert [c["name"] for c in temp_db.get_canvas_courses()] == ["B", "A"]
+    sync = temp_db.get_canvas_sync("courses")
+    assert sync["validators"] == validators and sync["params"] == {"per_page": 50}
+
+    assignment = {"course_id": 1, "course": "A", "status": "Not Started"}
+    temp_db.save_canvas_assignments(
+        [
+            {**assignment, "id": 11, "name": "Late", "due_at": "2025-03-09T10:00:00Z"},
+            {**assignment, "id": 10, "name": "Soon", "due_at": "2025-03-02T10:00:00Z"},
+            {**assignment, "id": 12, "name": "Dropped", "course_id": 3,
+             "due_at": "2025-03-03T10:00:00Z"},
+        ],
+        {},
+        due_after="2025-03-01T00:00:00Z",
+    )
+    # Sorted by deadline, only for current courses and not yet due
+    assert [
+        a["name"] for a in temp_db.get_canvas_assignments("2025-03-01T00:00:00Z")
+    ] == ["Soon", "Late"]
+    assert [
+        a["name"] for a in temp_db.get_canvas_assignments("2025-03-05T00:00:00Z")
+    ] == ["Late"]
+    # An assignment no longer returned by Canvas is removed
+    temp_db.save_canvas_assignments([], {}, due_after="2025-03-05T00:00:00Z")
+    assert [
+        a["name"] for a in temp_db.get_canvas_assignments("2025-03-01T00:00:00Z")
+    ] == ["Soon"]
+
+
+def test_canvas_announcements_keep_history(temp_db):
+    temp_db.save_canvas_courses([{"id": 1}], {})
+    temp_db.save_canvas_announcements(
+        [_canvas_announcement(n) for n in range(1, 21)],
+        {},
+        posted_since="2025-03-01T00:00:00Z",
+    )
+    # Later fetches only cover the recent window; older ones stay as history
+    temp_db.save_canvas_announcements(
+        [_canvas_announcement(n) for n in (25, 18)] + [_canvas_announcement(26, 2)],
+        {},
+        posted_since="2025-03-15T00:00:00Z",
+    )
+    newest = temp_db.get_canvas_announcements(3)
+    assert [a["id"] for a in newest] == [25, 18, 14]
+    assert [a["id"] for a in temp_db.get_canvas_announcements(3, offset=3)] == [
+        13,
+        12,
+        11,
+    ]
+    assert len(temp_db.get_canvas_announcements(100)) == 16
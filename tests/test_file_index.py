@@ -0,0 +1,130 @@
+import os
+
+from ticked.utils.file_index import FileIndex, FileMatcher
+
+
+def make_tree(root, paths):
+    for path in paths:
+        full = root / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_text("x")
+
+
+def test_index_lists_files_and_skips_hidden(tmp_path):
+    make_tree(
+        tmp_path / "project",
+        ["a.py", "src/app.py", "src/ui/view.py", ".git/config", "node_modules/x.js"],
+    )
+    index = FileIndex(tmp_path / "project", cache_path=tmp_path / "index.json")
+    assert index.update()
+    assert sorted(index.paths()) == ["a.py", "src/app.py", "src/ui/view.py"]
+    assert not index.update()
+
+
+def test_index_cache_and_incremental_update(tmp_path, monkeypatch):
+    root = tmp_path / "project"
+    make_tree(root, ["a.py", "src/app.py", "docs/readme.md"])
+    cache = tmp_path / "index.json"
+    index = FileIndex(root, cache_path=cache)
+    index.update()
+    index.save()
+
+    (root / "src" / "new.py").write_text("x")
+    # Force a visible mtime change even on coarse-grained filesystems
+    os.utime(root / "src", ns=(0, 1))
+
+    listed = []
+    original = FileIndex._list_directory
+
+    def spy(self, path, *args):
+        listed.append(os.path.relpath(path, root))
+        return original(self, path, *args)
+
+    monkeypatch.setattr(FileIndex, "_list_directory", spy)
+    cached = FileIndex(root, cache_path=cache)
+    assert cached.load()
+    assert cached.update()
+    assert listed == ["src"]
+    assert "src/new.py" in cached.paths()
+    assert not FileIndex(tmp_path / "other", cache_path=cache).load()
+
+
+def test_index_leaves_out_ignored_paths(tmp_path, monkeypatch):
+    root = tmp_path / "project"
+    make_tree(
+        root,
+        [
+            "a.py",
+            "a.pyc",
+            "src/app.py",
+            "src/gen/out.py",
+            ".venv/lib/site.py",
+            "build/bundle.js",
+            "docs/readme.md",
+        ],
+    )
+    (root / ".gitignore").write_text("build/\n")
+    (root / "src" / ".ignore").write_text("gen/\n")
+    cache = tmp_path / "index.json"
+    index = FileIndex(root, cache_path=cache, ignore_patterns=[".venv/", "*.pyc"])
+
+    walked = []
+    original = FileIndex._list_directory
+
+    def spy(self, path, *args):
+        walked.append(os.path.relpath(path, root))
+        return original(self, path, *args)
+
+    monkeypatch.setattr(FileIndex, "_list_directory", spy)
+    index.update()
+    index.save()
+    assert sorted(index.paths()) == ["a.py", "docs/readme.md", "src/app.py"]
+    # Ignored directories aren't walked at all
+    assert sorted(walked) == [".", "docs", "src"]
+
+    # Editing an ignore file re-lists the directories it covers
+    (root / ".gitignore").write_text("docs/\n")
+    os.utime(root / ".gitignore", ns=(0, 1))
+    cached = FileIndex(root, cache_path=cache, ignore_patterns=[".venv/", "*.pyc"])
+    assert cached.load()
+    assert cached.update()
+    assert sorted(cached.paths()) == [
+        "a.py",
+        "build/bundle.js",
+        "src/app.py",
+    ]
+
+    # A listing made with other patterns isn't reused
+    assert not FileIndex(root, cache_path=cache).load()
+
+
+def test_matcher_ranks_name_matches_first():
+    matcher = FileMatcher(
+        [
+            "ticked/ui/views/nest.py",
+            "ticked/nest_utils/helpers.py",
+            "tests/test_nest.py",
+            "docs/notes.txt",
+            "README.md",
+        ]
+    )
+    ranked = [path for _, path in matcher.rank("nest.py")]
+    assert set(ranked[:2]) == {"ticked/ui/views/nest.py", "tests/test_nest.py"}
+    assert matcher.rank("views/nest")[0][1] == "ticked/ui/views/nest.py"
+    assert "docs/notes.txt" not in ranked
+    assert [path for _, path in matcher.rank("nestpy")][0].endswith("nest.py")
+    assert matcher.rank("zzz") == []
+    assert len(matcher.rank("", limit=2)) == 2
+
+
+def test_matcher_caps_candidates_and_narrows():
+    paths = [f"pkg/module_{i}/file_{i}.py" for i in range(2000)]
+    matcher = FileMatcher(paths, max_candidates=100)
+    assert len(matcher.rank("f", limit=500)) == 100
+
+    matcher = FileMatcher(paths[:200])
+    first = matcher.rank("file_19", limit=500)
+    narrowed = matcher.rank("file_199", limit=500)
+    assert narrowed[0][1] == "pkg/module_199/file_199.py"
+    assert {path for _, path in narrowed} <= {path for _, path in first}
+    assert narrowed == FileMatcher(paths[:200]).rank("file_199", limit=500)
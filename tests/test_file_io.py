@@ -0,0 +1,72 @@
+import os
+import stat
+
+import pytest
+
+from ticked.utils.file_io import (
+    BINARY_FILE_MESSAGE,
+    NOT_UTF8_MESSAGE,
+    atomic_write_text,
+    read_text,
+    sniff_file,
+)
+
+
+def test_sniff_file(tmp_path):
+    text = tmp_path / "notes.md"
+    text.write_text("# héllo\n", encoding="utf-8")
+    png = tmp_path / "image.png"
+    png.write_bytes(b"\x89PNG\r\n\x1a\n")
+    latin = tmp_path / "latin.txt"
+    latin.write_bytes("café au lait".encode("latin-1"))
+
+    assert sniff_file(str(text)) is None
+    assert sniff_file(str(png)) == BINARY_FILE_MESSAGE
+    assert sniff_file(str(latin)) == NOT_UTF8_MESSAGE
+
+
+def test_read_text_reports_progress(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("é" * 1000 + "\r\nend", encoding="utf-8")
+    updates = []
+
+    content = read_text(
+        str(path), progress=lambda done, total: updates.append((done, total)), chunk_size=100
+    )
+
+    assert content == "é" * 1000 + "\nend"
+    assert len(updates) > 1
+    assert updates[-1] == (os.path.getsize(path), os.path.getsize(path))
+
+
+def test_read_text_cancelled(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("x" * 1000)
+    assert read_text(str(path), cancelled=lambda: True) is None
+
+
+def test_atomic_write_preserves_mode_and_symlinks(tmp_path):
+    target = tmp_path / "script.sh"
+    target.write_text("old")
+    os.chmod(target, 0o755)
+    link = tmp_path / "link.sh"
+    link.symlink_to(target)
+
+    size = atomic_write_text(str(link), "echo new\n")
+
+    assert size == len("echo new\n")
+    assert link.is_symlink()
+    assert target.read_text() == "echo new\n"
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o755
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".ticked-")]
+
+
+def test_atomic_write_keeps_original_on_failure(tmp_path):
+    target = tmp_path / "keep.txt"
+    target.write_text("original")
+
+    with pytest.raises(UnicodeEncodeError):
+        atomic_write_text(str(target), "\udcff")
+
+    assert target.read_text() == "original"
+    assert os.listdir(tmp_path) == ["keep.txt"]
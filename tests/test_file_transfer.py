@@ -0,0 +1,155 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from ticked.utils import file_transfer
+from ticked.utils.file_transfer import (
+    FileTransfer,
+    TransferCancelled,
+    copy_file_data,
+    unique_destination,
+)
+
+
+def _make_tree(root: Path) -> Path:
+    source = root / "project"
+    (source / "pkg" / "empty").mkdir(parents=True)
+    (source / "README").write_text("readme")
+    (source / "pkg" / "data.bin").write_bytes(os.urandom(300_000))
+    os.symlink("README", source / "link")
+    return source
+
+
+def _listing(root: Path) -> dict:
+    listing = {}
+    for path in sorted(root.rglob("*")):
+        relative = str(path.relative_to(root))
+        if path.is_symlink():
+            listing[relative] = ("link", os.readlink(path))
+        elif path.is_dir():
+            listing[relative] = ("dir", None)
+        else:
+            listing[relative] = ("file", path.read_bytes())
+    return listing
+
+
+def test_copy_file_data_falls_back_to_reads(tmp_path: Path, monkeypatch):
+    source = tmp_path / "source"
+    source.write_bytes(os.urandom(100_000))
+
+    def unsupported(source_fd, dest_fd, count):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(file_transfer, "_kernel_copy_methods", lambda: [unsupported])
+    chunks = []
+    copied = copy_file_data(
+        str(source), str(tmp_path / "copy"), chunks.append, chunk_size=4096
+    )
+    assert copied == sum(chunks) == 100_000
+    assert (tmp_path / "copy").read_bytes() == source.read_bytes()
+
+
+def test_copy_tree_reports_progress(tmp_path: Path):
+    source = _make_tree(tmp_path)
+    updates = []
+    transfer = FileTransfer(
+        str(source), str(tmp_path / "copy"), progress=updates.append
+    )
+    assert transfer.run() == str(tmp_path / "copy")
+
+    assert _listing(tmp_path / "copy") == _listing(source)
+    last = updates[-1]
+    assert (last.files_done, last.files_total) == (3, 3)
+    assert last.bytes_done == last.bytes_total
+    assert last.percent == 100
+    # Nothing staged is left next to the copy
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["copy", "project"]
+
+
+def test_move_renames_and_replaces(tmp_path: Path):
+    source = tmp_path / "a.txt"
+    source.write_text("new")
+    destination = tmp_path / "sub" / "a.txt"
+    destination.parent.mkdir()
+    destination.write_text("old")
+
+    with pytest.raises(FileExistsError):
+        FileTransfer(str(source), str(destination), move=True).run()
+    FileTransfer(str(source), str(destination), move=True, replace=True).run()
+    assert not source.exists()
+    assert destination.read_text() == "new"
+    assert os.listdir(destination.parent) == ["a.txt"]
+
+
+def test_move_across_filesystems_copies_then_removes(tmp_path: Path, monkeypatch):
+    source = _make_tree(tmp_path)
+    expected = _listing(source)
+    rename = os.rename
+
+    def cross_device(src, dst):
+        if os.path.abspath(src) == str(source):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        rename(src, dst)
+
+    monkeypatch.setattr(file_transfer.os, "rename", cross_device)
+    FileTransfer(str(source), str(tmp_path / "moved"), move=True).run()
+    assert not source.exists()
+    assert _listing(tmp_path / "moved") == expected
+
+
+def test_move_across_filesystems_reports_a_source_it_cannot_remove(
+    tmp_path: Path, monkeypatch
+):
+    source = _make_tree(tmp_path)
+    expected = _listing(source)
+    rename = os.rename
+
+    def cross_device(src, dst):
+        if os.path.abspath(src) == str(source):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        rename(src, dst)
+
+    def read_only(path):
+        raise PermissionError(errno.EACCES, "Permission denied", path)
+
+    monkeypatch.setattr(file_transfer.os, "rename", cross_device)
+    monkeypatch.setattr(file_transfer.shutil, "rmtree", read_only)
+    transfer = FileTransfer(str(source), str(tmp_path / "moved"), move=True)
+    assert transfer.run() == str(tmp_path / "moved")
+    assert isinstance(transfer.removal_error, PermissionError)
+    assert _listing(source) == _listing(tmp_path / "moved") == expected
+
+
+def test_cancel_leaves_no_partial_copy(tmp_path: Path):
+    source = _make_tree(tmp_path)
+
+    def cancel_after_first_file(progress):
+        if progress.files_done:
+            transfer.cancel()
+
+    transfer = FileTransfer(
+        str(source), str(tmp_path / "copy"), progress=cancel_after_first_file
+    )
+    with pytest.raises(TransferCancelled):
+        transfer.run()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["project"]
+
+
+def test_refuses_folder_into_itself(tmp_path: Path):
+    source = _make_tree(tmp_path)
+    with pytest.raises(ValueError):
+        FileTransfer(str(source), str(source / "pkg" / "project")).run()
+
+
+def test_unique_destination(tmp_path: Path):
+    (tmp_path / "notes.txt").write_text("")
+    assert unique_destination(str(tmp_path / "notes.txt")) == str(
+        tmp_path / "notes copy.txt"
+    )
+    (tmp_path / "notes copy.txt").write_text("")
+    assert unique_destination(str(tmp_path / "notes.txt")) == str(
+        tmp_path / "notes copy 2.txt"
+    )
+    assert unique_destination(str(tmp_path / ".env")) == str(tmp_path / ".env copy")
@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from ticked.utils.fs_watch import InotifyWatcher, PollingWatcher
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self.event = threading.Event()
+
+    def __call__(self, paths):
+        self.batches.append(paths)
+        self.event.set()
+
+
+def run_burst(watcher, recorder, directory):
+    watcher.watch(directory)
+    watcher.start()
+    try:
+        os.mkdir(os.path.join(directory, "sub"))
+        for i in range(20):
+            open(os.path.join(directory, f"file{i}.txt"), "w").close()
+        os.rename(
+            os.path.join(directory, "file0.txt"), os.path.join(directory, "renamed.txt")
+        )
+        assert recorder.event.wait(timeout=5)
+    finally:
+        watcher.stop()
+
+
+def test_polling_watcher_debounces_burst(tmp_path):
+    recorder = Recorder()
+    watcher = PollingWatcher(recorder, interval=0.05, debounce=0.2)
+    run_burst(watcher, recorder, str(tmp_path))
+    assert recorder.batches[0] == {str(tmp_path)}
+
+
+def test_polling_watcher_reports_parent_of_deleted_directory(tmp_path):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    recorder = Recorder()
+    watcher = PollingWatcher(recorder, interval=0.05, debounce=0.05)
+    watcher.watch(str(sub))
+    watcher.start()
+    try:
+        sub.rmdir()
+        assert recorder.event.wait(timeout=5)
+    finally:
+        watcher.stop()
+    assert str(tmp_path) in recorder.batches[0]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_debounces_burst(tmp_path):
+    recorder = Recorder()
+    watcher = InotifyWatcher(recorder, debounce=0.2)
+    run_burst(watcher, recorder, str(tmp_path))
+    assert recorder.batches == [{str(tmp_path)}]
@@ -0,0 +1,73 @@
+from ticked.utils.fuzzy import (
+    CandidateTable,
+    compute_bonuses,
+    fuzzy_match,
+    fuzzy_score,
+    perfect_score,
+)
+
+
+def test_fuzzy_match():
+    assert fuzzy_match("gcf", "get_config_file")
+    assert fuzzy_match("GC", "getConfig") is False
+    assert fuzzy_match("gC", "getConfig")
+    assert not fuzzy_match("xyz", "get_config")
+    assert not fuzzy_match("", "anything")
+
+
+def test_fuzzy_score_prefers_boundaries():
+    assert fuzzy_score("gc", "get_config") > fuzzy_score("gc", "bigcat")
+    assert fuzzy_score("fb", "fooBar") > fuzzy_score("fb", "fobar")
+    assert fuzzy_score("pri", "print") > fuzzy_score("pri", "sprint")
+    assert fuzzy_score("abc", "xyz") is None
+    assert fuzzy_score("print", "print") == perfect_score("print")
+
+
+def test_compute_bonuses():
+    bonuses = compute_bonuses("get_configValue2")
+    assert len(bonuses) == len("get_configValue2")
+    assert bonuses[0] > bonuses[1]
+    assert bonuses[4] > bonuses[5]
+    assert bonuses[10] > bonuses[11]
+    assert bonuses[15] > 0
+    assert compute_bonuses("") == b""
+
+
+def test_candidate_table_rank():
+    names = ["sprint", "print", "printable", "pprint", "private", "len"]
+    table = CandidateTable(names)
+
+    ranked = [name for _, name in table.rank("pri")]
+    assert ranked[0] == "print"
+    assert "len" not in ranked
+    assert set(ranked) == {"sprint", "print", "printable", "pprint", "private"}
+
+    assert [name for _, name in table.rank("pri", limit=2)] == ["print", "private"]
+    assert len(table.rank("")) == len(names)
+    assert table.rank("zzz") == []
+
+
+def test_candidate_table_narrowing_matches_fresh_table():
+    names = [f"{word}_{i}" for i in range(200) for word in ("load", "list", "lint")]
+    table = CandidateTable(names)
+
+    for pattern in ["l", "li", "lis", "list_1"]:
+        narrowed = table.rank(pattern)
+        fresh = CandidateTable(names).rank(pattern)
+        assert narrowed == fresh
+
+
+def test_candidate_table_key():
+    items = [("print", "builtin"), ("pprint", "module")]
+    table = CandidateTable(items, key=lambda item: item[0])
+    assert table.rank("pp")[0][1] == ("pprint", "module")
+
+
+def test_candidate_table_repeated_single_char_queries():
+    names = ["get_value", "getValue", "target", "Gadget", "tag", "ag", "agent"]
+    table = CandidateTable(names)
+
+    for pattern in ["g", "G", "g", "ga", "g", "G"]:
+        fresh = CandidateTable(names)
+        assert table.rank(pattern) == fresh.rank(pattern)
+        assert table.rank(pattern, limit=2) == fresh.rank(pattern, limit=2)
@@ -0,0 +1,45 @@
+from ticked.utils.html_text import html_to_text
+
+
+def test_paragraphs_breaks_and_emphasis():
+    html = (
+        "<p>Hello <strong>class</strong>,<br>see you\n   soon.</p>"
+        "<p>&nbsp;</p><div><span style='x'>Thanks</span><br></div>"
+    )
+    assert html_to_text(html) == "Hello **class**,\\\nsee you soon.\n\nThanks"
+
+
+def test_links_are_kept():
+    html = (
+        '<p>Read <a href="https://canvas.example.edu/files/1?wrap=1">the notes</a>'
+        ' and <a href="https://example.edu/a b">https://example.edu/a b</a>.'
+        ' <a href="#top">Top</a> <a href="https://example.edu/x"></a></p>'
+    )
+    assert html_to_text(html) == (
+        "Read [the notes](https://canvas.example.edu/files/1?wrap=1) and "
+        "[https://example.edu/a b](https://example.edu/a%20b). Top "
+        "[https://example.edu/x](https://example.edu/x)"
+    )
+
+
+def test_nested_lists():
+    html = (
+        "<p>Bring:</p><ul><li>A calculator</li><li>Notes:<ol>"
+        "<li>One page</li><li>Both <em>sides</em></li></ol></li></ul><p>Done</p>"
+    )
+    assert html_to_text(html) == (
+        "Bring:\n\n- A calculator\n- Notes:\n  1. One page\n  2. Both *sides*\n\nDone"
+    )
+
+
+def test_markup_is_dropped_and_text_escaped():
+    html = (
+        "<style>p {color: red}</style><script>alert(1)</script><!-- note -->"
+        "<h2>Due  dates</h2><table><tr><th>Lab</th><th>Due</th></tr>"
+        "<tr><td>lab_1</td><td>*Fri*</td></tr></table>"
+    )
+    assert html_to_text(html) == (
+        "## Due dates\n\nLab | Due\\\nlab\\_1 | \\*Fri\\*"
+    )
+    assert html_to_text("") == html_to_text("  \n") == ""
+    assert html_to_text("plain text") == "plain text"
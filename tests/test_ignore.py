@@ -0,0 +1,73 @@
+import os
+
+from ticked.utils.ignore import IgnoreCache, IgnoreRules, parse_pattern, parse_patterns
+
+
+def ignored(patterns, path, is_dir=False, base="/repo"):
+    rules = IgnoreRules(base, parse_patterns(patterns))
+    return rules.is_ignored(os.path.join(base, path), is_dir)
+
+
+def test_parse_skips_blank_lines_and_comments():
+    assert parse_pattern("") is None
+    assert parse_pattern("# comment") is None
+    assert parse_pattern("\\#file") is not None
+    assert parse_pattern("build/").dir_only
+    assert parse_pattern("!keep.log").negate
+
+
+def test_unanchored_and_anchored_patterns():
+    assert ignored("*.log", "debug.log")
+    assert ignored("*.log", "logs/deep/debug.log")
+    assert not ignored("*.log", "debug.txt")
+    assert ignored("/todo.txt", "todo.txt")
+    assert not ignored("/todo.txt", "docs/todo.txt")
+    assert ignored("docs/*.md", "docs/readme.md")
+    assert not ignored("docs/*.md", "docs/api/readme.md")
+    assert ignored("docs/**/*.md", "docs/api/readme.md")
+    assert ignored("**/cache", "a/b/cache", is_dir=True)
+
+
+def test_directory_only_and_negation():
+    assert ignored("build/", "build", is_dir=True)
+    assert not ignored("build/", "build", is_dir=False)
+    assert not ignored("*.log\n!keep.log", "keep.log")
+    assert ignored("*.log\n!keep.log", "other.log")
+
+
+def test_nested_rules_take_precedence(tmp_path):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("*.tmp\n")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / ".gitignore").write_text("!keep.tmp\n")
+
+    root_rules = IgnoreRules.for_root(str(sub))
+    assert root_rules.is_ignored(str(sub / "x.tmp"), False)
+    assert not root_rules.is_ignored(str(sub / "keep.tmp"), False)
+    assert IgnoreRules.for_directory(str(tmp_path / "missing"), None) is None
+
+
+def test_ignore_file_overrides_gitignore(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / ".ignore").write_text("!keep.log\n")
+    rules = IgnoreRules.for_directory(str(tmp_path))
+    assert rules.is_ignored(str(tmp_path / "a.log"), False)
+    assert not rules.is_ignored(str(tmp_path / "keep.log"), False)
+
+
+def test_cache_user_patterns_and_invalidation(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    cache = IgnoreCache(str(tmp_path), ["node_modules/", "*.pyc"])
+    assert cache.is_ignored(str(tmp_path / "pkg" / "node_modules"), True)
+    assert cache.is_ignored(str(tmp_path / "pkg" / "mod.pyc"), False)
+    assert not cache.is_ignored(str(tmp_path / "pkg" / "mod.py"), False)
+    assert cache.rules_for(str(tmp_path / "pkg")) is cache.rules_for(
+        str(tmp_path / "pkg")
+    )
+
+    assert not cache.invalidate(str(tmp_path))
+    (tmp_path / ".gitignore").write_text("*.py\n")
+    assert cache.invalidate(str(tmp_path))
+    assert cache.is_ignored(str(tmp_path / "pkg" / "mod.py"), False)
+    assert cache.rules_for(str(tmp_path.parent)) is None
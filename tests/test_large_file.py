@@ -0,0 +1,162 @@
+import os
+import threading
+
+import pytest
+
+from ticked.utils.large_file import LargeFileBuffer, is_large_file
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "big.log"
+    with open(path, "w") as f:
+        for i in range(5000):
+            f.write(f"line {i}\n")
+    return str(path)
+
+
+@pytest.fixture
+def buffer(log_file):
+    large_file = LargeFileBuffer(log_file, chunk_lines=1000)
+    large_file.start_indexing()
+    large_file.wait_until_indexed(timeout=10)
+    yield large_file
+    large_file.close()
+
+
+def test_is_large_file(log_file):
+    assert is_large_file(log_file, threshold=1024)
+    assert not is_large_file(log_file, threshold=10 * 1024 * 1024)
+    assert not is_large_file(log_file + ".missing")
+
+
+def test_index_and_read_chunks(buffer):
+    assert buffer.indexed
+    assert buffer.line_count == 5000
+    assert buffer.chunk_count == 5
+    assert buffer.read_chunk(0).split("\n")[:2] == ["line 0", "line 1"]
+    assert buffer.read_chunk(4).split("\n")[-1] == "line 4999"
+    assert buffer.chunk_ends_with_newline(4)
+
+
+def test_edits_shift_line_numbers(buffer):
+    text = buffer.read_chunk(1).replace("line 1000\n", "line 1000\nnew\n")
+    buffer.set_chunk_text(1, text)
+    assert buffer.modified
+    assert buffer.chunk_start_line(2) == 2001
+    assert buffer.locate_line(1001) == (1, 1)
+    assert buffer.locate_line(2001) == (2, 0)
+
+    buffer.set_chunk_text(3, buffer.read_chunk(3))
+    assert 3 not in buffer.edits
+
+
+def test_save_streams_edits(buffer, log_file):
+    text = buffer.read_chunk(2).replace("line 2500", "edited")
+    buffer.set_chunk_text(2, text)
+    size = buffer.save()
+
+    with open(log_file) as f:
+        lines = f.read().split("\n")
+    assert size == os.path.getsize(log_file)
+    assert lines[2500] == "edited"
+    assert lines[2499] == "line 2499"
+    assert lines[-1] == ""
+    assert not buffer.modified
+    assert not [name for name in os.listdir(os.path.dirname(log_file)) if name.startswith(".ticked-")]
+
+    buffer.wait_until_indexed(timeout=10)
+    assert buffer.line_count == 5000
+
+
+def test_failed_save_keeps_the_buffer_usable(buffer, log_file, monkeypatch):
+    buffer.set_chunk_text(0, buffer.read_chunk(0).replace("line 5", "edited"))
+
+    def fail(src, dst):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        buffer.save()
+    monkeypatch.undo()
+
+    assert buffer.modified
+    assert buffer.read_chunk(1).startswith("line 1000")
+    assert not [name for name in os.listdir(os.path.dirname(log_file)) if name.startswith(".ticked-")]
+    buffer.save()
+    with open(log_file) as f:
+        assert f.read().split("\n")[5] == "edited"
+
+
+def test_save_writes_through_symlinks(tmp_path, log_file):
+    link = tmp_path / "link.log"
+    link.symlink_to(log_file)
+    large_file = LargeFileBuffer(str(link), chunk_lines=1000)
+    large_file.start_indexing()
+    try:
+        large_file.set_chunk_text(0, large_file.read_chunk(0).replace("line 0", "first"))
+        large_file.save()
+        assert link.is_symlink()
+        with open(log_file) as f:
+            assert f.readline() == "first\n"
+    finally:
+        large_file.close()
+
+
+def test_close_waits_for_a_save_in_progress(buffer, log_file, monkeypatch):
+    buffer.set_chunk_text(0, buffer.read_chunk(0).replace("line 0", "first"))
+    replacing = threading.Event()
+    proceed = threading.Event()
+    replace = os.replace
+
+    def slow_replace(src, dst):
+        replacing.set()
+        proceed.wait(10)
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", slow_replace)
+    saver = threading.Thread(target=buffer.save)
+    saver.start()
+    assert replacing.wait(10)
+    closer = threading.Thread(target=buffer.close)
+    closer.start()
+    closer.join(0.1)
+    assert closer.is_alive()
+
+    proceed.set()
+    saver.join(10)
+    closer.join(10)
+    with open(log_file) as f:
+        assert f.readline() == "first\n"
+    with pytest.raises(OSError):
+        buffer.save()
+
+
+@pytest.mark.parametrize("ends_with_newline", [True, False])
+def test_save_rebuilds_the_line_index_without_reindexing(tmp_path, ends_with_newline):
+    path = tmp_path / "big.log"
+    path.write_text("\n".join(f"line {i}" for i in range(4500)) + (
+        "\n" if ends_with_newline else ""
+    ))
+    large_file = LargeFileBuffer(str(path), chunk_lines=1000)
+    large_file.start_indexing()
+    try:
+        large_file.set_chunk_text(0, large_file.read_chunk(0).replace("line 3\n", ""))
+        large_file.set_chunk_text(2, large_file.read_chunk(2).replace("0\n", "0\n\n\n"))
+        large_file.set_chunk_text(4, large_file.read_chunk(4) + "\nmore\n")
+        large_file.save()
+        # The index is complete as soon as the save returns
+        assert large_file.indexed
+
+        fresh = LargeFileBuffer(str(path), chunk_lines=1000)
+        fresh.start_indexing()
+        fresh.wait_until_indexed(timeout=10)
+        try:
+            assert large_file._offsets == fresh._offsets
+            assert [large_file.read_chunk(c) for c in range(5)] == [
+                fresh.read_chunk(c) for c in range(5)
+            ]
+        finally:
+            fresh.close()
+    finally:
+        large_file.close()
@@ -1,6 +1,9 @@
 import os
 import shutil
+from array import array
 import tempfile
+from pathlib import Path
+from types import SimpleNamespace
 from typing import Generator, Tuple
 from unittest.mock import MagicMock, PropertyMock, patch
 
@@ -14,6 +17,7 @@ from ticked.ui.views.nest import (
     CodeEditor,
     ContextMenu,
     DeleteConfirmationDialog,
+    EditorTab,
     FileCreated,
     FilterableDirectoryTree,
     FolderCreated,
@@ -23,9 +27,13 @@ from ticked.ui.views.nest import (
     RenameDialog,
     StatusBar,
 )
+from ticked.utils.large_file import LargeFileBuffer
+from ticked.utils.symbol_index import SymbolIndex
 
 
 class TestAppWithContext(App):
+    __test__ = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -63,6 +71,16 @@ def test_app() -> Generator[App, None, None]:
     active_app.reset(token)
 
 
+@pytest.fixture
+def detached_tree() -> Generator[type, None, None]:
+    """FilterableDirectoryTree for tests that don't mount it in an app.
+
+    Nothing would await the tree's async path watcher there.
+    """
+    with patch.object(FilterableDirectoryTree, "watch_path", lambda self: None):
+        yield FilterableDirectoryTree
+
+
 @pytest.fixture
 def temp_dir() -> Generator[str, None, None]:
     temp_dir = tempfile.mkdtemp()
@@ -112,8 +130,10 @@ def code_editor_with_app(test_app: App, mocked_status_bar) -> CodeEditor:
 
 
 @pytest.mark.asyncio
-async def test_filterable_directory_tree(temp_dir: str, test_app: App):
-    tree = FilterableDirectoryTree(temp_dir)
+async def test_filterable_directory_tree(
+    temp_dir: str, test_app: App, detached_tree: type
+):
+    tree = detached_tree(temp_dir)
     object.__setattr__(tree, "_app", test_app)
 
     tree.show_hidden = False
@@ -126,13 +146,107 @@ async def test_filterable_directory_tree(temp_dir: str, test_app: App):
     tree.show_hidden = True
     assert tree.filter_paths(all_paths) == all_paths
 
-    with patch.object(tree, "_get_expanded_paths", return_value=[]):
+    with patch.object(tree, "sync_directories") as mock_sync:
         with patch.object(tree, "reload"):
-            with patch.object(tree, "_restore_expanded_paths"):
-                with patch.object(tree, "refresh"):
-                    tree.refresh_tree()
-                    tree.reload.assert_called_once()
-                    tree.refresh.assert_called_once()
+            with patch.object(tree, "refresh"):
+                tree.refresh_tree()
+                mock_sync.assert_called_once()
+                tree.reload.assert_not_called()
+                tree.refresh.assert_called_once()
+
+
+def test_directory_tree_skips_ignored_paths(temp_dir: str, detached_tree: type):
+    for name in ("src", "build", "node_modules"):
+        os.makedirs(os.path.join(temp_dir, name))
+    for name in ("main.py", "main.pyc", ".gitignore"):
+        with open(os.path.join(temp_dir, name), "w") as f:
+            f.write("build/\n" if name == ".gitignore" else "")
+
+    tree = detached_tree(temp_dir)
+    listing = dict(tree._scan_directory(os.path.realpath(temp_dir)))
+    names = sorted(path.name for path in tree.filter_paths(list(listing)))
+    assert names == ["main.py", "src"]
+
+    # Directory checks come from the listing instead of a stat per entry
+    with patch("pathlib.Path.is_dir", side_effect=AssertionError):
+        for path, is_dir in listing.items():
+            assert tree._safe_is_dir(path) == is_dir
+
+    tree.show_hidden = True
+    listing = dict(tree._scan_directory(os.path.realpath(temp_dir)))
+    assert {"build", "node_modules", "main.pyc", ".gitignore"} <= {
+        path.name for path in listing
+    }
+
+
+def test_directory_tree_unwatches_symlinked_directories(
+    temp_dir: str, detached_tree: type
+):
+    target = os.path.join(temp_dir, "target")
+    os.makedirs(os.path.join(target, "child"))
+    link = os.path.join(temp_dir, "link")
+    os.symlink(target, link)
+
+    tree = detached_tree(temp_dir)
+    tree._watcher = MagicMock()
+    child = SimpleNamespace(
+        data=SimpleNamespace(path=Path(link) / "child", loaded=True), children=[]
+    )
+    node = SimpleNamespace(
+        data=SimpleNamespace(path=Path(link), loaded=True), children=[child]
+    )
+    tree._unwatch_subtree(node)
+    unwatched = [call.args[0] for call in tree._watcher.unwatch.call_args_list]
+    assert sorted(unwatched) == [
+        os.path.realpath(target),
+        os.path.realpath(os.path.join(target, "child")),
+    ]
+
+
+def test_directory_tree_is_dir_cache_follows_listings(
+    temp_dir: str, detached_tree: type
+):
+    src = Path(temp_dir) / "src"
+    (src / "pkg").mkdir(parents=True)
+    (src / "a.py").write_text("x")
+    tree = detached_tree(temp_dir)
+    list(tree._scan_directory(Path(temp_dir)))
+    list(tree._scan_directory(src))
+    assert tree._safe_is_dir(src / "pkg") and not tree._safe_is_dir(src / "a.py")
+
+    # Re-listing replaces the directory's entries instead of adding to them
+    (src / "a.py").unlink()
+    list(tree._scan_directory(src))
+    assert tree._is_dir_cache[src] == {src / "pkg": True}
+
+    tree._forget_listings(src)
+    assert list(tree._is_dir_cache) == [Path(temp_dir)]
+
+
+def test_file_index_is_scoped_to_the_project(
+    temp_dir: str, detached_tree: type, monkeypatch
+):
+    project = os.path.join(temp_dir, "code", "project")
+    os.makedirs(os.path.join(project, ".git"))
+    os.makedirs(os.path.join(project, "src"))
+    tree = detached_tree(temp_dir, ignore_patterns=["build/"])
+    view = SimpleNamespace(query_one=lambda *args: tree)
+
+    monkeypatch.chdir(os.path.join(project, "src"))
+    assert NestView._file_index_scope(view) == (os.path.realpath(project), ["build/"])
+
+    # Outside the tree, or not in a work tree, the tree's root is indexed
+    monkeypatch.chdir(os.path.join(temp_dir, "code"))
+    assert NestView._file_index_scope(view)[0] == os.path.realpath(temp_dir)
+    monkeypatch.chdir(os.path.dirname(temp_dir))
+    tree.show_hidden = True
+    assert NestView._file_index_scope(view) == (os.path.realpath(temp_dir), None)
+
+
+def test_code_editor_noop_bindings_have_an_action():
+    noop = [binding for binding in CodeEditor.BINDINGS if binding.action == "noop"]
+    assert noop and callable(getattr(CodeEditor, "action_noop", None))
+    assert "action_noop" not in vars(CodeEditor.OutlineChanged)
 
 
 @pytest.mark.asyncio
@@ -237,6 +351,346 @@ async def test_code_editor_undo_redo(
     assert editor.text == "Final text"
 
 
+@pytest.mark.asyncio
+async def test_code_editor_search_and_substitute(code_editor_with_app: CodeEditor):
+    editor = code_editor_with_app
+    editor.text = "foo = 1\nbar = foo\nfoo(foo)"
+    editor.cursor_location = (0, 0)
+
+    editor.command = "/foo"
+    editor.execute_command()
+    assert editor.cursor_location == (1, 6)
+    editor._search_next()
+    assert editor.cursor_location == (2, 0)
+    editor._search_next(reverse=True)
+    assert editor.cursor_location == (1, 6)
+    # Matches are highlighted as lines are rendered
+    assert editor.get_line(2).spans
+
+    editor.command = ":2,3s/foo/baz/g"
+    editor.execute_command()
+    assert editor.text == "foo = 1\nbar = baz\nbaz(baz)"
+    assert editor.cursor_location == (2, 0)
+
+    editor.command = ":noh"
+    editor.execute_command()
+    assert not editor.get_line(0).spans
+
+
+@pytest.mark.asyncio
+async def test_code_editor_rejects_tiny_tab_memory_budgets(
+    code_editor_with_app: CodeEditor,
+):
+    editor = code_editor_with_app
+    budget = editor._tab_cache.budget
+    for value in ("0", "-5", "0.5", "inf"):
+        editor.command = f":set tabmem={value}"
+        editor.execute_command()
+        assert editor._tab_cache.budget == budget
+
+    editor.command = ":set tabmem=64"
+    editor.execute_command()
+    assert editor._tab_cache.budget == 64 * 1024 * 1024
+
+
+@pytest.mark.asyncio
+async def test_code_editor_outline_serves_gd_and_completion(
+    code_editor_with_app: CodeEditor,
+):
+    editor = code_editor_with_app
+    editor.current_file = "module.py"
+    editor.text = "def helper():\n    pass\n\nclass Thing:\n    value = helper()"
+    version = editor.buffer_version
+
+    editor.cursor_location = (4, 14)
+    editor.action_goto_definition()
+    assert editor.cursor_location == (0, 4)
+    outline = editor.outline
+    assert [symbol.qualname for symbol in outline.symbols] == ["helper", "Thing"]
+    assert outline.version == version
+
+    # Completion reuses the outline's identifiers and symbol kinds
+    completions = {c.name: c for c in editor._get_local_completions()}
+    assert completions["helper"].type == "function"
+    assert completions["value"].type == "local"
+
+    # Unchanged text is not parsed again; an edit gives a new version
+    assert editor.current_outline() is outline
+    editor.insert("\n", editor.document.end)
+    assert editor.buffer_version != version
+    assert editor.current_outline() is not outline
+
+    editor.cursor_location = (1, 5)
+    editor.action_goto_definition()
+    editor.notify.assert_called_with(
+        "No definition found for pass", severity="warning"
+    )
+
+
+@pytest.mark.asyncio
+async def test_code_editor_goto_definition_across_files(
+    temp_dir: str, code_editor_with_app: CodeEditor
+):
+    editor = code_editor_with_app
+    models = os.path.join(temp_dir, "models.py")
+    with open(models, "w") as f:
+        f.write("import os\n\nclass Record:\n    pass\n")
+    main = os.path.join(temp_dir, "main.py")
+    with open(main, "w") as f:
+        f.write("from models import Record\n\nRecord()\n")
+    index = SymbolIndex(temp_dir, os.path.join(temp_dir, "symbols.db"))
+    index.update(["models.py", "main.py"])
+    editor.symbol_index = index
+
+    editor.open_file(main)
+    editor.cursor_location = (2, 2)
+    editor.action_goto_definition()
+    assert editor.current_file == models
+    assert editor.cursor_location == (2, 6)
+
+    editor.cursor_location = (0, 8)
+    editor.action_goto_definition()
+    editor.notify.assert_called_with("No definition found for os", severity="warning")
+
+
+@pytest.mark.asyncio
+async def test_code_editor_restores_session_lazily(
+    temp_dir: str, code_editor_with_app: CodeEditor
+):
+    editor = code_editor_with_app
+    paths = []
+    for i in range(5):
+        path = os.path.join(temp_dir, f"file{i}.py")
+        with open(path, "w") as f:
+            f.write(f"content {i}\n")
+        paths.append(path)
+    entries = [
+        {
+            "path": path,
+            "cursor_row": 0,
+            "cursor_column": i,
+            "scroll_x": 0,
+            "scroll_y": 0,
+            "active": i == 2,
+        }
+        for i, path in enumerate(paths)
+    ]
+    entries.append(dict(entries[0], path=os.path.join(temp_dir, "gone.py")))
+
+    editor.restore_session(entries)
+
+    assert [tab.path for tab in editor.tabs] == paths
+    assert editor.active_tab_index == 2
+    assert editor.text == "content 2\n"
+    # Only the active tab's file was read
+    assert [tab.loaded for tab in editor.tabs] == [False, False, True, False, False]
+    assert editor.tabs[4].content == "content 4\n"
+
+    rows = editor.session_tabs()
+    assert [row["active"] for row in rows] == [False, False, True, False, False]
+    assert rows[1]["cursor_column"] == 1
+
+
+@pytest.mark.asyncio
+async def test_code_editor_never_saves_unreadable_restored_tabs_as_empty(
+    temp_dir: str, code_editor_with_app: CodeEditor
+):
+    editor = code_editor_with_app
+    binary = os.path.join(temp_dir, "image.py")
+    latin1 = os.path.join(temp_dir, "notes.py")
+    with open(binary, "wb") as f:
+        f.write(b"\x89PNG\x00\x00data")
+    with open(latin1, "wb") as f:
+        f.write("caf\xe9\n".encode("latin-1"))
+    entries = [
+        {
+            "path": path,
+            "cursor_row": 0,
+            "cursor_column": 0,
+            "scroll_x": 0,
+            "scroll_y": 0,
+            "active": i == 0,
+        }
+        for i, path in enumerate([binary, latin1])
+    ]
+
+    editor.restore_session(entries)
+    editor.notify.assert_called_with("Cannot open binary file", severity="warning")
+    assert editor.read_only and not editor.tabs[0].loaded
+
+    editor.command = ":w"
+    editor.execute_command()
+    with open(binary, "rb") as f:
+        assert f.read() == b"\x89PNG\x00\x00data"
+
+    # Switching away doesn't give the tab the (empty) editor text either
+    editor.command = ":bn"
+    editor.execute_command()
+    assert not editor.tabs[0].loaded and not editor.tabs[1].loaded
+    assert editor.tabs[1].content == ""
+    editor.command = ":w"
+    editor.execute_command()
+    with open(latin1, "rb") as f:
+        assert f.read() == "caf\xe9\n".encode("latin-1")
+
+    # Once readable again, the tab loads and can be edited
+    with open(latin1, "w") as f:
+        f.write("fixed\n")
+    editor.command = ":bp"
+    editor.execute_command()
+    editor.command = ":bn"
+    editor.execute_command()
+    assert editor.text == "fixed\n" and not editor.read_only
+
+
+@pytest.mark.asyncio
+async def test_code_editor_keeps_large_file_edits_made_while_saving(
+    temp_dir: str, code_editor_with_app: CodeEditor
+):
+    editor = code_editor_with_app
+    path = os.path.join(temp_dir, "big.log")
+    with open(path, "w") as f:
+        f.write("".join(f"line {i}\n" for i in range(50)))
+    tab = EditorTab(path, None)
+    tab.large_file = LargeFileBuffer(path, chunk_lines=10)
+    tab.large_file.start_indexing()
+    editor.tabs = [tab]
+    editor.active_tab_index = 0
+    editor.current_file = path
+    try:
+        saved = tab.large_file.read_chunk(0)
+        editor.load_text(saved + "\ntyped during the save")
+        tab.modified = True
+        editor._finish_save(path, saved, 10, None)
+        assert tab.modified
+        assert editor.text.endswith("typed during the save")
+
+        editor.load_text(saved)
+        editor._finish_save(path, saved, 10, None)
+        assert not tab.modified
+    finally:
+        tab.large_file.close()
+
+
+@pytest.mark.asyncio
+async def test_code_editor_wq_closes_the_tab_only_once_saved(
+    temp_dir: str, code_editor_with_app: CodeEditor
+):
+    editor = code_editor_with_app
+    path = os.path.join(temp_dir, "notes.txt")
+    with open(path, "w") as f:
+        f.write("old\n")
+    editor.open_file(path)
+    editor.load_text("new\n")
+    editor._modified = True
+    tab = editor.tabs[0]
+    tab.swap = MagicMock()
+
+    with patch(
+        "ticked.ui.views.nest.atomic_write_text",
+        side_effect=PermissionError(13, "Permission denied"),
+    ):
+        editor.command = ":wq"
+        editor.execute_command()
+    # The failed save keeps the tab and its recovery journal
+    assert editor.tabs == [tab] and editor.text == "new\n"
+    tab.swap.discard.assert_not_called()
+
+    editor.command = ":x"
+    editor.execute_command()
+    assert editor.tabs == []
+    with open(path) as f:
+        assert f.read() == "new\n"
+    tab.swap.discard.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_file_closes_its_background_tabs(
+    temp_dir: str, code_editor_with_app: CodeEditor
+):
+    editor = code_editor_with_app
+    folder = os.path.join(temp_dir, "pkg")
+    paths = [os.path.join(temp_dir, "a.py"), os.path.join(folder, "b.py")]
+    tabs = [EditorTab(path, "x") for path in paths]
+    tabs.append(EditorTab(os.path.join(temp_dir, "c.py"), "y"))
+    for tab in tabs[:2]:
+        tab.swap = MagicMock()
+        tab.large_file = MagicMock()
+    editor.tabs = list(tabs)
+    editor.active_tab_index = 2
+
+    view = NestView()
+    view.query_one = MagicMock(return_value=editor)
+    view.on_file_deleted(SimpleNamespace(path=folder))
+    view.on_file_deleted(SimpleNamespace(path=paths[0]))
+
+    assert editor.tabs == [tabs[2]] and editor.active_tab_index == 0
+    for tab in tabs[:2]:
+        tab.swap.discard.assert_called_once()
+        tab.large_file.close.assert_called_once()
+
+
+class EditorApp(App):
+    def compose(self) -> ComposeResult:
+        yield CodeEditor()
+
+
+@pytest.mark.asyncio
+async def test_code_editor_doesnt_wait_for_the_indexer(temp_dir: str):
+    path = os.path.join(temp_dir, "big.log")
+    with open(path, "w") as f:
+        f.write("".join(f"line {i}\n" for i in range(50)))
+    # Indexed up to line 35, as if the indexer were still running
+    large_file = LargeFileBuffer(path, chunk_lines=10)
+    large_file._offsets = array("Q", [0])
+    for i in range(35):
+        large_file._offsets.append(large_file._offsets[-1] + len(f"line {i}\n"))
+    tab = EditorTab(path, "")
+    tab.large_file = large_file
+
+    app = EditorApp()
+    async with app.run_test() as pilot:
+        editor = app.query_one(CodeEditor)
+        editor.tabs = [tab]
+        editor.active_tab_index = 0
+        editor.current_file = path
+        editor._load_tab_content(tab)
+        assert not tab.chunk_loading and editor.text.startswith("line 0\n")
+
+        editor._large_file_goto_line(32)
+        assert tab.chunk == 3 and tab.chunk_loading
+        assert editor.read_only and editor.text == ""
+        editor._save_buffer_state()
+        # Nothing was parked for the chunk that isn't shown yet
+        assert not large_file.edits
+
+        large_file._offsets = array("Q", [0])
+        large_file.start_indexing()
+        for _ in range(50):
+            await pilot.pause(0.02)
+            if not tab.chunk_loading:
+                break
+        assert editor.text.startswith("line 30\n") and not editor.read_only
+        assert editor.cursor_location == (2, 0)
+    large_file.close()
+
+
+@pytest.mark.asyncio
+async def test_code_editor_status_counts_follow_edits(
+    code_editor_with_app: CodeEditor, mocked_status_bar
+):
+    editor = code_editor_with_app
+    editor.load_text("one two\nthree")
+    editor.insert(" four\nfive", (1, 5))
+    editor.replace("", (0, 0), (0, 4))
+
+    assert editor._text_stats.words == len(editor.text.split()) == 4
+    assert editor._text_stats.chars == len(editor.text)
+    mocked_status_bar.update_file_info.assert_called_with(
+        f"3L, 4W, {len(editor.text)}B"
+    )
+
+
 @pytest.mark.asyncio
 async def test_nest_view(
     temp_dir: str, test_files: Tuple[str, str, str], test_app: App
@@ -511,6 +965,34 @@ async def test_paste_operation(temp_dir: str, test_app: App):
 
     view.query_one = MagicMock(return_value=tree_mock)
 
-    with patch("shutil.copy2") as mock_copy:
+    await view.action_paste()
+    with open(os.path.join(dest_dir, "source.txt")) as f:
+        assert f.read() == "Test content"
+    view.notify.assert_called_with("Copied file: source.txt")
+    tree_mock.sync_directories.assert_called_with({os.path.realpath(dest_dir)})
+
+    # Pasting next to the original makes a renamed copy
+    tree_mock.cursor_node.data.path = temp_dir
+    await view.action_paste()
+    assert os.path.exists(os.path.join(temp_dir, "source copy.txt"))
+
+    # A failed move keeps the clipboard so the paste can be retried
+    test_app.file_clipboard = {"action": "cut", "path": source_file}
+    tree_mock.cursor_node.data.path = dest_dir
+    os.remove(os.path.join(dest_dir, "source.txt"))
+    with patch(
+        "ticked.ui.views.nest.FileTransfer.run",
+        side_effect=PermissionError(13, "Permission denied"),
+    ):
         await view.action_paste()
-        mock_copy.assert_called_with(source_file, os.path.join(dest_dir, "source.txt"))
+    assert os.path.exists(source_file)
+    assert test_app.file_clipboard == {"action": "cut", "path": source_file}
+
+    # Moving clears the clipboard and refreshes both directories
+    await view.action_paste()
+    assert not os.path.exists(source_file)
+    assert os.path.exists(os.path.join(dest_dir, "source.txt"))
+    assert test_app.file_clipboard is None
+    tree_mock.sync_directories.assert_called_with(
+        {os.path.realpath(dest_dir), os.path.realpath(temp_dir)}
+    )
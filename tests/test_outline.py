@@ -0,0 +1,77 @@
+from ticked.utils.outline import (
+    Outline,
+    OutlineCache,
+    next_version,
+    parse_outline,
+    scan_identifiers,
+)
+
+SOURCE = """\
+import os
+
+class Greeter:
+    def greet(self, name):
+        return helper(name)
+
+    async def wave(self):
+        def helper(x):
+            return x
+        return helper(1)
+
+if os.name == "nt":
+    def helper(name):
+        return name
+else:
+    def helper(name):
+        return name.upper()
+"""
+
+
+def test_parse_outline_lists_nested_definitions():
+    outline = parse_outline(SOURCE, 1)
+    assert [(s.qualname, s.kind, s.depth) for s in outline.symbols] == [
+        ("Greeter", "class", 0),
+        ("Greeter.greet", "method", 1),
+        ("Greeter.wave", "method", 1),
+        ("Greeter.wave.helper", "function", 2),
+        ("helper", "function", 0),
+        ("helper", "function", 0),
+    ]
+    greet = outline.symbols[1]
+    assert (greet.row, greet.column, greet.end_row) == (3, 8, 4)
+    assert outline.parsed
+
+
+def test_find_definition_prefers_enclosing_scopes():
+    outline = parse_outline(SOURCE, 1)
+    assert outline.scope_at(8).qualname == "Greeter.wave.helper"
+    assert outline.scope_at(1) is None
+    # Inside wave, its nested helper shadows the module-level ones
+    assert outline.find_definition("helper", 9).qualname == "Greeter.wave.helper"
+    assert outline.find_definition("helper", 4).row == 12
+    assert outline.find_definition("missing", 4) is None
+
+
+def test_unparsable_text_keeps_previous_symbols():
+    previous = parse_outline(SOURCE, 1)
+    outline = parse_outline(SOURCE + "\ndef broken(:\n", 2, previous=previous)
+    assert not outline.parsed
+    assert outline.symbols == previous.symbols
+    assert "broken" in outline.identifiers
+
+    plain = parse_outline("some words here", 3, python=False)
+    assert plain.symbols == [] and plain.identifiers == ["here", "some", "words"]
+
+
+def test_scan_identifiers_skips_keywords_and_single_letters():
+    assert scan_identifiers("for x in items: yield x_1 + items") == ["items", "x_1"]
+
+
+def test_outline_cache_evicts_oldest_version():
+    cache = OutlineCache(size=2)
+    versions = [next_version() for _ in range(3)]
+    assert len(set(versions)) == 3
+    for version in versions:
+        cache.put(Outline(version, [], []))
+    assert cache.get(versions[0]) is None
+    assert cache.get(versions[2]).version == versions[2]
@@ -0,0 +1,167 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from spotipy.exceptions import SpotifyException
+from textual.app import App, ComposeResult
+
+from ticked.ui.views.welcome import NowPlayingCard
+from ticked.utils import playback_poller
+from ticked.utils.async_spotify import AsyncSpotify
+from ticked.utils.playback_poller import (
+    PlaybackPoller,
+    next_interval,
+    playback_key,
+    retry_delay,
+)
+
+
+def _playback(track="a", is_playing=True, progress_ms=0, duration_ms=200_000):
+    return {
+        "is_playing": is_playing,
+        "progress_ms": progress_ms,
+        "device": {"id": "laptop"},
+        "item": {
+            "id": track,
+            "name": f"Track {track}",
+            "duration_ms": duration_ms,
+            "artists": [{"name": "Artist"}],
+        },
+    }
+
+
+def test_intervals_adapt_to_playback():
+    assert next_interval(None) == playback_poller.IDLE_INTERVAL
+    assert next_interval(_playback(is_playing=False)) == playback_poller.PAUSED_INTERVAL
+    assert next_interval(_playback(progress_ms=0)) == playback_poller.PLAYING_INTERVAL
+    # Near the end of a track, poll just after it ends
+    assert next_interval(_playback(progress_ms=198_000)) == 2.5
+    assert next_interval(_playback(progress_ms=200_000)) == playback_poller.MIN_INTERVAL
+
+    # Progress alone isn't a change
+    assert playback_key(_playback(progress_ms=1)) == playback_key(_playback())
+    assert playback_key(_playback(is_playing=False)) != playback_key(_playback())
+
+
+def test_rate_limits_back_off():
+    error = ValueError("connection reset")
+    assert [retry_delay(error, n) for n in (1, 2, 3)] == [2.0, 4.0, 8.0]
+    assert retry_delay(error, 30) == playback_poller.MAX_BACKOFF
+
+    limited = SpotifyException(429, -1, "Too many requests", headers={"Retry-After": "40"})
+    assert retry_delay(limited, 1) == 40.0
+    assert retry_delay(limited, 6) == 64.0
+    assert retry_delay(SpotifyException(429, -1, "Too many requests"), 1) == 2.0
+
+
+class FakeClient:
+    def __init__(self, states):
+        self.states = list(states)
+        self.calls = 0
+
+    def current_playback(self):
+        self.calls += 1
+        state = self.states[min(self.calls, len(self.states)) - 1]
+        if isinstance(state, Exception):
+            raise state
+        return state
+
+
+class Subscriber:
+    def __init__(self):
+        self.messages = []
+
+    def post_message(self, message):
+        self.messages.append(message)
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    for name in ("PLAYING_INTERVAL", "MIN_INTERVAL", "MIN_BACKOFF"):
+        monkeypatch.setattr(playback_poller, name, 0.01)
+
+
+@pytest.mark.asyncio
+async def test_changes_are_published_to_subscribers(fast_polling):
+    client = FakeClient(
+        [
+            _playback("a"),
+            _playback("a", progress_ms=5000),
+            SpotifyException(429, -1, "Too many requests", headers={"Retry-After": "0"}),
+            _playback("b"),
+        ]
+    )
+    poller = PlaybackPoller(lambda: AsyncSpotify(client))
+    first = Subscriber()
+    poller.subscribe(first)
+    await asyncio.sleep(0.1)
+    assert client.calls > 4
+    assert [m.playback["item"]["id"] for m in first.messages] == ["a", "b"]
+
+    # A new subscriber gets the last known state straight away
+    second = Subscriber()
+    poller.subscribe(second)
+    assert [m.playback["item"]["id"] for m in second.messages] == ["b"]
+    for subscriber in (first, second):
+        poller.unsubscribe(subscriber)
+    assert not poller.running
+
+
+@pytest.mark.asyncio
+async def test_polling_runs_only_with_subscribers(fast_polling):
+    client = FakeClient([_playback()])
+    poller = PlaybackPoller(lambda: AsyncSpotify(client))
+    await asyncio.sleep(0.05)
+    assert client.calls == 0
+
+    subscriber = Subscriber()
+    poller.subscribe(subscriber)
+    await asyncio.sleep(0.1)
+    assert client.calls > 2
+    assert len(subscriber.messages) == 1
+
+    poller.unsubscribe(subscriber)
+    await asyncio.sleep(0)
+    calls = client.calls
+    await asyncio.sleep(0.05)
+    assert client.calls == calls and not poller.running
+
+
+class PlayerClient(FakeClient):
+    def __init__(self, states):
+        super().__init__(states)
+        self.commands = []
+
+    def start_playback(self):
+        self.commands.append("start")
+
+    def pause_playback(self):
+        self.commands.append("pause")
+
+
+class NowPlayingApp(App):
+    def __init__(self, stale, live):
+        super().__init__()
+        self.live = AsyncSpotify(live)
+        # The poller last saw an older state than Spotify has now
+        self.playback_poller = PlaybackPoller(lambda: AsyncSpotify(stale))
+
+    def get_async_spotify(self):
+        return self.live
+
+    def compose(self) -> ComposeResult:
+        yield NowPlayingCard()
+
+
+@pytest.mark.asyncio
+async def test_play_pause_follows_the_live_playback_state():
+    live = PlayerClient([_playback(is_playing=False)])
+    app = NowPlayingApp(FakeClient([_playback(is_playing=True)]), live)
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        assert app.playback_poller.playback["is_playing"]
+        card = app.query_one(NowPlayingCard)
+        button = SimpleNamespace(id="play-pause-btn")
+        await card.on_button_pressed(SimpleNamespace(button=button, stop=lambda: None))
+        # Paused on another device since the last poll: resume, don't pause
+        assert live.commands == ["start"]
@@ -0,0 +1,82 @@
+import pytest
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable
+
+from ticked.ui.views.spotify import PlaylistView, SearchResult
+from ticked.utils.async_spotify import AsyncSpotify
+
+
+def _track(n: int) -> dict:
+    return {"id": f"t{n}", "name": f"Track {n}", "artists": [{"name": "Artist"}]}
+
+
+class FakeSpotify:
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.requests = []
+
+    def _page(self, limit, offset):
+        self.requests.append((limit, offset))
+        end = min(offset + limit, self.total)
+        items = [{"track": _track(n)} for n in range(offset, end)]
+        if offset == 0:
+            # A local file, which can't be played by id
+            items[1] = {"track": {"id": None, "name": "Local", "artists": []}}
+            # Names that would be invalid as markup
+            items[2]["track"]["name"] = "[/x] Live"
+            items[2]["track"]["artists"] = [{"name": "[b]Band"}]
+        return {"total": self.total, "items": items}
+
+    def current_user_saved_tracks(self, limit=20, offset=0, market=None):
+        return self._page(limit, offset)
+
+    def playlist(self, playlist_id, fields=None):
+        return {"name": "Road trip [/mix]"}
+
+    def playlist_items(self, playlist_id, fields=None, limit=50, offset=0, **kwargs):
+        return self._page(limit, offset)
+
+
+class PlaylistApp(App):
+    def __init__(self) -> None:
+        super().__init__()
+        self.selected = []
+
+    def compose(self) -> ComposeResult:
+        yield PlaylistView()
+
+    def on_search_result_selected(self, message: SearchResult.Selected) -> None:
+        self.selected.append((message.result_id, message.position))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "playlist_id, page_size", [("liked_songs", 50), ("road_trip", 100)]
+)
+async def test_every_page_of_a_playlist_is_loaded(playlist_id, page_size):
+    spotify = FakeSpotify(5000)
+    app = PlaylistApp()
+    async with app.run_test(size=(80, 24)) as pilot:
+        view = app.query_one(PlaylistView)
+        view.load_playlist(AsyncSpotify(spotify), playlist_id)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+
+        table = app.query_one("#tracks-table", DataTable)
+        assert table.row_count == 4999
+        assert len(spotify.requests) == 5000 // page_size
+        assert {limit for limit, _ in spotify.requests} == {page_size}
+        assert [str(cell) for cell in table.get_row_at(4998)] == [
+            "Track 4999",
+            "Artist",
+        ]
+        assert [str(cell) for cell in table.get_row_at(1)] == ["[/x] Live", "[b]Band"]
+
+        # Tracks are table rows, not a widget each
+        assert not view.query(SearchResult)
+
+        # Selecting a row plays the track at its place in the playlist
+        table.move_cursor(row=1)
+        await pilot.press("enter")
+        await pilot.pause()
+        assert app.selected == [("t2", 2)]
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+from textual.document._document import Document
+
+from ticked.utils import swap
+from ticked.utils.swap import (
+    SwapJournal,
+    find_orphaned_swaps,
+    line_diff,
+    recover_swaps,
+    replay,
+)
+
+
+def _orphan(journal: SwapJournal) -> Path:
+    # Pretend the journal belongs to a process that is gone
+    name = journal.file.name.replace(str(os.getpid()), "999999999")
+    orphan = journal.file.with_name(name)
+    journal.file.rename(orphan)
+    return orphan
+
+
+def test_journal_replays_snapshot_and_edits(tmp_path: Path):
+    journal = SwapJournal(str(tmp_path / "file.py"), tmp_path / "swap")
+    journal.record_snapshot("hello\nworld")
+    journal.record_edit((0, 5), (0, 5), "!")
+    journal.flush()
+    journal.record_edit((1, 0), (1, 5), "there\nagain")
+    journal.flush()
+
+    buffer = replay(journal.file)
+    assert buffer.path == str(tmp_path / "file.py")
+    assert buffer.text == "hello!\nthere\nagain"
+
+
+def test_journal_compaction_rewrites_as_snapshot(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(swap, "COMPACT_MIN_BYTES", 100)
+    journal = SwapJournal(str(tmp_path / "file.py"), tmp_path / "swap")
+    journal.record_snapshot("x")
+    for i in range(20):
+        journal.record_edit((0, 0), (0, 0), "y")
+    assert journal.needs_compaction
+    journal.record_snapshot("y" * 20 + "x")
+    journal.flush()
+
+    assert not journal.needs_compaction
+    assert len(journal.file.read_text().splitlines()) == 2
+    assert replay(journal.file).text == "y" * 20 + "x"
+
+
+def test_replay_ignores_torn_record(tmp_path: Path):
+    journal = SwapJournal(str(tmp_path / "file.py"), tmp_path / "swap")
+    journal.record_snapshot("abc")
+    journal.record_edit((0, 3), (0, 3), "d")
+    journal.flush()
+    with open(journal.file, "a", encoding="utf-8") as file:
+        file.write('["e",0,0,0')
+
+    assert replay(journal.file).text == "abcd"
+
+
+def test_recover_only_orphaned_swaps(tmp_path: Path):
+    directory = tmp_path / "swap"
+    live = SwapJournal(str(tmp_path / "live.py"), directory)
+    live.record_snapshot("live")
+    live.flush()
+    crashed = SwapJournal(str(tmp_path / "crashed.py"), directory)
+    crashed.record_snapshot("crashed")
+    crashed.flush()
+    orphan = _orphan(crashed)
+
+    assert find_orphaned_swaps(directory) == [orphan]
+    buffers = recover_swaps(directory)
+    assert [(b.path, b.text) for b in buffers] == [
+        (str(tmp_path / "crashed.py"), "crashed")
+    ]
+
+
+def test_discard_removes_journal(tmp_path: Path):
+    journal = SwapJournal(str(tmp_path / "file.py"), tmp_path / "swap")
+    journal.record_snapshot("text")
+    journal.flush()
+    assert journal.file.exists()
+    journal.discard()
+    assert not journal.file.exists()
+    assert not journal.has_snapshot
+
+
+def test_line_diff_replays_to_new_lines():
+    cases = [
+        (["a", "b", "c"], ["a", "x", "c"]),
+        (["a", "b"], ["a", "b", "c"]),
+        (["a", "b"], ["z", "a", "b"]),
+        (["a", "b", "c"], ["a"]),
+        (["a", "b", "c"], ["c"]),
+        (["a", "b"], ["a", "b"]),
+    ]
+    for old, new in cases:
+        change = line_diff(old, new)
+        if old == new:
+            assert change is None
+            continue
+        document = Document("\n".join(old))
+        document.replace_range(*change)
+        assert document.lines == new
@@ -0,0 +1,121 @@
+import os
+import time
+from pathlib import Path
+
+from ticked.utils import symbol_index
+from ticked.utils.file_index import FileIndex
+from ticked.utils.symbol_index import SymbolIndex, is_indexed_file
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _project(root: Path) -> None:
+    _write(root / "app" / "models.py", "class User:\n    def save(self):\n        pass\n")
+    _write(root / "app" / "views.py", "def render():\n    pass\n\nclass View:\n    pass\n")
+    _write(root / "scripts" / "tool.py", "def save():\n    pass\n")
+    _write(root / "broken.py", "def broken(:\n")
+    _write(root / "README.md", "def not_python(): pass\n")
+    _write(root / "venv" / "lib" / "site-packages" / "dep.py", "def dep(): pass\n")
+
+
+def _build(root: Path, db_path: Path, **kwargs) -> SymbolIndex:
+    files = FileIndex(str(root), cache_path=db_path.with_suffix(".json"))
+    files.update()
+    index = SymbolIndex(str(root), db_path)
+    index.update(files.paths(), **kwargs)
+    return index
+
+
+def test_index_finds_definitions_across_files(tmp_path: Path):
+    root = tmp_path / "project"
+    _project(root)
+    index = _build(root, tmp_path / "symbols.db")
+
+    assert len(index) == 4  # broken.py is indexed without symbols
+    [user] = index.find("User")
+    assert user.path == str(root / "app" / "models.py")
+    assert (user.kind, user.row, user.column) == ("class", 0, 6)
+    # Top-level definitions come before methods
+    assert [(s.qualname, s.kind) for s in index.find("save")] == [
+        ("save", "function"),
+        ("User.save", "method"),
+    ]
+    assert index.find("dep") == []
+    assert index.find("not_python") == []
+
+
+def test_index_updates_incrementally(tmp_path: Path):
+    root = tmp_path / "project"
+    _project(root)
+    db_path = tmp_path / "symbols.db"
+    index = _build(root, db_path)
+    files = FileIndex(str(root), cache_path=tmp_path / "files.json")
+    files.update()
+
+    # Nothing changed: nothing is parsed again, even by a new instance
+    assert SymbolIndex(str(root), db_path).update(files.paths()) == 0
+
+    views = root / "app" / "views.py"
+    _write(views, "def render_page():\n    pass\n")
+    _bump_mtime(views)
+    assert index.update_files([str(views)]) == 1
+    assert index.find("render") == []
+    assert index.find("render_page")[0].path == str(views)
+
+    # Watcher events: a new file and a removed directory
+    _write(root / "app" / "forms.py", "class Form:\n    pass\n")
+    for path in (root / "scripts").iterdir():
+        path.unlink()
+    (root / "scripts").rmdir()
+    assert index.update_directories([str(root / "app"), str(root)]) == 2
+    assert index.find("Form")[0].path == str(root / "app" / "forms.py")
+    assert [s.qualname for s in index.find("save")] == ["User.save"]
+
+
+def test_parallel_build_matches_serial(tmp_path: Path, monkeypatch):
+    root = tmp_path / "project"
+    for i in range(12):
+        _write(root / f"pkg{i % 3}" / f"mod{i}.py", f"def func_{i}():\n    pass\n")
+    monkeypatch.setattr(symbol_index, "PARALLEL_THRESHOLD", 4)
+    monkeypatch.setattr(symbol_index, "_PARSE_BATCH", 5)
+    index = _build(root, tmp_path / "symbols.db", workers=2)
+
+    assert len(index) == 12
+    assert index.find("func_7")[0].path == str(root / "pkg1" / "mod7.py")
+
+
+def test_lookup_is_fast_on_large_index(tmp_path: Path):
+    root = tmp_path / "project"
+    root.mkdir()
+    index = SymbolIndex(str(root), tmp_path / "symbols.db")
+    symbols = [(f"name_{i}", "function", i, 4, None) for i in range(20_000)]
+    with index._connect() as conn:
+        for n in range(20):
+            cursor = conn.execute(
+                "INSERT INTO files (path, mtime_ns, size) VALUES (?, 0, 0)",
+                (f"mod{n}.py",),
+            )
+            conn.executemany(
+                "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)",
+                [(cursor.lastrowid, *symbol) for symbol in symbols[n::20]],
+            )
+
+    start = time.perf_counter()
+    for i in range(0, 20_000, 200):
+        assert len(index.find(f"name_{i}")) == 1
+    assert (time.perf_counter() - start) / 100 < 0.005
+
+
+def test_is_indexed_file():
+    assert is_indexed_file("pkg/mod.py")
+    assert is_indexed_file("stubs/mod.pyi")
+    assert not is_indexed_file("pkg/data.json")
+    assert not is_indexed_file("venv/lib/python3.11/site-packages/six.py")
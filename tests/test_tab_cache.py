@@ -0,0 +1,60 @@
+import os
+
+from ticked.ui.views.nest import EditorTab
+from ticked.utils.tab_cache import TabCache, format_size
+
+
+def make_tab(name, size):
+    tab = EditorTab(name, "x" * size)
+    tab.undo_stack.append({"text": "y" * size, "cursor": (1, 2), "scroll": (0, 3)})
+    return tab
+
+
+def test_format_size():
+    assert format_size(512) == "512B"
+    assert format_size(1536) == "1.5K"
+    assert format_size(64 * 1024 * 1024) == "64.0M"
+
+
+def test_enforce_spills_least_recently_used(tmp_path):
+    cache = TabCache(budget=5000, root=tmp_path)
+    tabs = [make_tab(f"tab{i}.py", 1000) for i in range(4)]
+    for tab in tabs:
+        cache.touch(tab)
+    # Reactivating the first tab makes the second the least recently used
+    cache.touch(tabs[0])
+
+    spilled = cache.enforce(tabs, tabs[3])
+
+    assert spilled == [tabs[1], tabs[2]]
+    assert tabs[1].spilled and tabs[1].memory_usage() == 0
+    assert not tabs[0].spilled and not tabs[3].spilled
+    assert cache.resident_memory <= cache.budget
+    assert len(os.listdir(cache.directory)) == 2
+
+
+def test_spilled_tab_reloads_transparently(tmp_path):
+    cache = TabCache(budget=0, root=tmp_path)
+    tab = make_tab("a.py", 10)
+    tab.redo_stack.append({"text": "redo", "cursor": (0, 0), "scroll": (0, 0)})
+    active = make_tab("b.py", 10)
+
+    cache.enforce([tab, active], active)
+    assert tab.spilled
+
+    assert tab.content == "x" * 10
+    assert not tab.spilled
+    assert tab.undo_stack == [{"text": "y" * 10, "cursor": (1, 2), "scroll": (0, 3)}]
+    assert tab.redo_stack[0]["text"] == "redo"
+    assert os.listdir(cache.directory) == []
+
+
+def test_release_and_clear(tmp_path):
+    cache = TabCache(budget=0, root=tmp_path)
+    tab = make_tab("a.py", 10)
+    cache.enforce([tab], None)
+    tab.release()
+    assert os.listdir(cache.directory) == []
+
+    cache.clear()
+    assert not cache.directory.exists()
@@ -0,0 +1,82 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ticked.utils.text_search import (
+    compile_query,
+    iter_files,
+    literal_needle,
+    search_text,
+    search_tree,
+)
+
+
+def make_tree(root):
+    (root / "src").mkdir()
+    (root / "build").mkdir()
+    (root / ".hidden").mkdir()
+    (root / ".gitignore").write_text("build/\n*.log\n")
+    (root / "src" / "app.py").write_text("def main():\n\n    return 'Needle'\n")
+    (root / "src" / "notes.txt").write_text("needle one\nneedle two\nhay\n")
+    (root / "src" / "image.png").write_bytes(b"\x89PNG needle")
+    (root / "src" / "data.bin").write_bytes(b"needle\x00\x01")
+    (root / "build" / "out.txt").write_text("needle\n")
+    (root / "debug.log").write_text("needle\n")
+    (root / ".hidden" / "secret.txt").write_text("needle\n")
+
+
+def test_iter_files_honors_gitignore_and_hidden(tmp_path):
+    make_tree(tmp_path)
+    names = sorted(
+        os.path.relpath(path, tmp_path) for path, _ in iter_files(str(tmp_path))
+    )
+    assert names == ["src/app.py", "src/data.bin", "src/image.png", "src/notes.txt"]
+
+
+def test_search_text_reports_one_match_per_line():
+    regex = compile_query("ab")
+    matches = search_text("f", "ab ab\nxx\n  AB\n", regex, limit=10)
+    assert [(m.line, m.column, m.length, m.preview) for m in matches] == [
+        (0, 0, 2, "ab ab"),
+        (2, 2, 2, "  AB"),
+    ]
+    assert len(search_text("f", "ab\nab\nab\n", regex, limit=2)) == 2
+
+
+def test_smart_case_and_literal_needle():
+    assert compile_query("needle").flags & re.IGNORECASE
+    assert not compile_query("Needle").flags & re.IGNORECASE
+    assert literal_needle(compile_query("Foo.bar")) == b"Foo.bar"
+    assert literal_needle(compile_query("foo")) == b"foo"
+    assert literal_needle(compile_query(r"fo+", regex=True)) is None
+
+
+def test_search_tree_streams_matches(tmp_path):
+    make_tree(tmp_path)
+    batches = []
+    stats = search_tree(str(tmp_path), compile_query("needle"), batches.append)
+
+    found = sorted(
+        (m.path[len(str(tmp_path)) + 1 :], m.line) for batch in batches for m in batch
+    )
+    assert found == [("src/app.py", 2), ("src/notes.txt", 0), ("src/notes.txt", 1)]
+    assert stats.matches == 3
+    # Binary files are sniffed and skipped
+    assert stats.files == 2
+    assert not stats.truncated
+
+
+def test_search_tree_limit_and_executor(tmp_path):
+    make_tree(tmp_path)
+    batches = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stats = search_tree(
+            str(tmp_path),
+            compile_query("needle"),
+            batches.append,
+            max_matches=1,
+            workers=2,
+            executor=executor,
+        )
+    assert stats.truncated
+    assert sum(len(batch) for batch in batches) == 1
@@ -0,0 +1,37 @@
+import random
+
+from textual.document._document import Document
+
+from ticked.utils.text_stats import TextStats, count_line_words, count_words
+
+
+def test_counts_from_scratch():
+    stats = TextStats("one two\n  three\n\nfour")
+    assert stats.words == 4
+    assert stats.chars == len("one two\n  three\n\nfour")
+
+
+def test_incremental_counts_match_recount():
+    random.seed(3)
+    document = Document("alpha beta\ngamma\n\ndelta epsilon zeta")
+    stats = TextStats(document.text)
+    pieces = ["", " ", "x", "word ", "\n", "a b\nc", "  \n  "]
+    for _ in range(500):
+        lines = document.lines
+        start_row = random.randrange(len(lines))
+        end_row = random.randrange(start_row, len(lines))
+        start = (start_row, random.randint(0, len(lines[start_row])))
+        end = (end_row, random.randint(0, len(lines[end_row])))
+        if end < start:
+            start, end = end, start
+        inserted = random.choice(pieces)
+
+        old_words = count_line_words(lines[start[0] : end[0] + 1])
+        result = document.replace_range(start, end, inserted)
+        new_words = count_line_words(
+            document.lines[start[0] : result.end_location[0] + 1]
+        )
+        stats.apply_edit(result.replaced_text, inserted, old_words, new_words)
+
+        assert stats.words == count_words(document.text)
+        assert stats.chars == len(document.text)
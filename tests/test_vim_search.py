@@ -0,0 +1,103 @@
+import pytest
+
+from ticked.utils.vim_search import (
+    BufferSearch,
+    LineIndex,
+    compile_pattern,
+    compile_replacement,
+    parse_range,
+    parse_substitute,
+    substitute,
+)
+
+
+def test_line_index_maps_offsets_and_locations():
+    index = LineIndex(["ab", "", "cde"])
+    assert index.starts == [0, 3, 4]
+    assert index.offset((2, 1)) == 5
+    assert index.location(5) == (2, 1)
+    assert index.location(3) == (1, 0)
+
+
+def test_compile_pattern_case_and_word_boundaries():
+    assert compile_pattern("foo").search("FOO")
+    assert not compile_pattern("Foo").search("foo")
+    assert not compile_pattern("foo\\C").search("FOO")
+    assert compile_pattern("Foo\\c").search("foo")
+    word = compile_pattern("\\<cat\\>")
+    assert word.search("a cat sat")
+    assert not word.search("concatenate")
+
+
+def test_compile_replacement_expands_groups_and_escapes():
+    match = compile_pattern(r"(\w+)=(\w+)").search("key=value")
+    assert compile_replacement(r"\2=\1")(match) == "value=key"
+    assert compile_replacement("<&>")(match) == "<key=value>"
+    assert compile_replacement(r"\&\t\r")(match) == "&\t\n"
+
+
+def test_buffer_search_wraps_in_both_directions():
+    lines = ["foo", "bar foo", "foo"]
+    search = BufferSearch("foo")
+    result = search.find(lines, (0, 0))
+    assert result.location == (1, 4)
+    assert (result.index, result.total, result.wrapped) == (2, 3, False)
+    assert search.find(lines, (2, 0)).location == (0, 0)
+    assert search.find(lines, (2, 0)).wrapped
+    assert search.find(lines, (1, 4), reverse=True).location == (0, 0)
+    assert search.find(lines, (0, 0), count=2).location == (2, 0)
+
+    backward = BufferSearch("foo", backward=True)
+    assert backward.find(lines, (0, 0)).location == (2, 0)
+    assert backward.find(lines, (0, 0), reverse=True).location == (1, 4)
+    assert BufferSearch("missing").find(lines, (0, 0)) is None
+
+
+def test_parse_substitute():
+    assert parse_substitute("%s/a/b/g") == ("%", "a", "b", "g")
+    assert parse_substitute("s#a/b#c#") == ("", "a/b", "c", "")
+    assert parse_substitute(r"1,3s/a\/b/c") == ("1,3", "a/b", "c", "")
+    assert parse_substitute("set number") is None
+    assert parse_substitute("w") is None
+
+
+def test_parse_range():
+    assert parse_range("", 4, 9) == (4, 4)
+    assert parse_range("%", 4, 9) == (0, 9)
+    assert parse_range("2,5", 0, 9) == (1, 4)
+    assert parse_range(".,$", 3, 9) == (3, 9)
+    assert parse_range(".,.+2", 3, 9) == (3, 5)
+    assert parse_range("'<,'>", 0, 9, (2, 6)) == (2, 6)
+    with pytest.raises(ValueError):
+        parse_range("1,20", 0, 9)
+    with pytest.raises(ValueError):
+        parse_range("'<,'>", 0, 9)
+
+
+def test_substitute_first_or_all_matches_per_line():
+    lines = ["a a", "b", "a a a", "a"]
+    result = substitute(lines, 0, 3, compile_pattern("a"), "x")
+    assert result.text == "x a\nb\nx a a\nx"
+    assert (result.first_row, result.last_row) == (0, 3)
+    assert (result.count, result.lines, result.cursor_row) == (3, 3, 3)
+
+    # Only the changed rows are part of the result
+    result = substitute(lines, 1, 2, compile_pattern("a"), "x", replace_all=True)
+    assert result.text == "x x x"
+    assert (result.first_row, result.last_row) == (2, 2)
+    assert (result.count, result.lines, result.cursor_row) == (3, 1, 2)
+
+    assert substitute(lines, 1, 1, compile_pattern("a"), "x") is None
+
+
+def test_substitute_reports_row_after_inserted_lines():
+    result = substitute(["a,b", "c,d", "e"], 0, 2, compile_pattern(","), r"\r")
+    assert result.text == "a\nb\nc\nd"
+    assert (result.first_row, result.last_row) == (0, 1)
+    assert result.cursor_row == 2
+
+
+def test_substitute_across_line_breaks():
+    result = substitute(["a", "b", "c", "d"], 0, 3, compile_pattern(r"b\nc"), "bc")
+    assert result.text == "bc"
+    assert (result.first_row, result.last_row, result.cursor_row) == (1, 2, 1)
@@ -17,12 +17,16 @@ from .core.database.ticked_db import CalendarDB
 from .ui.screens.over_arching import HomeScreen
 from .ui.views.nest import NestView, NewFileDialog
 from .ui.views.pomodoro import PomodoroView
+from .utils.async_spotify import AsyncSpotify
+from .utils.playback_poller import PlaybackPoller
 
 
 class Ticked(App):
     CSS_PATH = str(Path(__file__).parent / "config" / "theme.tcss")
     SCREENS = {"home": HomeScreen}
     TITLE = "TICKED"
+    # Ctrl+P is quick open in the Nest editor
+    COMMAND_PALETTE_BINDING = "ctrl+shift+p"
     BINDINGS = [
         Binding("q", "quit", "Quit", show=True),
         Binding("up", "focus_previous", "Move Up", show=True),
@@ -41,6 +45,9 @@ class Ticked(App):
             self.theme = saved_theme
         self.package_dir = Path(__file__).parent
         self.pomodoro_settings = self.load_settings()
+        # Shared by every widget that shows the Spotify playback state
+        self._async_spotify = None
+        self.playback_poller = PlaybackPoller(self.get_async_spotify)
 
     async def check_for_updates(self) -> None:
         try:
@@ -74,6 +81,15 @@ class Ticked(App):
             return self._spotify_auth.spotify_client
         return None
 
+    def get_async_spotify(self):
+        """The non-blocking facade of the Spotify client, shared app-wide."""
+        client = self.get_spotify_client()
+        if client is None:
+            return None
+        if self._async_spotify is None or self._async_spotify.client is not client:
+            self._async_spotify = AsyncSpotify(client)
+        return self._async_spotify
+
     def set_spotify_auth(self, auth):
         self._spotify_auth = auth
 
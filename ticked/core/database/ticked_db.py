@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import os
 import sqlite3
 from datetime import datetime
@@ -72,6 +73,21 @@ class CalendarDB:
 
                 conn.commit()
 
+            # Tasks imported from other services (e.g. Canvas assignments)
+            # are keyed by their source and id there
+            cursor.execute("PRAGMA table_info(tasks)")
+            columns = {col[1] for col in cursor.fetchall()}
+            for column in ("source", "external_id"):
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE tasks ADD COLUMN {column} TEXT")
+            cursor.execute(
+                """
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_external
+                ON tasks (source, external_id)
+            """
+            )
+            conn.commit()
+
     def _create_tables(self) -> None:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
@@ -88,7 +104,9 @@ class CalendarDB:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     completed BOOLEAN DEFAULT 0,
                     in_progress BOOLEAN DEFAULT 0,
-                    caldav_uid TEXT
+                    caldav_uid TEXT,
+                    source TEXT,
+                    external_id TEXT
                 )
             """
             )
@@ -147,6 +165,85 @@ class CalendarDB:
             """
             )
 
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS editor_session (
+                    position INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    cursor_row INTEGER DEFAULT 0,
+                    cursor_column INTEGER DEFAULT 0,
+                    scroll_x INTEGER DEFAULT 0,
+                    scroll_y INTEGER DEFAULT 0,
+                    active BOOLEAN DEFAULT 0
+                )
+            """
+            )
+
+            # Offline copy of Canvas data. Rows stay after they drop out of
+            # what Canvas returns, so announcements keep their history
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS canvas_courses (
+                    id INTEGER PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    name TEXT,
+                    code TEXT,
+                    grade TEXT
+                )
+            """
+            )
+
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS canvas_assignments (
+                    id INTEGER PRIMARY KEY,
+                    course_id INTEGER,
+                    course TEXT,
+                    name TEXT,
+                    due_at TEXT NOT NULL,
+                    status TEXT
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_canvas_assignments_due
+                ON canvas_assignments (due_at)
+            """
+            )
+
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS canvas_announcements (
+                    id INTEGER PRIMARY KEY,
+                    course_id INTEGER,
+                    course_name TEXT,
+                    title TEXT,
+                    message TEXT,
+                    posted_at TEXT NOT NULL
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_canvas_announcements_posted
+                ON canvas_announcements (posted_at)
+            """
+            )
+
+            # When each Canvas resource was fetched, the validators of its
+            # endpoints and the settings it was fetched with
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS canvas_sync (
+                    resource TEXT PRIMARY KEY,
+                    fetched_at TEXT NOT NULL,
+                    validators TEXT,
+                    params TEXT
+                )
+            """
+            )
+
             conn.commit()
 
     def add_task(
@@ -283,6 +380,64 @@ class CalendarDB:
             cursor.execute(query, tuple(uids))
             conn.commit()
 
+    def upsert_external_tasks(self, source: str, tasks: List[Dict[str, Any]]) -> int:
+        """Insert or update tasks imported from ``source``, keyed by ``external_id``.
+
+        All tasks are written in one transaction, and tasks whose fields
+        haven't changed are left alone. A task completed locally stays
+        completed. Returns the number of tasks inserted or updated.
+        """
+        if not tasks:
+            return 0
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO tasks
+                    (title, description, due_date, start_time, end_time,
+                     completed, source, external_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source, external_id) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    due_date = excluded.due_date,
+                    start_time = excluded.start_time,
+                    end_time = excluded.end_time,
+                    completed = MAX(tasks.completed, excluded.completed)
+                WHERE tasks.title IS NOT excluded.title
+                    OR tasks.description IS NOT excluded.description
+                    OR tasks.due_date IS NOT excluded.due_date
+                    OR tasks.start_time IS NOT excluded.start_time
+                    OR tasks.end_time IS NOT excluded.end_time
+                    OR tasks.completed < excluded.completed
+            """,
+                [
+                    (
+                        task["title"],
+                        task.get("description", ""),
+                        task["due_date"],
+                        task["start_time"],
+                        task["end_time"],
+                        int(task.get("completed", False)),
+                        source,
+                        str(task["external_id"]),
+                    )
+                    for task in tasks
+                ],
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def get_external_tasks(self, source: str) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM tasks WHERE source = ? ORDER BY due_date, start_time",
+                (source,),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
     def save_notes(self, date: str, content: str) -> bool:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
@@ -499,6 +654,284 @@ class CalendarDB:
             result = cursor.fetchone()
             return result[0] if result else None
 
+    def save_tab_memory_budget(self, budget: int) -> None:
+        """Save the editor's tab memory budget in bytes."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('tab_memory_budget', ?)",
+                (str(budget),),
+            )
+            conn.commit()
+
+    def get_tab_memory_budget(self) -> Optional[int]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM settings WHERE key = 'tab_memory_budget'")
+            result = cursor.fetchone()
+            return int(result[0]) if result else None
+
+    def save_tree_ignore_patterns(self, patterns: List[str]) -> None:
+        """Save the user's ignore patterns for the Nest file tree."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('tree_ignore_patterns', ?)",
+                (json.dumps(patterns),),
+            )
+            conn.commit()
+
+    def get_tree_ignore_patterns(self) -> Optional[List[str]]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT value FROM settings WHERE key = 'tree_ignore_patterns'"
+            )
+            result = cursor.fetchone()
+            return json.loads(result[0]) if result else None
+
+    def save_canvas_settings(self, settings: Dict[str, Any]) -> None:
+        """Save which Canvas courses and announcements are fetched."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('canvas_settings', ?)",
+                (json.dumps(settings),),
+            )
+            conn.commit()
+
+    def get_canvas_settings(self) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM settings WHERE key = 'canvas_settings'")
+            result = cursor.fetchone()
+            return json.loads(result[0]) if result else None
+
+    def get_canvas_sync(self, resource: str) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT fetched_at, validators, params FROM canvas_sync WHERE resource = ?",
+                (resource,),
+            )
+            result = cursor.fetchone()
+            if not result:
+                return None
+            return {
+                "fetched_at": result[0],
+                "validators": json.loads(result[1] or "{}"),
+                "params": json.loads(result[2] or "null"),
+            }
+
+    def touch_canvas_sync(self, resource: str) -> None:
+        """Mark a Canvas resource as just revalidated."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE canvas_sync SET fetched_at = ? WHERE resource = ?",
+                (datetime.now().isoformat(), resource),
+            )
+            conn.commit()
+
+    @staticmethod
+    def _save_canvas_sync(
+        cursor: sqlite3.Cursor,
+        resource: str,
+        validators: Dict[str, Any],
+        params: Optional[Dict[str, Any]],
+    ) -> None:
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO canvas_sync (resource, fetched_at, validators, params)
+            VALUES (?, ?, ?, ?)
+        """,
+            (resource, datetime.now().isoformat(), json.dumps(validators), json.dumps(params)),
+        )
+
+    def save_canvas_courses(
+        self,
+        courses: List[Dict[str, Any]],
+        validators: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Replace the Canvas courses, in display order."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM canvas_courses")
+            cursor.executemany(
+                """
+                INSERT INTO canvas_courses (id, position, name, code, grade)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                [
+                    (c["id"], position, c.get("name"), c.get("code"), c.get("grade"))
+                    for position, c in enumerate(courses)
+                ],
+            )
+            self._save_canvas_sync(cursor, "courses", validators, params)
+            conn.commit()
+
+    def get_canvas_courses(self) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, name, code, grade FROM canvas_courses ORDER BY position"
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def save_canvas_assignments(
+        self,
+        assignments: List[Dict[str, Any]],
+        validators: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None,
+        due_after: str = "",
+    ) -> None:
+        """Store the upcoming Canvas assignments.
+
+        ``assignments`` is every assignment due after ``due_after``; ones
+        due after it that aren't among them were removed on Canvas.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM canvas_assignments WHERE due_at > ?", (due_after,)
+            )
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO canvas_assignments
+                    (id, course_id, course, name, due_at, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        a["id"],
+                        a.get("course_id"),
+                        a.get("course"),
+                        a.get("name"),
+                        a["due_at"],
+                        a.get("status"),
+                    )
+                    for a in assignments
+                ],
+            )
+            self._save_canvas_sync(cursor, "todos", validators, params)
+            conn.commit()
+
+    def get_canvas_assignments(self, due_after: str) -> List[Dict[str, Any]]:
+        """Assignments of the current courses due after ``due_after``, soonest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, course_id, course, name, due_at, status
+                FROM canvas_assignments
+                WHERE due_at > ?
+                    AND course_id IN (SELECT id FROM canvas_courses)
+                ORDER BY due_at
+            """,
+                (due_after,),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def save_canvas_announcements(
+        self,
+        announcements: List[Dict[str, Any]],
+        validators: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None,
+        posted_since: str = "",
+    ) -> None:
+        """Store Canvas announcements, keeping older ones as history.
+
+        ``announcements`` is every announcement posted since
+        ``posted_since``; ones since then that aren't among them were
+        deleted on Canvas.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM canvas_announcements WHERE posted_at >= ?",
+                (posted_since,),
+            )
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO canvas_announcements
+                    (id, course_id, course_name, title, message, posted_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        a["id"],
+                        a.get("course_id"),
+                        a.get("course_name"),
+                        a.get("title"),
+                        a.get("message"),
+                        a["posted_at"],
+                    )
+                    for a in announcements
+                ],
+            )
+            self._save_canvas_sync(cursor, "announcements", validators, params)
+            conn.commit()
+
+    def get_canvas_announcements(
+        self, limit: int, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """A page of the announcements of the current courses, newest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, course_id, course_name, title, message, posted_at
+                FROM canvas_announcements
+                WHERE course_id IN (SELECT id FROM canvas_courses)
+                ORDER BY posted_at DESC, id DESC
+                LIMIT ? OFFSET ?
+            """,
+                (limit, offset),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def save_editor_session(self, tabs: List[Dict[str, Any]]) -> None:
+        """Replace the saved Nest editor tabs with ``tabs``, in tab order."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM editor_session")
+            cursor.executemany(
+                """
+                INSERT INTO editor_session
+                    (position, path, cursor_row, cursor_column, scroll_x, scroll_y, active)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        position,
+                        tab["path"],
+                        tab["cursor_row"],
+                        tab["cursor_column"],
+                        tab["scroll_x"],
+                        tab["scroll_y"],
+                        tab["active"],
+                    )
+                    for position, tab in enumerate(tabs)
+                ],
+            )
+            conn.commit()
+
+    def get_editor_session(self) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT path, cursor_row, cursor_column, scroll_x, scroll_y, active
+                FROM editor_session ORDER BY position
+            """
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
     def save_notes_view_mode(self, date: str, view_mode: str) -> bool:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
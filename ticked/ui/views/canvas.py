@@ -1,19 +1,42 @@
 import asyncio
 import json
-import re
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
 
-from bs4 import BeautifulSoup
 from canvasapi import Canvas
+from canvasapi.requester import Requester
+from canvasapi.util import get_institution_url
 from textual.app import ComposeResult
-from textual.containers import Grid, Vertical
+from textual.containers import Grid, Vertical, VerticalScroll
 from textual.message import Message
 from textual.reactive import reactive
 from textual.widget import NoMatches, Widget
 from textual.widgets import Button, DataTable, Input, LoadingIndicator, Markdown, Static
 
+from ...utils.canvas_cache import SyncState, Validators, conditional_headers
+from ...utils.html_text import html_to_text
+
+T = TypeVar("T")
+
+# Per-course requests (assignments, announcements) in flight at once
+MAX_CONCURRENT_REQUESTS = 6
+
+# Conditional requests ask for big pages so that a change anywhere in a
+# list, not just at its start, shows in the validators
+_REVALIDATE_PAGE_SIZE = 100
+
+CANVAS_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Source of the tasks created for Canvas assignments
+CANVAS_TASK_SOURCE = "canvas"
+
+COURSE_INCLUDES = ["total_scores", "current_grading_period_scores", "grades"]
+
 
 class CanvasLoginMessage(Message):
     def __init__(self, url: str, token: str) -> None:
@@ -87,217 +110,462 @@ class CanvasLogin(Widget):
             self.notify(f"Failed to save credentials: {str(e)}", severity="error")
 
 
-class AnnouncementsList(Markdown):
+class AnnouncementItem(Markdown):
+    """One rendered announcement."""
+
+    def __init__(self, key: tuple, source: str) -> None:
+        super().__init__(source)
+        self.key = key
+        # Markdown.source is empty until the widget is mounted
+        self.rendered_source = source
+
+    def set_source(self, source: str) -> None:
+        if source != self.rendered_source:
+            self.rendered_source = source
+            self.update(source)
+
+
+class AnnouncementsList(VerticalScroll):
     """
-    This class turns a list of announcements into a single Markdown string
-    and updates the Markdown widget accordingly.
+    Announcements, newest first, with one Markdown widget each.
+
+    Cleaned bodies are memoized by announcement id and posted_at, and
+    populate() only mounts widgets for new announcements and removes the
+    ones that are gone, so a refresh doesn't re-render the whole list.
+    Older announcements are rendered a page at a time as the list is
+    scrolled to its end, and once those passed to populate() run out, more
+    are read with ``fetch_page(limit, offset)`` if it is set.
     """
 
+    PAGE_SIZE = 10
+    # Lines from the end of the list at which the next page is rendered
+    LOAD_MARGIN = 5
+    # Cleaned bodies kept in memory
+    MEMO_SIZE = 512
+
     def __init__(self) -> None:
-        super().__init__("")
-        self.auto_scroll = True
+        super().__init__()
+        self._announcements: List[Dict] = []
+        self._shown = 0
+        self._bodies: "OrderedDict[tuple, str]" = OrderedDict()
+        self.fetch_page: Optional[Callable[[int, int], List[Dict]]] = None
+        self._exhausted = False
 
-    def clean_html(self, html_content: str) -> str:
-        """Convert basic HTML to plain text (inserting newlines for <br>, <p>, <div>, etc.)."""
-        if not html_content:
-            return ""
+    def on_mount(self) -> None:
+        self.watch(self, "scroll_y", self._on_scroll, init=False)
+
+    @property
+    def shown(self) -> int:
+        """Number of announcements rendered."""
+        return self._shown
 
-        soup = BeautifulSoup(html_content, "html.parser")
+    def clean_html(self, html_content: str) -> str:
+        """Convert HTML to Markdown text, keeping paragraphs, links and lists."""
+        return html_to_text(html_content)
+
+    @staticmethod
+    def announcement_key(announcement: Dict) -> tuple:
+        # Announcements cached before ids were kept fall back to their title
+        identity = announcement.get("id") or (
+            announcement.get("title"),
+            announcement.get("course_name"),
+        )
+        return identity, announcement.get("posted_at", "")
+
+    def _body(self, key: tuple, html_message: str) -> str:
+        body = self._bodies.get(key)
+        if body is None:
+            body = self.clean_html(html_message)
+            self._bodies[key] = body
+            while len(self._bodies) > self.MEMO_SIZE:
+                self._bodies.popitem(last=False)
+        else:
+            self._bodies.move_to_end(key)
+        return body
 
-        for tag in soup.find_all(["br", "p", "div"]):
-            tag.replace_with("\n" + tag.get_text() + "\n")
+    def render_announcement(self, announcement: Dict) -> str:
+        title = announcement.get("title", "Untitled")
+        html_message = announcement.get("message", "No content")
+        posted_at = announcement.get("posted_at", "")
+        course_name = announcement.get("course_name", "Unknown Course")
 
-        text = soup.get_text()
+        wrapped_message = self._body(self.announcement_key(announcement), html_message)
 
-        text = re.sub(r"\n\s*\n", "\n\n", text)
-        text = re.sub(r"^\s+|\s+$", "", text)
-        return text
+        if posted_at:
+            try:
+                dt = datetime.strptime(posted_at, "%Y-%m-%dT%H:%M:%SZ")
+                posted_at = dt.strftime("%B %d, %Y")
+            except:
+                posted_at = "Unknown date"
 
-    def wrap_text(self, text: str, width: int = 80) -> str:
-        """
-        Wrap text to fit within specified width.
-        This is optional if you want to limit line length in the Markdown display.
-        """
-        words = text.split()
-        lines = []
-        current_line = []
-        current_length = 0
-
-        for word in words:
-            if current_length + len(word) + 1 <= width:
-                current_line.append(word)
-                current_length += len(word) + 1
-            else:
-                if current_line:
-                    lines.append(" ".join(current_line))
-                current_line = [word]
-                current_length = len(word)
+        markdown_str = f"# {title}\n\n"
+        markdown_str += f"**Posted on:** {posted_at}\n\n"
+        markdown_str += f"**Course:** {course_name}\n\n"
 
-        if current_line:
-            lines.append(" ".join(current_line))
+        markdown_str += "## Announcement\n\n"
+        markdown_str += f"{wrapped_message}\n\n"
 
-        return "\n".join(lines)
+        markdown_str += "---\n\n"
+        return markdown_str
 
     def populate(self, announcements: List[Dict]) -> None:
         """
-        Convert all announcements into a single Markdown string, then update
-        this Markdown widget to render them.
-        """
-        markdown_str = ""
+        Show ``announcements``, reusing the widgets of those already shown.
 
-        for announcement in announcements:
-            title = announcement.get("title", "Untitled")
-            html_message = announcement.get("message", "No content")
-            posted_at = announcement.get("posted_at", "")
-            course_name = announcement.get("course_name", "Unknown Course")
-
-            cleaned_message = self.clean_html(html_message)
-            wrapped_message = self.wrap_text(cleaned_message, width=80)
+        As many announcements stay rendered as before, plus any new ones
+        above them, and at least a page.
+        """
+        rendered = {item.key: item for item in self.query(AnnouncementItem)}
+        self._announcements = list(announcements)
+        self._exhausted = False
+        keys = [self.announcement_key(a) for a in self._announcements]
+
+        shown = self.PAGE_SIZE
+        for index, key in enumerate(keys):
+            if key in rendered:
+                shown = max(shown, index + 1)
+        self._shown = min(shown, len(keys))
+
+        wanted = set(keys[: self._shown])
+        gone = [item for key, item in rendered.items() if key not in wanted]
+        if gone:
+            self.remove_children(gone)
+
+        # Runs of new announcements go in front of the next one already shown
+        pending = []
+        for announcement, key in zip(self._announcements, keys[: self._shown]):
+            source = self.render_announcement(announcement)
+            item = rendered.get(key)
+            if item is None:
+                pending.append(AnnouncementItem(key, source))
+                continue
+            if pending:
+                self.mount_all(pending, before=item)
+                pending = []
+            item.set_source(source)
+        if pending:
+            self.mount_all(pending)
+
+    def load_more(self) -> None:
+        """Render the next page of older announcements."""
+        if self._shown >= len(self._announcements):
+            if self.fetch_page is None or self._exhausted:
+                return
+            older = self.fetch_page(self.PAGE_SIZE, len(self._announcements))
+            if not older:
+                self._exhausted = True
+                return
+            self._announcements.extend(older)
+        page = self._announcements[self._shown : self._shown + self.PAGE_SIZE]
+        self._shown += len(page)
+        self.mount_all(
+            AnnouncementItem(self.announcement_key(a), self.render_announcement(a))
+            for a in page
+        )
 
-            if posted_at:
-                try:
-                    dt = datetime.strptime(posted_at, "%Y-%m-%dT%H:%M:%SZ")
-                    posted_at = dt.strftime("%B %d, %Y")
-                except:
-                    posted_at = "Unknown date"
+    def _on_scroll(self, scroll_y: float) -> None:
+        if scroll_y >= self.max_scroll_y - self.LOAD_MARGIN:
+            self.load_more()
 
-            markdown_str += f"# {title}\n\n"
-            markdown_str += f"**Posted on:** {posted_at}\n\n"
-            markdown_str += f"**Course:** {course_name}\n\n"
 
-            markdown_str += "## Announcement\n\n"
-            markdown_str += f"{wrapped_message}\n\n"
+class CanvasSettings(NamedTuple):
+    """Which courses and announcements the Canvas view fetches."""
 
-            markdown_str += "---\n\n"
+    # Only courses in this enrollment term; None for every current term
+    enrollment_term_id: Optional[int] = None
+    # Only courses whose code contains this, e.g. a term code like "2501"
+    course_code: str = ""
+    # Items per page of Canvas list requests (Canvas allows up to 100)
+    per_page: int = 50
+    # Announcements posted within this many days
+    announcement_days: int = 120
 
-        self.update(markdown_str)
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "CanvasSettings":
+        return cls(**{k: v for k, v in (data or {}).items() if k in cls._fields})
 
 
 class CanvasAPI:
-    def __init__(self):
+    def __init__(self, settings: Optional[CanvasSettings] = None):
         self.canvas = None
+        # Our own requester for the conditional GETs canvasapi can't express
+        self.requester = None
+        self.settings = settings or CanvasSettings()
+        # Courses enumerated once per refresh and shared by all fetchers
+        self._courses = None
+        self._courses_lock = threading.Lock()
+        # Bounds per-course requests across fetchers running side by side
+        self._requests = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+    def begin_refresh(self) -> None:
+        """Forget the course list so the next fetch enumerates it again."""
+        with self._courses_lock:
+            self._courses = None
+
+    def _enrolled_courses(self) -> List:
+        # The fetchers run in parallel threads; the first one to get here
+        # paginates the course list and the others wait for it
+        with self._courses_lock:
+            if self._courses is None:
+                # Only active enrollments: concluded courses of past terms
+                # are never paginated
+                self._courses = [
+                    course
+                    for course in self.canvas.get_courses(
+                        enrollment_type="student",
+                        enrollment_state="active",
+                        include=COURSE_INCLUDES,
+                        state=["available"],
+                        per_page=self.settings.per_page,
+                    )
+                    if self._wanted(course)
+                ]
+            return self._courses
+
+    def _wanted(self, course) -> bool:
+        # The courses endpoint of a user can't filter by term, but every
+        # course carries its term id
+        term = self.settings.enrollment_term_id
+        if term is not None and getattr(course, "enrollment_term_id", None) != term:
+            return False
+        code = str(getattr(course, "course_code", "") or "")
+        return self.settings.course_code in code
+
+    def _map_bounded(self, call: Callable[..., T], items: List) -> List[T]:
+        """Run ``call`` for every item concurrently, keeping their order."""
+        if not items:
+            return []
+
+        def bounded(item) -> T:
+            with self._requests:
+                return call(item)
+
+        workers = min(MAX_CONCURRENT_REQUESTS, len(items))
+        with ThreadPoolExecutor(workers, thread_name_prefix="canvas") as pool:
+            return list(pool.map(bounded, items))
+
+    def _for_each_course(self, courses: List, fetch: Callable[..., List[T]]) -> List[T]:
+        return [item for items in self._map_bounded(fetch, courses) for item in items]
+
+    def endpoints(
+        self, resource: str, course_ids: List[int]
+    ) -> Dict[str, List[tuple]]:
+        """The Canvas endpoints a resource is built from, with their parameters."""
+        page = [("per_page", _REVALIDATE_PAGE_SIZE)]
+        if resource == "courses":
+            params = [
+                ("enrollment_type", "student"),
+                ("enrollment_state", "active"),
+                ("state[]", "available"),
+            ]
+            params += [("include[]", include) for include in COURSE_INCLUDES]
+            return {"courses": params + page}
+        if resource == "todos":
+            return {
+                f"courses/{course_id}/assignments": [
+                    ("bucket", "upcoming"),
+                    ("include[]", "submission"),
+                ]
+                + page
+                for course_id in course_ids
+            }
+        if resource == "announcements":
+            return {
+                f"courses/{course_id}/discussion_topics": [
+                    ("only_announcements", True)
+                ]
+                + page
+                for course_id in course_ids
+            }
+        raise ValueError(f"Unknown Canvas resource: {resource}")
+
+    def _conditional_get(
+        self, endpoint: str, params: List[tuple], validators: Optional[Validators]
+    ) -> Optional[Validators]:
+        """New validators of an endpoint, or None if it is unchanged."""
+        response = self.requester.request(
+            "GET",
+            endpoint,
+            headers=conditional_headers(validators),
+            _kwargs=list(params),
+        )
+        if response.status_code == 304:
+            return None
+        return {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    def revalidate(
+        self,
+        resource: str,
+        validators: Dict[str, Validators],
+        course_ids: Optional[List[int]] = None,
+    ) -> Optional[Dict[str, Validators]]:
+        """Ask Canvas whether a cached resource changed.
+
+        Returns None if every endpoint of the resource answered 304 Not
+        Modified, or else the validators to store with the fresh data.
+        ``course_ids`` of None means the courses aren't known, so a
+        per-course resource is treated as changed.
+        """
+        if course_ids is None and resource != "courses":
+            return {}
+        endpoints = self.endpoints(resource, course_ids or [])
+
+        def check(endpoint: str) -> Tuple[str, Optional[Validators]]:
+            known = validators.get(endpoint)
+            return endpoint, self._conditional_get(endpoint, endpoints[endpoint], known)
+
+        fresh = dict(validators)
+        changed = set(validators) != set(endpoints)
+        for endpoint, new in self._map_bounded(check, list(endpoints)):
+            if new is not None:
+                fresh[endpoint] = new
+                changed = True
+        if not changed:
+            return None
+        return {endpoint: fresh[endpoint] for endpoint in endpoints}
 
     def get_courses(self) -> List[Dict]:
         courses = []
         try:
-            for course in self.canvas.get_courses(
-                enrollment_type="student",
-                include=["total_scores", "current_grading_period_scores", "grades"],
-                state=["available"],
-            ):
-                code = getattr(course, "course_code", "")
-                if code and "2501" in str(code):
-                    if hasattr(course, "enrollments") and course.enrollments:
-                        enrollment = course.enrollments[0]
-                        grade = enrollment.get(
-                            "computed_current_letter_grade"
-                        ) or enrollment.get("computed_current_grade")
-                        p = enrollment.get("computed_current_score")
-                        if grade and p is not None:
-                            g = f"{grade} ({p}%)"
-                        elif grade:
-                            g = grade
-                        elif p is not None:
-                            g = f"{p}%"
-                        else:
-                            g = "N/A"
-                        n = getattr(course, "name", "Unnamed Course")
-                        c = getattr(course, "course_code", "No Code")
-                        courses.append(
-                            {
-                                "name": f"{n:<40}",
-                                "code": f"{c:<20}",
-                                "grade": f"{g:>46}",
-                            }
-                        )
+            for course in self._enrolled_courses():
+                if hasattr(course, "enrollments") and course.enrollments:
+                    enrollment = course.enrollments[0]
+                    grade = enrollment.get(
+                        "computed_current_letter_grade"
+                    ) or enrollment.get("computed_current_grade")
+                    p = enrollment.get("computed_current_score")
+                    if grade and p is not None:
+                        g = f"{grade} ({p}%)"
+                    elif grade:
+                        g = grade
+                    elif p is not None:
+                        g = f"{p}%"
+                    else:
+                        g = "N/A"
+                    n = getattr(course, "name", "Unnamed Course")
+                    c = getattr(course, "course_code", "No Code")
+                    courses.append(
+                        {
+                            "id": course.id,
+                            "name": f"{n:<40}",
+                            "code": f"{c:<20}",
+                            "grade": f"{g:>46}",
+                        }
+                    )
         except Exception as e:
             print(f"Error in get_courses: {str(e)}")
             raise e
         return courses
 
     def get_todo_assignments(self) -> List[Dict]:
-        assignments = []
-        try:
-            for course in self.canvas.get_courses(
-                enrollment_type="student", state=["available"]
+
+        def fetch(course) -> List[Dict]:
+            found = []
+            for a in course.get_assignments(
+                bucket="upcoming",
+                include=["submission"],
+                per_page=self.settings.per_page,
             ):
-                code = getattr(course, "course_code", "")
-                if code and "2501" in str(code):
-                    for a in course.get_assignments(
-                        bucket="upcoming", include=["submission"]
-                    ):
-                        if hasattr(a, "due_at") and a.due_at:
-                            d = datetime.strptime(a.due_at, "%Y-%m-%dT%H:%M:%SZ")
-                            if d > datetime.now():
-                                s = "Not Started"
-                                if hasattr(a, "submission") and a.submission:
-                                    if a.submission.get("submitted_at"):
-                                        s = "Submitted"
-                                    elif a.submission.get("missing"):
-                                        s = "Missing"
-                                assignments.append(
-                                    {
-                                        "name": a.name,
-                                        "course": course.name,
-                                        "due_date": d.strftime("%Y-%m-%d %H:%M"),
-                                        "status": s,
-                                    }
-                                )
-            for x in assignments:
-                if x["due_date"] != "No Due Date":
-                    dt = datetime.strptime(x["due_date"], "%Y-%m-%d %H:%M")
-                    x["due_date"] = dt.strftime("%B %d - %H:%M")
-            assignments.sort(
-                key=lambda x: (
-                    datetime.strptime(x["due_date"], "%B %d - %H:%M")
-                    if x["due_date"] != "No Due Date"
-                    else datetime.max
-                )
-            )
+                # Canvas timestamps are all in UTC and compare as strings
+                if hasattr(a, "due_at") and a.due_at and a.due_at > now:
+                    s = "Not Started"
+                    if hasattr(a, "submission") and a.submission:
+                        if a.submission.get("submitted_at"):
+                            s = "Submitted"
+                        elif a.submission.get("missing"):
+                            s = "Missing"
+                    found.append(
+                        {
+                            "id": a.id,
+                            "course_id": course.id,
+                            "name": a.name,
+                            "course": course.name,
+                            "due_at": a.due_at,
+                            "status": s,
+                        }
+                    )
+            return found
+
+        now = canvas_time(datetime.now(timezone.utc))
+        try:
+            assignments = self._for_each_course(self._enrolled_courses(), fetch)
         except Exception as e:
             print(f"Error in get_todo_assignments: {str(e)}")
             raise e
         return assignments
 
+    def announcement_cutoff(self) -> str:
+        """Announcements posted before this aren't fetched."""
+        days = timedelta(days=self.settings.announcement_days)
+        return canvas_time(datetime.now(timezone.utc) - days)
+
     def get_announcements(self) -> List[Dict]:
-        announcements = []
-        cutoff_date = datetime(2025, 1, 1)
-        try:
-            for course in self.canvas.get_courses(
-                enrollment_type="student", state=["available"]
+        cutoff = self.announcement_cutoff()
+
+        def fetch(course) -> List[Dict]:
+            found = []
+            for announcement in course.get_discussion_topics(
+                only_announcements=True, per_page=self.settings.per_page
             ):
-                code = getattr(course, "course_code", "")
-                if code and "2501" in str(code):
-                    for announcement in course.get_discussion_topics(
-                        only_announcements=True
-                    ):
-                        if announcement.posted_at:
-                            posted_date = datetime.strptime(
-                                announcement.posted_at, "%Y-%m-%dT%H:%M:%SZ"
-                            )
-                            if posted_date >= cutoff_date:
-                                announcements.append(
-                                    {
-                                        "title": announcement.title,
-                                        "message": announcement.message,
-                                        "posted_at": announcement.posted_at,
-                                        "course_name": course.name,
-                                    }
-                                )
-            announcements.sort(
-                key=lambda x: (
-                    datetime.strptime(x["posted_at"], "%Y-%m-%dT%H:%M:%SZ")
-                    if x["posted_at"]
-                    else datetime.min
-                ),
-                reverse=True,
-            )
+                if announcement.posted_at and announcement.posted_at >= cutoff:
+                    found.append(
+                        {
+                            "id": announcement.id,
+                            "course_id": course.id,
+                            "title": announcement.title,
+                            "message": announcement.message,
+                            "posted_at": announcement.posted_at,
+                            "course_name": course.name,
+                        }
+                    )
+            return found
+
+        try:
+            announcements = self._for_each_course(self._enrolled_courses(), fetch)
         except Exception as e:
             print(f"Error in get_announcements: {str(e)}")
             raise e
         return announcements
 
 
+def canvas_time(moment: datetime) -> str:
+    """A UTC datetime in the format of Canvas timestamps."""
+    return moment.astimezone(timezone.utc).strftime(CANVAS_TIME_FORMAT)
+
+
+def local_time(timestamp: str) -> datetime:
+    """A Canvas timestamp in local time."""
+    return (
+        datetime.strptime(timestamp, CANVAS_TIME_FORMAT)
+        .replace(tzinfo=timezone.utc)
+        .astimezone()
+    )
+
+
+def assignment_tasks(assignments: List[Dict]) -> List[Dict]:
+    """Calendar tasks for Canvas assignments, due at their local deadline."""
+    tasks = []
+    for assignment in assignments:
+        if "id" not in assignment or not assignment.get("due_at"):
+            continue
+        due = local_time(assignment["due_at"])
+        tasks.append(
+            {
+                "external_id": assignment["id"],
+                "title": assignment["name"],
+                "description": assignment.get("course", ""),
+                "due_date": due.strftime("%Y-%m-%d"),
+                "start_time": due.strftime("%H:%M"),
+                "end_time": due.strftime("%H:%M"),
+                "completed": assignment.get("status") == "Submitted",
+            }
+        )
+    return tasks
+
+
 class CourseList(DataTable):
     def __init__(self):
         super().__init__()
@@ -325,10 +593,15 @@ class TodoList(DataTable):
     def populate(self, assignments: List[Dict]):
         self.clear()
         for a in assignments:
+            due_at = a.get("due_at")
             self.add_row(
                 a.get("name", "Unnamed Assignment"),
                 a.get("course", "Unknown Course"),
-                a.get("due_date", "No Due Date"),
+                (
+                    local_time(due_at).strftime("%B %d - %H:%M")
+                    if due_at
+                    else "No Due Date"
+                ),
                 a.get("status", "Not Started"),
             )
 
@@ -340,90 +613,136 @@ class CanvasView(Widget):
         super().__init__()
         self.canvas_api = None
         self.is_authenticated = False
-        self.cache_dir = (
-            Path.home() / ".canvas_cache"
-        )  # caching loaded data to prevent persistent loading
-        self.cache_dir.mkdir(exist_ok=True)
 
-    def _get_cache_path(self, cache_type: str) -> Path:
-        return self.cache_dir / f"{cache_type}.json"
+    def _show_courses(self) -> None:
+        self.query_one(CourseList).populate(self.app.db.get_canvas_courses())
 
-    def _save_cache(self, data: dict, cache_type: str) -> None:
-        try:
-            cache_data = {"timestamp": datetime.now().isoformat(), "data": data}
-            with open(self._get_cache_path(cache_type), "w") as f:
-                json.dump(cache_data, f)
-        except Exception as e:
-            print(f"Error saving cache for {cache_type}: {e}")
+    def _show_todos(self) -> List[Dict]:
+        now = canvas_time(datetime.now(timezone.utc))
+        todos = self.app.db.get_canvas_assignments(now)
+        self.query_one(TodoList).populate(todos)
+        return todos
 
-    def _load_cache(self, cache_type: str) -> tuple[list, datetime]:
-        try:
-            cache_path = self._get_cache_path(cache_type)
-            if cache_path.exists():
-                with open(cache_path, "r") as f:
-                    cache_data = json.load(f)
-                    timestamp = datetime.fromisoformat(cache_data["timestamp"])
-                    return cache_data["data"], timestamp
-        except Exception as e:
-            print(f"Error loading cache for {cache_type}: {e}")
-        return [], None
+    def _show_announcements(self) -> None:
+        announcements = self.query_one(AnnouncementsList)
+        # Older announcements are read from tick.db as the list is scrolled
+        announcements.fetch_page = self.app.db.get_canvas_announcements
+        limit = max(announcements.shown, AnnouncementsList.PAGE_SIZE)
+        announcements.populate(self.app.db.get_canvas_announcements(limit))
 
     async def _load_cached_data(self) -> None:
         try:
-            courses, courses_time = self._load_cache("courses")
-            todos, todos_time = self._load_cache("todos")
-            announcements, announcements_time = self._load_cache("announcements")
-
-            if courses:
-                course_list = self.query_one("CourseList")  # Use string selector
-                if course_list:
-                    course_list.populate(courses)
-            if todos:
-                todo_list = self.query_one("TodoList")
-                if todo_list:
-                    todo_list.populate(todos)
-            if announcements:
-                announcements_list = self.query_one(AnnouncementsList)
-                if announcements_list:
-                    announcements_list.populate(announcements)
-
+            self._show_courses()
+            self._show_todos()
+            self._show_announcements()
         except Exception as e:
             print(f"Error loading cached data: {e}")
             self.notify(f"Error loading cached data: {e}", severity="error")
 
-    async def load_data(self) -> None:
+    def _load_settings(self) -> CanvasSettings:
+        return CanvasSettings.from_dict(self.app.db.get_canvas_settings())
+
+    def _cached_course_ids(self) -> Optional[List[int]]:
+        if self.app.db.get_canvas_sync("courses") is None:
+            return None
+        return [course["id"] for course in self.app.db.get_canvas_courses()]
+
+    async def _refresh_resource(
+        self,
+        resource: str,
+        fetch: Callable[[], List[Dict]],
+        store: Callable[..., None],
+        force: bool,
+    ) -> bool:
+        """Download a resource into tick.db if it changed; whether it did.
+
+        Stored data within its TTL is used as is unless ``force`` is set;
+        otherwise Canvas is asked whether it changed before downloading it.
+        Data stored with other settings (e.g. another term) is downloaded
+        again rather than revalidated.
+        """
+        params = self.canvas_api.settings._asdict()
+        row = self.app.db.get_canvas_sync(resource)
+        state = SyncState.from_row(row) if row else None
+        if state is not None and not state.fetched_with(params):
+            state = None
+        if state is not None and not force and state.is_fresh(resource):
+            return False
+        validators = await asyncio.to_thread(
+            self.canvas_api.revalidate,
+            resource,
+            state.validators if state is not None else {},
+            self._cached_course_ids(),
+        )
+        if validators is None and state is not None:
+            self.app.db.touch_canvas_sync(resource)
+            return False
+        data = await asyncio.to_thread(fetch)
+        await asyncio.to_thread(store, data, validators or {}, params)
+        return True
+
+    async def _sync_tasks(self, todos: List[Dict]) -> None:
+        """Put assignment deadlines in the calendar's task database."""
+        db = getattr(self.app, "db", None)
+        if db is None:
+            return
+        try:
+            await asyncio.to_thread(
+                db.upsert_external_tasks, CANVAS_TASK_SOURCE, assignment_tasks(todos)
+            )
+        except Exception as e:
+            print(f"Error syncing Canvas assignments: {e}")
+
+    async def load_data(self, force: bool = False) -> None:
         try:
             try:
                 self.query_one(LoadingIndicator).styles.display = "block"
             except NoMatches:
                 pass
 
-            # First load cached data
+            # Show cached data straight away
             await self._load_cached_data()
 
-            # Then fetch fresh data
-            c_task = asyncio.to_thread(self.canvas_api.get_courses)
-            t_task = asyncio.to_thread(self.canvas_api.get_todo_assignments)
-            a_task = asyncio.to_thread(self.canvas_api.get_announcements)
-
-            courses, todos, announcements = await asyncio.gather(c_task, t_task, a_task)
-
-            # Update UI with fresh data
-            self.query_one(CourseList).populate(courses)
-            self.query_one(TodoList).populate(todos)
-            self.query_one(AnnouncementsList).populate(announcements)
-
-            # Save to cache
-            self._save_cache(courses, "courses")
-            self._save_cache(todos, "todos")
-            self._save_cache(announcements, "announcements")
+            # Then revalidate it; the fetchers share one course list
+            api = self.canvas_api
+            db = self.app.db
+            api.begin_refresh()
+            # Courses first, as the others are checked per course
+            if await self._refresh_resource(
+                "courses", api.get_courses, db.save_canvas_courses, force
+            ):
+                self._show_courses()
+
+            now = canvas_time(datetime.now(timezone.utc))
+            todos_changed, announcements_changed = await asyncio.gather(
+                self._refresh_resource(
+                    "todos",
+                    api.get_todo_assignments,
+                    partial(db.save_canvas_assignments, due_after=now),
+                    force,
+                ),
+                self._refresh_resource(
+                    "announcements",
+                    api.get_announcements,
+                    partial(
+                        db.save_canvas_announcements,
+                        posted_since=api.announcement_cutoff(),
+                    ),
+                    force,
+                ),
+            )
+            # Only replace what the server says changed
+            if todos_changed:
+                await self._sync_tasks(self._show_todos())
+            if announcements_changed:
+                self._show_announcements()
 
         except Exception as e:
             self.notify(f"Error loading data: {str(e)}", severity="error")
             print(f"Canvas API Error: {str(e)}")
         finally:
             try:
-                self.query_one(LoadingIndicator).styles.display = "block"
+                self.query_one(LoadingIndicator).styles.display = "none"
             except NoMatches:
                 pass
 
@@ -460,8 +779,11 @@ class CanvasView(Widget):
         self.initialize_canvas(message.url, message.token)
 
     def initialize_canvas(self, url: str, token: str) -> None:
-        self.canvas_api = CanvasAPI()
+        self.canvas_api = CanvasAPI(self._load_settings())
         self.canvas_api.canvas = Canvas(url, token)
+        self.canvas_api.requester = Requester(
+            get_institution_url(url), token.strip()
+        )
         asyncio.create_task(self._initialize())
 
     async def _initialize(self) -> None:
@@ -478,4 +800,4 @@ class CanvasView(Widget):
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "refresh":
-            asyncio.create_task(self.load_data())
+            asyncio.create_task(self.load_data(force=True))
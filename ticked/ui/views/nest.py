@@ -1,9 +1,12 @@
 import os
 import re
 import shutil
+import sqlite3
+import threading
 import time
-from difflib import SequenceMatcher
-from typing import Optional
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
 from jedi import Script
 from rich.markup import escape
@@ -19,6 +22,7 @@ from textual.screen import ModalScreen
 from textual.widget import Widget
 from textual.widgets import (
     Button,
+    Checkbox,
     DataTable,
     DirectoryTree,
     Input,
@@ -26,21 +30,195 @@ from textual.widgets import (
     Static,
     TextArea,
 )
+from textual.widgets.directory_tree import DirEntry
+from textual.worker import get_current_worker
 
 from ...ui.mixins.focus_mixin import InitialFocusMixin
+from ...utils.file_index import FileIndex, FileMatcher
+from ...utils.file_io import (
+    NOT_UTF8_MESSAGE,
+    atomic_write_text,
+    read_text,
+    sniff_file,
+)
+from ...utils.file_transfer import (
+    FileTransfer,
+    TransferCancelled,
+    TransferProgress,
+    unique_destination,
+)
+from ...utils.fs_watch import create_watcher
+from ...utils.fuzzy import CandidateTable, fuzzy_match, fuzzy_score
+from ...utils.ignore import DEFAULT_IGNORE_PATTERNS, IgnoreCache
+from ...utils.large_file import LargeFileBuffer, is_large_file
+from ...utils.outline import (
+    PARSE_DELAY,
+    Outline,
+    OutlineCache,
+    Symbol,
+    next_version,
+    parse_outline,
+    scan_identifiers,
+)
+from ...utils.symbol_index import SymbolIndex
+from ...utils.swap import (
+    FLUSH_DELAY,
+    RecoveredBuffer,
+    SwapJournal,
+    line_diff,
+    recover_swaps,
+)
+from ...utils.tab_cache import (
+    TabCache,
+    buffer_memory,
+    format_size,
+    read_buffer,
+    write_buffer,
+)
+from ...utils.text_stats import TextStats, count_line_words
+from ...utils.text_search import (
+    SearchMatch,
+    SearchStats,
+    compile_query,
+    search_tree,
+)
+from ...utils.vim_search import (
+    BufferSearch,
+    compile_pattern,
+    parse_range,
+    parse_substitute,
+    substitute,
+)
 
 
 class EditorTab:
-    def __init__(self, path: str, content: str):
+    def __init__(self, path: str, content: Optional[str]):
         self.path = path
-        self.content = content
+        # None until the file of a tab restored from a session is first used
+        self._content = content
         self.modified = False
         # Per-buffer undo/redo stacks
-        self.undo_stack = []
-        self.redo_stack = []
+        self._undo_stack = []
+        self._redo_stack = []
         # Cursor and scroll position for this buffer
         self.cursor_position = (0, 0)
         self.scroll_position = (0, 0)
+        # Large-file mode: the mmap-backed buffer and the chunk being shown
+        self.large_file: Optional[LargeFileBuffer] = None
+        self.chunk = 0
+        # Whether the chunk is waiting for the indexer, so the editor doesn't
+        # hold its text yet
+        self.chunk_loading = False
+        # Where the buffer and its history were spilled by the TabCache
+        self.spill_path: Optional[Path] = None
+        self.last_active = time.monotonic()
+        # Crash-recovery journal of unsaved edits, created on the first edit
+        self.swap: Optional[SwapJournal] = None
+        # Changes with every edit; outlines are cached by version
+        self.version = next_version()
+
+    @classmethod
+    def restored(
+        cls, path: str, cursor_position: tuple, scroll_position: tuple
+    ) -> "EditorTab":
+        """A tab from a saved session; its file is read when first used."""
+        tab = cls(path, None)
+        tab.cursor_position = cursor_position
+        tab.scroll_position = scroll_position
+        return tab
+
+    @property
+    def loaded(self) -> bool:
+        return self._content is not None or self.spill_path is not None
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the buffer is on disk rather than in memory."""
+        return self.spill_path is not None or not self.loaded
+
+    def load(self) -> Optional[str]:
+        """Read the file of a restored tab, checking it as opening a file does.
+
+        Returns why the file can't be edited, or None once it is loaded. A tab
+        whose file can't be read stays unloaded, so it can't be saved over
+        the file as an empty buffer. Large-file tabs keep no content of their
+        own, chunks are read on demand.
+        """
+        if self.loaded:
+            return None
+        try:
+            problem = sniff_file(self.path)
+            if problem is None:
+                if self.large_file is None and is_large_file(self.path):
+                    # Too big to load whole; the saved position would be
+                    # relative to a chunk, so start at the top
+                    self.large_file = LargeFileBuffer(self.path)
+                    self.large_file.start_indexing()
+                    self.cursor_position = (0, 0)
+                    self.scroll_position = (0, 0)
+                if self.large_file is not None:
+                    self._content = ""
+                else:
+                    self._content = read_text(self.path)
+        except UnicodeDecodeError:
+            problem = NOT_UTF8_MESSAGE
+        except OSError as e:
+            problem = f"Error opening file: {e}"
+        return problem
+
+    def _ensure_loaded(self) -> None:
+        if self.spill_path is not None:
+            path, self.spill_path = self.spill_path, None
+            self._content, self._undo_stack, self._redo_stack = read_buffer(path)
+            path.unlink(missing_ok=True)
+        elif self._content is None:
+            self.load()
+
+    @property
+    def content(self) -> str:
+        self._ensure_loaded()
+        # Empty while the file can't be read
+        return "" if self._content is None else self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        if not self.loaded:
+            # The file couldn't be read, so the editor's empty text isn't its
+            # content (and reading it now would be overwritten)
+            return
+        self._ensure_loaded()
+        self._content = value
+
+    @property
+    def undo_stack(self) -> list:
+        self._ensure_loaded()
+        return self._undo_stack
+
+    @property
+    def redo_stack(self) -> list:
+        self._ensure_loaded()
+        return self._redo_stack
+
+    def memory_usage(self) -> int:
+        if self.spilled:
+            return 0
+        return buffer_memory(self._content, self._undo_stack, self._redo_stack)
+
+    def spill(self, path: Path) -> None:
+        """Write the buffer and history to ``path`` and drop them from memory."""
+        write_buffer(path, self._content, self._undo_stack, self._redo_stack)
+        self.spill_path = path
+        self._content = ""
+        self._undo_stack = []
+        self._redo_stack = []
+
+    def release(self) -> None:
+        """Forget any spilled copy and swap journal; called when the tab is closed."""
+        if self.spill_path is not None:
+            self.spill_path.unlink(missing_ok=True)
+            self.spill_path = None
+        if self.swap is not None:
+            self.swap.discard()
 
 
 class FileCreated(Message):
@@ -62,57 +240,242 @@ class FileDeleted(Message):
 
 
 class FilterableDirectoryTree(DirectoryTree):
-    def __init__(self, path: str, show_hidden: bool = False, **kwargs) -> None:
+    """Directory tree that hides dotfiles and ignored paths.
+
+    Paths matched by ``.gitignore``/``.ignore`` files or the user's ignore
+    patterns are dropped while a directory is listed, so ignored subtrees
+    such as ``node_modules`` are never listed or stat-ed. Showing hidden
+    files shows ignored ones too.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        show_hidden: bool = False,
+        watch: bool = False,
+        ignore_patterns: Optional[list] = None,
+        **kwargs,
+    ) -> None:
         super().__init__(path, **kwargs)
         self.show_hidden = show_hidden
+        # Only the main tree keeps itself up to date with a filesystem watcher
+        self._watch_changes = watch
+        self._watcher = None
+        self.ignore_patterns = list(
+            DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns
+        )
+        self._ignore_cache: Optional[IgnoreCache] = None
+        # Directory -> whether each of its listed paths is a directory, from
+        # the listing's file types. Replaced whenever the directory is listed
+        self._is_dir_cache: dict = {}
+
+    class DirectoriesChanged(Message):
+        """Directories whose entries were created, deleted or renamed on disk."""
+
+        def __init__(self, paths: set) -> None:
+            super().__init__()
+            self.paths = paths
 
     def filter_paths(self, paths: list[str]) -> list[str]:
         if self.show_hidden:
             return paths
         return [path for path in paths if not os.path.basename(path).startswith(".")]
 
-    def _get_expanded_paths(self) -> list[str]:
-        """Get a list of all expanded directory paths."""
-        expanded_paths = []
+    def _ignore_rules(self, directory: str):
+        if self.show_hidden:
+            return None
+        cache = self._ignore_cache
+        root = str(Path(self.path).expanduser().resolve())
+        if cache is None or cache.root != root:
+            cache = self._ignore_cache = IgnoreCache(root, self.ignore_patterns)
+        return cache.rules_for(directory)
+
+    def _scan_directory(self, location, cancelled=lambda: False):
+        """Yield ``(path, is_dir)`` for the entries of ``location`` that aren't ignored.
+
+        ``is_dir`` comes from the directory entry's file type, so only
+        symlinks need a ``stat``.
+        """
+        rules = self._ignore_rules(str(location))
+        is_dirs = self._is_dir_cache[Path(location)] = {}
+        try:
+            with os.scandir(location) as entries:
+                for entry in entries:
+                    if cancelled():
+                        break
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if rules is not None and rules.is_ignored(entry.path, is_dir):
+                        continue
+                    path = Path(entry.path)
+                    is_dirs[path] = is_dir
+                    yield path, is_dir
+        except OSError:
+            pass
 
-        def collect_expanded(node):
-            if node.is_expanded and hasattr(node.data, "path"):
-                expanded_paths.append(node.data.path)
-            for child in node.children:
-                if child.children:
-                    collect_expanded(child)
+    def _directory_content(self, location: Path, worker) -> Iterator[Path]:
+        for path, _ in self._scan_directory(location, lambda: worker.is_cancelled):
+            yield path
 
-        if self.root:
-            collect_expanded(self.root)
+    def _safe_is_dir(self, path: Path) -> bool:
+        is_dir = self._is_dir_cache.get(path.parent, {}).get(path)
+        if is_dir is None:
+            return DirectoryTree._safe_is_dir(path)
+        return is_dir
 
-        return expanded_paths
+    def set_ignore_patterns(self, patterns: list) -> None:
+        """Replace the user ignore patterns and re-filter loaded directories."""
+        self.ignore_patterns = list(patterns)
+        self._ignore_cache = None
+        if self.is_mounted:
+            self.refresh_tree()
 
-    def _restore_expanded_paths(self, paths: list[str]) -> None:
-        """Restore previously expanded directories."""
-        for path in paths:
+    def on_mount(self) -> None:
+        db = getattr(self.app, "db", None)
+        if db is not None:
             try:
-                self.select_path(path)
-                if self.cursor_node and not self.cursor_node.is_expanded:
-                    self.toggle_node(self.cursor_node)
+                patterns = db.get_tree_ignore_patterns()
             except Exception:
-                pass
+                patterns = None
+            if patterns is not None and patterns != self.ignore_patterns:
+                self.ignore_patterns = patterns
+                self._ignore_cache = None
+        if self._watch_changes:
+            self._watcher = create_watcher(self._on_directories_changed)
+            for path in self._loaded_directories():
+                self._watcher.watch(path)
+            self._watcher.start()
+
+    def on_unmount(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    @staticmethod
+    def _node_path(node) -> str:
+        return str(node.data.path.expanduser().resolve())
+
+    def _populate_node(self, node, content) -> None:
+        super()._populate_node(node, content)
+        if self._watcher is not None and node.data is not None:
+            self._watcher.watch(self._node_path(node))
+
+    def _loaded_directories(self) -> dict:
+        """Map the resolved path of every loaded directory node to the node."""
+        loaded = {}
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node.data is not None and node.data.loaded:
+                loaded[self._node_path(node)] = node
+                stack.extend(child for child in node.children if child.allow_expand)
+        return loaded
+
+    def _on_directories_changed(self, paths: set) -> None:
+        """Called from the watcher thread with a debounced batch of changes."""
+        self.post_message(self.DirectoriesChanged(set(paths)))
+        try:
+            self.app.call_from_thread(self.sync_directories, paths)
+        except RuntimeError:
+            # The app is shutting down
+            pass
 
-    def refresh_tree(self) -> None:
-        """Refresh the tree while maintaining expanded directories."""
-        expanded_paths = self._get_expanded_paths()
-        cursor_path = self.cursor_node.data.path if self.cursor_node else None
+    def sync_directories(self, paths) -> None:
+        """Update the children of the given directories in place.
+
+        Only nodes for entries that were created, deleted or renamed are
+        touched, so expansion state elsewhere is untouched and the cursor
+        stays on the same entry (or its closest surviving parent).
+        """
+        loaded = self._loaded_directories()
+        paths = set(map(str, paths))
+        if self._ignore_cache is not None:
+            for path in list(paths):
+                if self._ignore_cache.invalidate(path):
+                    # Changed ignore files can hide or reveal entries below too
+                    prefix = path.rstrip(os.sep) + os.sep
+                    paths.update(p for p in loaded if p.startswith(prefix))
+        cursor_node = self.cursor_node
+        removed = []
+        for path in paths:
+            node = loaded.get(str(path))
+            if node is not None:
+                removed.extend(self._sync_directory(node))
+        if not removed:
+            return
 
-        self.path = self.path
-        self.reload()
+        if cursor_node is not None:
+            gone = set(map(id, removed))
+            node = cursor_node
+            while node is not None:
+                if id(node) in gone:
+                    cursor_node = node.parent
+                node = node.parent
+            # Rebuild line numbers before moving the cursor (as DirectoryTree does)
+            _ = self._tree_lines
+            self.move_cursor(cursor_node, animate=False)
+
+    def _sync_directory(self, node) -> list:
+        """Diff one loaded directory node against disk; return removed nodes."""
+        location = self._node_path(node)
+        if not os.path.isdir(location):
+            # Gone: the parent directory's sync removes the node
+            return []
+        scanned = dict(self._scan_directory(location))
+        listing = sorted(
+            ((path, scanned[path]) for path in self.filter_paths(list(scanned))),
+            key=lambda entry: (not entry[1], entry[0].name.lower()),
+        )
+        wanted = dict(listing)
+
+        removed = []
+        existing = {}
+        for child in list(node.children):
+            path = child.data.path if child.data is not None else None
+            if path in wanted and child.allow_expand == wanted[path]:
+                existing[path] = child
+            else:
+                self._unwatch_subtree(child)
+                if path is not None:
+                    self._forget_listings(path)
+                child.remove()
+                removed.append(child)
+
+        previous = None
+        for path, is_dir in listing:
+            child = existing.get(path)
+            if child is None:
+                position = {"after": previous} if previous is not None else {"before": 0}
+                child = node.add(
+                    path.name, data=DirEntry(path), allow_expand=is_dir, **position
+                )
+            previous = child
+        return removed
 
-        self._restore_expanded_paths(expanded_paths)
+    def _forget_listings(self, path: Path) -> None:
+        """Drop the cached listings of ``path`` and the directories below it."""
+        for directory in list(self._is_dir_cache):
+            if directory == path or path in directory.parents:
+                del self._is_dir_cache[directory]
 
-        if cursor_path:
-            try:
-                self.select_path(cursor_path)
-            except Exception:
-                pass
+    def _unwatch_subtree(self, node) -> None:
+        if self._watcher is None:
+            return
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.data is not None and current.data.loaded:
+                # Watches are keyed by resolved path, see _populate_node
+                self._watcher.unwatch(self._node_path(current))
+            stack.extend(current.children)
 
+    def refresh_tree(self) -> None:
+        """Bring every loaded directory up to date without reloading the tree."""
+        if self._ignore_cache is not None:
+            self._ignore_cache.invalidate()
+        self.sync_directories(self._loaded_directories())
         self.refresh(layout=True)
 
     async def action_delete_selected(self) -> None:
@@ -545,12 +908,375 @@ class DeleteConfirmationDialog(ModalScreen):
         self.query_one("#confirm").focus()
 
 
+class RecoverSwapDialog(ModalScreen):
+    """Offer to recover buffers left unsaved by an editor that crashed.
+
+    Dismisses with ``"recover"``, ``"discard"`` or None to decide later.
+    """
+
+    BINDINGS = [
+        Binding("escape", "cancel", "Later"),
+        Binding("left", "focus_previous", "Previous Button", show=False),
+        Binding("right", "focus_next", "Next Button", show=False),
+    ]
+
+    MAX_LISTED = 8
+
+    def __init__(self, buffers: List[RecoveredBuffer]) -> None:
+        super().__init__()
+        self.buffers = buffers
+
+    def compose(self) -> ComposeResult:
+        names = [
+            f"{os.path.basename(buffer.path)} "
+            f"({time.strftime('%Y-%m-%d %H:%M', time.localtime(buffer.modified_at))})"
+            for buffer in self.buffers[: self.MAX_LISTED]
+        ]
+        if len(self.buffers) > self.MAX_LISTED:
+            names.append(f"and {len(self.buffers) - self.MAX_LISTED} more")
+        with Container(classes="file-form-container-d recover-swap-container"):
+            with Vertical(classes="file-form"):
+                yield Static("Recover unsaved changes", classes="file-form-header")
+                yield Static(
+                    "The editor exited without saving these files:",
+                    classes="delete-confirm-message",
+                )
+                yield Static("\n".join(names), classes="delete-confirm-filename")
+
+                with Horizontal(classes="form-buttons"):
+                    yield Button("Later", variant="default", id="cancel")
+                    yield Button("Discard", variant="error", id="discard")
+                    yield Button("Recover", variant="primary", id="recover")
+
+    def on_mount(self) -> None:
+        self.query_one("#recover").focus()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel":
+            self.dismiss(None)
+        else:
+            self.dismiss(event.button.id)
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
+
+    def action_focus_previous(self) -> None:
+        self.focus_previous()
+
+    def action_focus_next(self) -> None:
+        self.focus_next()
+
+
+class PasteConflictDialog(ModalScreen):
+    """Ask what to do when a pasted file or folder's name is already taken.
+
+    Dismisses with ``"replace"``, ``"keep"`` (paste under a new name) or
+    None to cancel the paste.
+    """
+
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel"),
+        Binding("left", "focus_previous", "Previous Button", show=False),
+        Binding("right", "focus_next", "Next Button", show=False),
+    ]
+
+    def __init__(self, name: str, destination_dir: str) -> None:
+        super().__init__()
+        self.file_name = name
+        self.destination_dir = destination_dir
+
+    def compose(self) -> ComposeResult:
+        with Container(classes="file-form-container-d recover-swap-container"):
+            with Vertical(classes="file-form"):
+                yield Static("Paste", classes="file-form-header")
+                yield Static(
+                    f"'{self.file_name}' already exists in "
+                    f"{os.path.basename(self.destination_dir) or self.destination_dir}",
+                    classes="delete-confirm-message",
+                )
+
+                with Horizontal(classes="form-buttons"):
+                    yield Button("Cancel", variant="default", id="cancel")
+                    yield Button("Replace", variant="error", id="replace")
+                    yield Button("Keep Both", variant="primary", id="keep")
+
+    def on_mount(self) -> None:
+        self.query_one("#keep").focus()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel":
+            self.dismiss(None)
+        else:
+            self.dismiss(event.button.id)
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
+
+    def action_focus_previous(self) -> None:
+        self.focus_previous()
+
+    def action_focus_next(self) -> None:
+        self.focus_next()
+
+
+class QuickOpenDialog(ModalScreen):
+    """Fuzzy file finder over the project file index."""
+
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel"),
+        Binding("enter", "submit", "Open"),
+        Binding("up", "move_up", "Move Up", show=False),
+        Binding("down", "move_down", "Move Down", show=False),
+    ]
+
+    RESULT_LIMIT = 50
+
+    def __init__(self, root: str, matcher: Optional[FileMatcher] = None) -> None:
+        super().__init__()
+        self.root = root
+        self.matcher = matcher
+        self.results: list = []
+
+    def compose(self) -> ComposeResult:
+        with Container(classes="file-form-container quick-open-container"):
+            with Vertical(classes="file-form"):
+                yield Static("Quick Open", classes="file-form-header")
+                yield Input(placeholder="Search files...", id="quick-open-input")
+                yield Static("", id="quick-open-status")
+                table = DataTable(id="quick-open-results", show_header=False)
+                table.cursor_type = "row"
+                table.can_focus = False
+                yield table
+
+    def on_mount(self) -> None:
+        self.query_one("#quick-open-results", DataTable).add_column("Path")
+        self.query_one("#quick-open-input").focus()
+        self._update_results()
+
+    def set_matcher(self, matcher: FileMatcher) -> None:
+        self.matcher = matcher
+        if self.is_mounted:
+            self._update_results()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self._update_results()
+
+    async def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        await self.action_submit()
+
+    def _update_results(self) -> None:
+        status = self.query_one("#quick-open-status", Static)
+        table = self.query_one("#quick-open-results", DataTable)
+        table.clear()
+        if self.matcher is None:
+            self.results = []
+            status.update("[italic]Indexing files...[/]")
+            return
+
+        query = self.query_one("#quick-open-input", Input).value.strip()
+        self.results = [
+            path for _, path in self.matcher.rank(query, limit=self.RESULT_LIMIT)
+        ]
+        for path in self.results:
+            directory, _, name = path.rpartition("/")
+            label = Text(name, style="bold")
+            if directory:
+                label.append(f"  {directory}", style="dim")
+            table.add_row(label)
+        status.update(f"{len(self.results)} of {len(self.matcher)} files")
+        if self.results:
+            table.move_cursor(row=0)
+
+    async def action_move_up(self) -> None:
+        table = self.query_one("#quick-open-results", DataTable)
+        if table.cursor_row > 0:
+            table.move_cursor(row=table.cursor_row - 1)
+
+    async def action_move_down(self) -> None:
+        table = self.query_one("#quick-open-results", DataTable)
+        if table.cursor_row < table.row_count - 1:
+            table.move_cursor(row=table.cursor_row + 1)
+
+    async def action_submit(self) -> None:
+        if not self.results:
+            return
+        row = self.query_one("#quick-open-results", DataTable).cursor_row
+        path = self.results[min(max(row, 0), len(self.results) - 1)]
+        self.dismiss(os.path.join(self.root, path))
+
+    async def action_cancel(self) -> None:
+        self.dismiss(None)
+
+
+class SearchResultsTable(DataTable):
+    """Find-in-files results; a single click opens the match."""
+
+    async def _on_click(self, event) -> None:
+        meta = event.style.meta
+        row = meta.get("row")
+        column = meta.get("column")
+        # DataTable's own handler (called after this one) only selects when
+        # the clicked row is already highlighted, so highlight it first
+        if row is not None and column is not None and row >= 0 and column >= 0:
+            self.cursor_coordinate = Coordinate(row, column)
+
+
+class FindInFilesDialog(ModalScreen):
+    """Search every file under the tree root, streaming in matches."""
+
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel"),
+        Binding("down", "focus_results", "Results", show=False),
+    ]
+
+    def __init__(self, root: str) -> None:
+        super().__init__()
+        self.root = root
+        self.results: list = []
+        self._search_id = 0
+
+    def compose(self) -> ComposeResult:
+        with Container(classes="file-form-container find-in-files-container"):
+            with Vertical(classes="file-form"):
+                yield Static("Find in Files", classes="file-form-header")
+                with Horizontal(classes="find-in-files-query"):
+                    yield Input(placeholder="Search text...", id="find-input")
+                    yield Checkbox("Regex", id="find-regex")
+                yield Static("", id="find-status")
+                yield SearchResultsTable(id="find-results", show_header=False)
+
+    def on_mount(self) -> None:
+        table = self.query_one("#find-results", DataTable)
+        table.cursor_type = "row"
+        table.add_column("Location")
+        table.add_column("Match")
+        self.query_one("#find-input").focus()
+
+    async def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        self._start_search()
+
+    def _start_search(self) -> None:
+        query = self.query_one("#find-input", Input).value
+        status = self.query_one("#find-status", Static)
+        if not query:
+            return
+        try:
+            regex = compile_query(query, regex=self.query_one("#find-regex").value)
+        except re.error as e:
+            status.update(f"[red]Invalid regex: {escape(str(e))}[/]")
+            return
+
+        self._search_id += 1
+        self.results = []
+        self.query_one("#find-results", DataTable).clear()
+        status.update("[italic]Searching...[/]")
+        self.run_worker(
+            partial(self._search_worker, self._search_id, regex),
+            thread=True,
+            group="text-search",
+            exclusive=True,
+        )
+
+    def _search_worker(self, search_id: int, regex) -> None:
+        worker = get_current_worker()
+        stats = search_tree(
+            self.root,
+            regex,
+            lambda matches: self.app.call_from_thread(
+                self._add_matches, search_id, matches
+            ),
+            cancelled=lambda: worker.is_cancelled,
+        )
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._finish_search, search_id, stats)
+
+    def _add_matches(self, search_id: int, matches: list) -> None:
+        if search_id != self._search_id:
+            return
+        table = self.query_one("#find-results", DataTable)
+        for match in matches:
+            self.results.append(match)
+            preview = match.preview.lstrip()
+            start = match.column - (len(match.preview) - len(preview))
+            text = Text(preview)
+            text.stylize("bold reverse", start, start + max(match.length, 1))
+            location = os.path.relpath(match.path, self.root)
+            table.add_row(Text(f"{location}:{match.line + 1}", style="dim"), text)
+        self.query_one("#find-status", Static).update(
+            f"[italic]Searching... {len(self.results)} matches[/]"
+        )
+
+    def _finish_search(self, search_id: int, stats: SearchStats) -> None:
+        if search_id != self._search_id:
+            return
+        summary = (
+            f"{stats.matches} matches in {stats.files} files, "
+            f"{stats.seconds * 1000:.0f} ms"
+        )
+        if stats.bytes >= 1024 * 1024:
+            summary += f" ({stats.throughput:.0f} MB/s)"
+        if stats.truncated:
+            summary += f", stopped after {stats.matches}"
+        self.query_one("#find-status", Static).update(summary)
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        event.stop()
+        if 0 <= event.cursor_row < len(self.results):
+            self.dismiss(self.results[event.cursor_row])
+
+    async def action_focus_results(self) -> None:
+        if self.results:
+            self.query_one("#find-results").focus()
+
+    async def action_cancel(self) -> None:
+        self.dismiss(None)
+
+
+class OutlinePanel(DataTable):
+    """Classes, functions and methods of the active buffer, for jumping to them."""
+
+    KIND_ICONS = {
+        "class": ("C", "bold yellow"),
+        "function": ("f", "bold cyan"),
+        "method": ("m", "cyan"),
+    }
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(show_header=False, cursor_type="row", **kwargs)
+        self.symbols: List[Symbol] = []
+        self._rows: Optional[list] = None
+
+    def on_mount(self) -> None:
+        self.add_column("Symbol")
+
+    def show_outline(self, outline: Optional[Outline]) -> None:
+        self.symbols = outline.symbols if outline is not None else []
+        rows = [(symbol.name, symbol.kind, symbol.depth) for symbol in self.symbols]
+        if rows == self._rows:
+            # Symbols moved (lines were added or removed) but read the same
+            return
+        self._rows = rows
+        cursor_row = self.cursor_row
+        self.clear()
+        for name, kind, depth in rows:
+            icon, style = self.KIND_ICONS[kind]
+            label = Text("  " * depth)
+            label.append(f"{icon} ", style=style)
+            label.append(name)
+            self.add_row(label)
+        if rows:
+            self.move_cursor(row=min(max(cursor_row, 0), len(rows) - 1))
+
+
 class StatusBar(Static):
     def __init__(self) -> None:
         super().__init__("", id="status-bar")
         self.mode = "NORMAL"
         self.file_info = ""
         self.command = ""
+        self.progress = ""
         self._update_content()
 
     def update_mode(self, mode: str) -> None:
@@ -565,6 +1291,14 @@ class StatusBar(Static):
         self.command = command
         self._update_content()
 
+    def update_progress(self, label: str, percent: Optional[int] = None) -> None:
+        """Show a background file operation; an empty label clears it."""
+        if label and percent is not None:
+            self.progress = f"{label} {percent}%"
+        else:
+            self.progress = label
+        self._update_content()
+
     def _update_content(self) -> None:
         mode_style = {
             "NORMAL": "bold blue", 
@@ -580,6 +1314,8 @@ class StatusBar(Static):
             parts.append(escape(self.file_info))
         if self.command:
             parts.append(f"[bold yellow]{escape(self.command)}[/]")
+        if self.progress:
+            parts.append(f"[italic]{escape(self.progress)}[/]")
 
         text = Text.from_markup(" ".join(parts))
 
@@ -678,24 +1414,34 @@ class CodeEditor(TextArea):
             self.score = 0
 
     def _get_local_completions(self) -> list:
-        # Cache local completions to avoid expensive regex on every keystroke
-        if not hasattr(self, '_local_completions_cache') or self._text_changed_since_cache:
-            pattern = re.compile(r"[A-Za-z_]\w*")
-            tokens_found = set(pattern.findall(self.text))
-            python_keywords = {
-                "False", "None", "True", "and", "as", "assert", "async", "await",
-                "break", "class", "continue", "def", "del", "elif", "else", "except",
-                "finally", "for", "from", "global", "if", "import", "in", "is",
-                "lambda", "nonlocal", "not", "or", "pass", "raise", "return",
-                "try", "while", "with", "yield",
-            }
-            tokens_found = tokens_found - python_keywords
-
-            self._local_completions_cache = []
-            for tok in sorted(tokens_found):
-                if len(tok) > 1:  # Skip single-letter tokens
-                    self._local_completions_cache.append(CodeEditor._LocalCompletion(tok))
-            
+        outline = self.outline
+        if outline is not None:
+            # Identifiers from the background outline parse, which is at most
+            # a typing pause behind; defined symbols say what they are
+            if self._local_completions_outline is not outline:
+                symbols = {symbol.name: symbol for symbol in outline.symbols}
+                completions = []
+                for name in outline.identifiers:
+                    completion = CodeEditor._LocalCompletion(name)
+                    symbol = symbols.get(name)
+                    if symbol is not None:
+                        completion.type = symbol.kind
+                        completion.description = (
+                            f"{symbol.kind.capitalize()} {symbol.qualname} "
+                            f"(line {symbol.row + 1})"
+                        )
+                    completions.append(completion)
+                self._local_completions_cache = completions
+                self._local_completions_outline = outline
+            return self._local_completions_cache
+
+        # No outline yet (the buffer was just opened): scan the text
+        if self._local_completions_outline is not None or self._text_changed_since_cache:
+            self._local_completions_cache = [
+                CodeEditor._LocalCompletion(name)
+                for name in scan_identifiers(self.text)
+            ]
+            self._local_completions_outline = None
             self._text_changed_since_cache = False
 
         return self._local_completions_cache
@@ -745,8 +1491,20 @@ class CodeEditor(TextArea):
             super().__init__()
             self.is_modified = is_modified
 
-        def action_noop(self) -> None:
-            pass
+    class FileSaved(Message):
+        def __init__(self, path: str) -> None:
+            super().__init__()
+            self.path = path
+
+    class OutlineChanged(Message):
+        """The outline of the active buffer changed (None if it has none)."""
+
+        def __init__(self, outline: Optional[Outline]) -> None:
+            super().__init__()
+            self.outline = outline
+
+    def action_noop(self) -> None:
+        pass
 
     def __init__(self) -> None:
         super().__init__(language="python", theme="monokai", show_line_numbers=True)
@@ -766,11 +1524,16 @@ class CodeEditor(TextArea):
         self._visual_mode = None  # None, 'char', 'line'
         self._last_action = None
         self._registers = {}  # Vim registers
+        self._search = None  # Last / or ? search (a BufferSearch)
+        self._search_highlighted = False
+        self._visual_rows = None  # Rows of the last visual selection, for '<,'>
         
         # Completion state
         self._completion_popup = None
         self._completion_debounce_timer = None
         self._local_completions_cache = []
+        self._local_completions_table = None
+        self._local_completions_source = None
         self._text_changed_since_cache = True
         
         # Editor state
@@ -783,6 +1546,25 @@ class CodeEditor(TextArea):
         self.status_bar.update_mode("NORMAL")
         self.tabs = []
         self.active_tab_index = -1
+        # Serializes background saves so two writes of one file never overlap
+        self._save_lock = threading.Lock()
+        # Keeps inactive tabs within a memory budget by spilling them to disk
+        self._tab_cache = TabCache()
+        # Set while a tab's own text is loaded, which isn't an edit to journal
+        self._loading_buffer = False
+        self._swap_flush_timer = None
+        # Word/character counts for the status bar, updated from edits
+        self._text_stats = TextStats()
+        self._status_dirty = False
+        # Symbols and identifiers of the buffer, parsed in the background once
+        # typing pauses and shared by the outline panel, completion and gd
+        self.buffer_version = next_version()
+        self.outline: Optional[Outline] = None
+        self._outline_cache = OutlineCache()
+        self._outline_timer = None
+        self._local_completions_outline = None
+        # Definitions in every Python file under the tree root, set by NestView
+        self.symbol_index: Optional[SymbolIndex] = None
         self.autopairs = {"{": "}", "(": ")", "[": "]", '"': '"', "'": "'"}
         self._word_pattern = re.compile(r"[\w\.]")
 
@@ -853,6 +1635,11 @@ class CodeEditor(TextArea):
             "numpy": "Numerical computing",
         }
 
+        # Builtins never change, so their fuzzy table is built once
+        self._builtins_table = CandidateTable(
+            list(self._builtins.items()), key=lambda item: item[0]
+        )
+
     def _save_positions(self) -> None:
         self._last_scroll_position = self.scroll_offset
         self._last_cursor_position = self.cursor_location
@@ -866,9 +1653,99 @@ class CodeEditor(TextArea):
 
     def on_mount(self) -> None:
         self.status_bar.update_mode("NORMAL")
+        db = getattr(self.app, "db", None)
+        if db is not None:
+            try:
+                budget = db.get_tab_memory_budget()
+            except Exception:
+                budget = None
+            if budget:
+                self._tab_cache.budget = budget
+        self._update_status_info()
+
+    def on_unmount(self) -> None:
+        self._save_session()
+        self._tab_cache.clear()
+        # Unsaved buffers keep their journals to be recovered next time
+        self._flush_swaps()
+
+    def session_tabs(self) -> list:
+        """The open tabs as rows for :meth:`CalendarDB.save_editor_session`."""
+        rows = []
+        for index, tab in enumerate(self.tabs):
+            active = index == self.active_tab_index
+            cursor = self.cursor_location if active else tab.cursor_position
+            scroll = self.scroll_offset if active else tab.scroll_position
+            rows.append(
+                {
+                    "path": str(tab.path),
+                    "cursor_row": cursor[0],
+                    "cursor_column": cursor[1],
+                    "scroll_x": scroll[0],
+                    "scroll_y": scroll[1],
+                    "active": active,
+                }
+            )
+        return rows
+
+    def _save_session(self) -> None:
+        db = getattr(self.app, "db", None)
+        if db is None:
+            return
+        try:
+            db.save_editor_session(self.session_tabs())
+        except Exception as e:
+            self.notify(f"Could not save editor session: {e}", severity="warning")
+
+    def restore_session(self, entries: list) -> None:
+        """Reopen the tabs of a saved session.
+
+        Only the active tab's file is read now, the others are read when they
+        are first shown, so restoring many tabs costs about one file open.
+        """
+        if self.tabs:
+            return
+        active = 0
+        for entry in entries:
+            if not os.path.isfile(entry["path"]):
+                continue
+            if entry["active"]:
+                active = len(self.tabs)
+            self.tabs.append(
+                EditorTab.restored(
+                    entry["path"],
+                    (entry["cursor_row"], entry["cursor_column"]),
+                    (entry["scroll_x"], entry["scroll_y"]),
+                )
+            )
+        if not self.tabs:
+            return
+        self.active_tab_index = active
+        tab = self.tabs[active]
+        self._load_tab_content(tab)
+        self.current_file = tab.path
+        self._modified = False
+        self.set_language_from_file(str(tab.path))
+        # Scrolling needs the editor's size, known after the next refresh
+        self.call_after_refresh(self._restore_buffer_state)
         self._update_status_info()
 
     def _update_status_info(self) -> None:
+        """Refresh the status bar once the current frame has been handled.
+
+        Any number of calls while handling one batch of input (every edit
+        makes one) result in a single refresh.
+        """
+        if self._status_dirty:
+            return
+        self._status_dirty = True
+        if self.is_running:
+            self.call_after_refresh(self._refresh_status_info)
+        else:
+            self._refresh_status_info()
+
+    def _refresh_status_info(self) -> None:
+        self._status_dirty = False
         file_info = []
         if self.tabs:
             file_info.append(f"[{self.active_tab_index + 1}/{len(self.tabs)}]")
@@ -876,10 +1753,24 @@ class CodeEditor(TextArea):
             file_info.append(os.path.basename(str(self.current_file)))
         if self._modified:
             file_info.append("[bold red][+][/]")
-        if self.text:
-            lines = len(self.text.split("\n"))
-            chars = len(self.text)
-            file_info.append(f"{lines}L, {chars}B")
+        large_file = self._get_large_file()
+        if large_file is not None:
+            tab = self.tabs[self.active_tab_index]
+            lines = large_file.line_count
+            indexing = "" if large_file.indexed else "+ (indexing)"
+            file_info.append(f"{lines}L{indexing}, {large_file.size}B")
+            file_info.append(f"[large {tab.chunk + 1}/{large_file.chunk_count}]")
+        elif self._text_stats.chars:
+            stats = self._text_stats
+            file_info.append(
+                f"{self.document.line_count}L, {stats.words}W, {stats.chars}B"
+            )
+        if self.tabs and self.active_tab_index >= 0:
+            tab = self.tabs[self.active_tab_index]
+            file_info.append(
+                f"mem {format_size(tab.memory_usage())}"
+                f"/{format_size(self._tab_cache.resident_memory)}"
+            )
 
         # Show vim command if any
         command_info = ""
@@ -895,6 +1786,13 @@ class CodeEditor(TextArea):
 
         self.status_bar.update_file_info(" ".join(file_info))
 
+    def _mark_modified(self) -> None:
+        """Flag the buffer as changed; listeners only hear about the first change."""
+        if not self._modified:
+            self._modified = True
+            self.post_message(self.FileModified(True))
+            self._update_status_info()
+
     def _get_current_undo_stack(self) -> list:
         """Get the undo stack for the current buffer."""
         if self.tabs and self.active_tab_index >= 0:
@@ -911,9 +1809,18 @@ class CodeEditor(TextArea):
         """Save current cursor and scroll position to the active buffer."""
         if self.tabs and self.active_tab_index >= 0:
             tab = self.tabs[self.active_tab_index]
+            if tab.chunk_loading:
+                # The editor doesn't show the chunk yet, so there is nothing to
+                # keep; the position is where it will be shown
+                tab.modified = self._modified
+                return
             tab.cursor_position = self.cursor_location
             tab.scroll_position = self.scroll_offset
-            tab.content = self.text
+            if tab.large_file is not None:
+                # Only the visible chunk lives in the editor; park it in the buffer
+                tab.large_file.set_chunk_text(tab.chunk, self.text)
+            else:
+                tab.content = self.text
             tab.modified = self._modified
     
     def _restore_buffer_state(self) -> None:
@@ -923,6 +1830,411 @@ class CodeEditor(TextArea):
             self.move_cursor(tab.cursor_position)
             self.scroll_to(tab.scroll_position[0], tab.scroll_position[1], animate=False)
 
+    def _buffer_text(self, tab: EditorTab) -> str:
+        """Current text of a tab; the active tab's lives in the editor."""
+        if 0 <= self.active_tab_index < len(self.tabs) and (
+            self.tabs[self.active_tab_index] is tab
+        ):
+            return self.text
+        return tab.content
+
+    def _get_large_file(self) -> Optional[LargeFileBuffer]:
+        """Return the active tab's large-file buffer, if it is in large-file mode."""
+        if self.tabs and 0 <= self.active_tab_index < len(self.tabs):
+            return self.tabs[self.active_tab_index].large_file
+        return None
+
+    def _load_tab_content(self, tab: EditorTab) -> None:
+        """Load a tab into the editor; large files only load their current chunk."""
+        if not tab.loaded:
+            problem = tab.load()
+            if problem:
+                self.notify(problem, severity="warning")
+        # The tab of a file that couldn't be read shows nothing and can't be
+        # edited; it is read again the next time it is shown
+        self.read_only = not tab.loaded
+        if tab.large_file is not None:
+            large_file = tab.large_file
+            # Without a running app there is no UI to keep responsive
+            tab.chunk_loading = self.is_running and not (
+                large_file.chunk_ready(tab.chunk)
+            )
+            if tab.chunk_loading:
+                # Reading it now would block until the indexer gets there
+                self.read_only = True
+                self._load_buffer_text("")
+                self.run_worker(
+                    partial(self._wait_for_chunk, tab, tab.chunk),
+                    thread=True,
+                    group="chunk-load",
+                    exclusive=True,
+                )
+            else:
+                self._load_buffer_text(large_file.read_chunk(tab.chunk))
+            self.line_number_start = large_file.chunk_start_line(tab.chunk) + 1
+        else:
+            self._load_buffer_text(tab.content)
+            self.line_number_start = 1
+        self._enforce_tab_budget(tab)
+
+    def _wait_for_chunk(self, tab: EditorTab, chunk: int) -> None:
+        worker = get_current_worker()
+        large_file = tab.large_file
+        line = (chunk + 1) * large_file.chunk_lines
+        while not large_file.wait_for_line(line, timeout=0.1):
+            if worker.is_cancelled or large_file.closed:
+                return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._show_indexed_chunk, tab, chunk)
+
+    def _show_indexed_chunk(self, tab: EditorTab, chunk: int) -> None:
+        """Show a chunk that was waiting for the indexer, if still wanted."""
+        active = 0 <= self.active_tab_index < len(self.tabs) and (
+            self.tabs[self.active_tab_index] is tab
+        )
+        if not active or not tab.chunk_loading or tab.chunk != chunk:
+            return
+        self._load_tab_content(tab)
+        self.move_cursor(tab.cursor_position)
+        self.scroll_cursor_visible(center=True)
+        self._update_status_info()
+
+    def _load_buffer_text(self, text: str) -> None:
+        """Show a buffer's text without journaling it as an edit."""
+        self._loading_buffer = True
+        try:
+            self.load_text(text)
+        finally:
+            self._loading_buffer = False
+
+    def _active_swap(self) -> Optional[SwapJournal]:
+        """The swap journal for edits to the active buffer, if it keeps one."""
+        if self._loading_buffer or not self.is_running:
+            return None
+        if not self.tabs or not 0 <= self.active_tab_index < len(self.tabs):
+            return None
+        tab = self.tabs[self.active_tab_index]
+        if tab.large_file is not None:
+            # Large files are edited in place chunk by chunk
+            return None
+        if tab.swap is None:
+            tab.swap = SwapJournal(str(tab.path))
+        return tab.swap
+
+    def edit(self, edit):
+        journal = self._active_swap()
+        if journal is not None and not journal.has_snapshot:
+            # The journal starts from the text before its first edit
+            journal.record_snapshot(self.text)
+        first_row = min(edit.from_location, edit.to_location)[0]
+        last_row = max(edit.from_location, edit.to_location)[0]
+        old_words = count_line_words(self.document.lines[first_row : last_row + 1])
+        result = super().edit(edit)
+        new_words = count_line_words(
+            self.document.lines[first_row : result.end_location[0] + 1]
+        )
+        self._text_stats.apply_edit(
+            result.replaced_text, edit.text, old_words, new_words
+        )
+        self._update_status_info()
+        self._buffer_changed()
+        if journal is not None:
+            journal.record_edit(edit.from_location, edit.to_location, edit.text)
+            self._schedule_swap_flush()
+        return result
+
+    def load_text(self, text: str) -> None:
+        journal = self._active_swap()
+        old_lines = self.document.lines
+        super().load_text(text)
+        self._text_stats.reset(text)
+        self._update_status_info()
+        if self._loading_buffer and 0 <= self.active_tab_index < len(self.tabs):
+            self._buffer_switched(self.tabs[self.active_tab_index].version)
+        else:
+            self._buffer_changed()
+        if journal is None:
+            return
+        if journal.has_snapshot:
+            # Vim commands replace the whole text; journal just what changed
+            change = line_diff(old_lines, self.document.lines)
+            if change is not None:
+                journal.record_edit(*change)
+        else:
+            journal.record_snapshot(text)
+        self._schedule_swap_flush()
+
+    def _schedule_swap_flush(self) -> None:
+        if self._swap_flush_timer is None:
+            self._swap_flush_timer = self.set_timer(FLUSH_DELAY, self._flush_swaps)
+
+    def _flush_swaps(self) -> None:
+        """Write the pending journal records of every buffer."""
+        self._swap_flush_timer = None
+        for index, tab in enumerate(self.tabs):
+            journal = tab.swap
+            if journal is None or not journal.dirty:
+                continue
+            if journal.needs_compaction and index == self.active_tab_index:
+                journal.record_snapshot(self.text)
+            try:
+                journal.flush()
+            except OSError as e:
+                self.notify(f"Cannot write swap file: {e}", severity="warning")
+                return
+
+    def _buffer_changed(self) -> None:
+        """Give the edited buffer a new version and outline it once typing pauses."""
+        self.buffer_version = next_version()
+        if 0 <= self.active_tab_index < len(self.tabs):
+            self.tabs[self.active_tab_index].version = self.buffer_version
+        self._schedule_outline()
+
+    def _buffer_switched(self, version: int) -> None:
+        """Show the outline of a buffer loaded into the editor, if it is cached."""
+        self.buffer_version = version
+        outline = self._outline_cache.get(version)
+        self._set_outline(outline)
+        if outline is None:
+            self._schedule_outline()
+
+    def _schedule_outline(self) -> None:
+        if not self.is_running:
+            return
+        if self._outline_timer is not None:
+            self._outline_timer.stop()
+        self._outline_timer = self.set_timer(PARSE_DELAY, self._start_outline)
+
+    def _is_python_buffer(self) -> bool:
+        return self.language == "python" or str(self.current_file or "").endswith(
+            (".py", ".pyi")
+        )
+
+    def _outline_enabled(self) -> bool:
+        # Large files are only ever loaded a chunk at a time
+        return self._get_large_file() is None
+
+    def _start_outline(self) -> None:
+        self._outline_timer = None
+        version = self.buffer_version
+        if not self._outline_enabled() or self._outline_cache.get(version):
+            return
+        self.run_worker(
+            partial(
+                self._outline_worker,
+                version,
+                self.text,
+                self._is_python_buffer(),
+                self.outline,
+            ),
+            thread=True,
+            group="outline",
+            exclusive=True,
+        )
+
+    def _outline_worker(
+        self, version: int, text: str, python: bool, previous: Optional[Outline]
+    ) -> None:
+        outline = parse_outline(text, version, python, previous)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._outline_ready, outline)
+
+    def _outline_ready(self, outline: Outline) -> None:
+        self._outline_cache.put(outline)
+        if outline.version == self.buffer_version:
+            self._set_outline(outline)
+
+    def _set_outline(self, outline: Optional[Outline]) -> None:
+        if outline is self.outline:
+            return
+        self.outline = outline
+        self.post_message(self.OutlineChanged(outline))
+
+    def current_outline(self) -> Optional[Outline]:
+        """The outline of the buffer as it is now, parsing it if it isn't cached.
+
+        Unlike :attr:`outline`, which may lag behind typing, this is always up
+        to date; a parse done here is cached like a background one.
+        """
+        if not self._outline_enabled():
+            return None
+        outline = self._outline_cache.get(self.buffer_version)
+        if outline is None:
+            outline = parse_outline(
+                self.text,
+                self.buffer_version,
+                self._is_python_buffer(),
+                self.outline,
+            )
+            self._outline_cache.put(outline)
+            self._set_outline(outline)
+        return outline
+
+    def request_outline(self) -> Optional[Outline]:
+        """The latest outline, with a parse started right away if it is stale."""
+        if self._outline_enabled() and (
+            self.outline is None or self.outline.version != self.buffer_version
+        ):
+            if self._outline_timer is not None:
+                self._outline_timer.stop()
+                self._outline_timer = None
+            if self.is_running:
+                self._start_outline()
+        return self.outline
+
+    def goto_symbol(self, symbol: Symbol) -> None:
+        self.goto_location(symbol.row, symbol.column)
+
+    def _word_at_cursor(self) -> str:
+        row, column = self.cursor_location
+        line = self.document.get_line(row)
+        start = column
+        while start > 0 and (line[start - 1].isalnum() or line[start - 1] == "_"):
+            start -= 1
+        end = column
+        while end < len(line) and (line[end].isalnum() or line[end] == "_"):
+            end += 1
+        return line[start:end]
+
+    def action_goto_definition(self) -> None:
+        """Jump to the definition of the word under the cursor (vim ``gd``)."""
+        word = self._word_at_cursor()
+        if not word:
+            return
+        outline = self.current_outline()
+        symbol = (
+            outline.find_definition(word, self.cursor_location[0]) if outline else None
+        )
+        if symbol is not None:
+            self.goto_symbol(symbol)
+        elif not self._goto_project_definition(word):
+            self.notify(f"No definition found for {word}", severity="warning")
+
+    def _goto_project_definition(self, name: str) -> bool:
+        """Jump to a definition of ``name`` in another file of the project."""
+        if self.symbol_index is None:
+            return False
+        try:
+            matches = self.symbol_index.find(name)
+        except sqlite3.Error:
+            return False
+        if not matches:
+            return False
+        here = os.path.dirname(os.path.abspath(str(self.current_file or "")))
+        # The definition closest to this file wins, top-level ones first
+        best = max(
+            matches,
+            key=lambda match: (
+                len(os.path.commonpath([here, match.path])),
+                match.parent is None,
+            ),
+        )
+        self.open_file(best.path)
+        if self.current_file != best.path:
+            return True
+        self.goto_location(best.row, best.column)
+        if len(matches) > 1:
+            self.notify(f"{best.qualname}: 1 of {len(matches)} definitions")
+        return True
+
+    def recover_buffer(self, buffer: RecoveredBuffer) -> None:
+        """Open a buffer recovered from a swap journal as an unsaved change."""
+        if os.path.exists(buffer.path):
+            self.open_file(buffer.path)
+        else:
+            self._add_tab(buffer.path, "")
+        if self.current_file != buffer.path or self._get_large_file() is not None:
+            return
+        # Undo goes back to the file as it is on disk
+        self._save_undo_state(self.text)
+        self.load_text(buffer.text)
+        self._mark_modified()
+        self.tabs[self.active_tab_index].modified = True
+        self._update_status_info()
+
+    def rename_tabs(self, source: str, destination: str) -> None:
+        """Point tabs of ``source`` (or files below it) at its new location."""
+        prefix = source.rstrip(os.sep) + os.sep
+        renamed = False
+        for index, tab in enumerate(self.tabs):
+            path = str(tab.path)
+            if path != source and not path.startswith(prefix):
+                continue
+            tab.path = destination + path[len(source) :]
+            if tab.large_file is not None:
+                tab.large_file.path = tab.path
+            if tab.swap is not None:
+                # Journals record their file's path: start a new one
+                tab.swap.discard()
+                tab.swap = None
+                if tab.modified and self.is_running:
+                    tab.swap = SwapJournal(tab.path)
+                    tab.swap.record_snapshot(self._buffer_text(tab))
+                    self._schedule_swap_flush()
+            if index == self.active_tab_index:
+                self.current_file = tab.path
+            renamed = True
+        if renamed:
+            self._update_status_info()
+            self._save_session()
+
+    def _enforce_tab_budget(self, active: EditorTab) -> None:
+        """Mark ``active`` as most recently used and spill tabs over the budget."""
+        self._tab_cache.touch(active)
+        self._tab_cache.enforce(self.tabs, active)
+
+    def _large_file_goto_chunk(self, chunk: int, row: int = 0) -> None:
+        """Swap the visible chunk of a large file, keeping edits to the old one."""
+        tab = self.tabs[self.active_tab_index]
+        large_file = tab.large_file
+        chunk = max(0, min(chunk, large_file.chunk_count - 1))
+        if not tab.chunk_loading:
+            large_file.set_chunk_text(tab.chunk, self.text)
+        if chunk != tab.chunk:
+            tab.chunk = chunk
+            # Undo snapshots are chunk text, so they can't cross chunks
+            tab.undo_stack.clear()
+            tab.redo_stack.clear()
+            # Where to put the cursor if the chunk has to wait for the indexer
+            tab.cursor_position = (row, 0)
+            self._load_tab_content(tab)
+        row = max(0, min(row, self.document.line_count - 1))
+        self.move_cursor((row, 0))
+        self.scroll_cursor_visible(center=True)
+        self._update_status_info()
+
+    def _large_file_goto_line(self, line: int) -> None:
+        """Jump to an absolute (0-based) line of a large file."""
+        large_file = self._get_large_file()
+        self._large_file_goto_chunk(*large_file.locate_line(line))
+
+    def goto_location(self, line: int, column: int = 0) -> None:
+        """Move the cursor to a 0-based line and column of the current file."""
+        if self._get_large_file() is not None:
+            self._large_file_goto_line(max(0, line))
+            self.move_cursor((self.cursor_location[0], column))
+            return
+        line = max(0, min(line, self.document.line_count - 1))
+        self.move_cursor((line, column))
+        self.scroll_cursor_visible(center=True)
+        self._update_status_info()
+
+    def _large_file_move(self, delta: int) -> bool:
+        """Cross into a neighbouring chunk if moving ``delta`` rows leaves this one."""
+        large_file = self._get_large_file()
+        if large_file is None:
+            return False
+        tab = self.tabs[self.active_tab_index]
+        row = self.cursor_location[0] + delta
+        last_row = self.document.line_count - 1
+        if row > last_row and tab.chunk < large_file.chunk_count - 1:
+            self._large_file_goto_chunk(tab.chunk + 1, row - last_row - 1)
+            return True
+        if row < 0 and tab.chunk > 0:
+            self._large_file_goto_chunk(tab.chunk - 1, large_file.chunk_lines + row)
+            return True
+        return False
+
     def _save_undo_state(self, text: str = None) -> None:
         """Save state to undo stack of the current buffer."""
         if not self._is_undoing and self.tabs and self.active_tab_index >= 0:
@@ -1274,11 +2586,12 @@ class CodeEditor(TextArea):
         # Command mode handling
         if self.in_command_mode:
             if event.key == "enter":
-                self.execute_command()
+                # Leave command mode first so the command can report a result
                 self.in_command_mode = False
-                self.command = ""
                 self.status_bar.update_mode(self.mode.upper())
                 self.status_bar.update_command("")
+                self.execute_command()
+                self.command = ""
             elif event.key == "escape":
                 self.in_command_mode = False
                 self.command = ""
@@ -1314,8 +2627,7 @@ class CodeEditor(TextArea):
         elif event.key == "enter":
             self._save_undo_state(self.text)  # Save state before change
             self.handle_indent()
-            self._modified = True
-            self.post_message(self.FileModified(True))
+            self._mark_modified()
             event.prevent_default()
             event.stop()
         elif event.key == "tab":
@@ -1327,8 +2639,7 @@ class CodeEditor(TextArea):
         elif event.key == "backspace":
             self._save_undo_state(self.text)  # Save state before change
             self.handle_backspace()
-            self._modified = True
-            self.post_message(self.FileModified(True))
+            self._mark_modified()
             event.prevent_default()
             event.stop()
         elif event.is_printable:
@@ -1342,9 +2653,8 @@ class CodeEditor(TextArea):
             else:
                 self.insert(event.character)
             
-            self._modified = True
+            self._mark_modified()
             self._text_changed_since_cache = True
-            self.post_message(self.FileModified(True))
             
             # Always trigger completion check when typing
             self._trigger_completions()
@@ -1365,6 +2675,14 @@ class CodeEditor(TextArea):
 
         count = int(self._vim_count) if self._vim_count else 1
 
+        # gd - go to definition
+        if char == "d" and self._vim_command == "g" and not self._pending_operator:
+            self._clear_vim_state()
+            self.action_goto_definition()
+            event.prevent_default()
+            event.stop()
+            return
+
         # Handle operators
         if self._pending_operator:
             if char in ["d", "c", "y"]:  # dd, cc, yy
@@ -1384,6 +2702,12 @@ class CodeEditor(TextArea):
                 else:
                     self._clear_vim_state()
 
+        # Large files: j/k past the edge of the visible chunk load the next one
+        elif char in ["j", "k"] and self._large_file_move(count if char == "j" else -count):
+            self._clear_vim_state()
+            event.prevent_default()
+            event.stop()
+
         # Basic motions
         elif char in ["h", "j", "k", "l", "w", "b", "e", "0", "^", "$"]:
             new_pos = self._vim_execute_motion(char, count)
@@ -1396,7 +2720,9 @@ class CodeEditor(TextArea):
         elif char == "g":
             if self._vim_command == "g":
                 # gg - go to top (preserve scroll unless explicitly going to top)
-                if count == 1:
+                if self._get_large_file() is not None:
+                    self._large_file_goto_line(count - 1)
+                elif count == 1:
                     # Normal gg - go to top and reset scroll to show beginning
                     self.move_cursor((0, 0))
                     self.scroll_to(0, 0, animate=False)
@@ -1412,8 +2738,18 @@ class CodeEditor(TextArea):
             event.stop()
             
         elif char == "G":
+            large_file = self._get_large_file()
             lines = self.text.split("\n")
-            if self._vim_count:
+            if large_file is not None:
+                if self._vim_count:
+                    self._large_file_goto_line(count - 1)
+                else:
+                    if not large_file.indexed:
+                        self.notify("Still indexing, jumping to the last indexed line")
+                    self._large_file_goto_chunk(
+                        large_file.chunk_count - 1, large_file.chunk_lines
+                    )
+            elif self._vim_count:
                 line_num = min(count - 1, len(lines) - 1)
                 self._move_cursor_preserve_scroll((line_num, 0))
             else:
@@ -1504,14 +2840,19 @@ class CodeEditor(TextArea):
             self._clear_vim_state()
             event.prevent_default()
             event.stop()
-        elif char == ":":
+        elif char in (":", "/", "?"):
             self.in_command_mode = True
-            self.command = ":"
+            self.command = char
             self.status_bar.update_mode("COMMAND")
             self.status_bar.update_command(self.command)
             self._clear_vim_state()
             event.prevent_default()
             event.stop()
+        elif char in ("n", "N"):
+            self._search_next(reverse=char == "N", count=count)
+            self._clear_vim_state()
+            event.prevent_default()
+            event.stop()
         elif event.key == "ctrl+space":
             self.action_show_completions()
             self._clear_vim_state()
@@ -1573,6 +2914,18 @@ class CodeEditor(TextArea):
                 self.action_enter_normal_mode()
             event.prevent_default()
             event.stop()
+        elif char == ":":
+            # Run an ex command on the selected lines, e.g. :'<,'>s/a/b/
+            start_row = self._visual_start[0]
+            end_row = self.cursor_location[0]
+            self._visual_rows = (min(start_row, end_row), max(start_row, end_row))
+            self.action_enter_normal_mode()
+            self.in_command_mode = True
+            self.command = ":'<,'>"
+            self.status_bar.update_mode("COMMAND")
+            self.status_bar.update_command(self.command)
+            event.prevent_default()
+            event.stop()
         else:
             # For unhandled keys, clear the count and ignore
             self._vim_count = ""
@@ -1908,7 +3261,28 @@ class CodeEditor(TextArea):
         current_word = line[word_start:col]
         return current_word, word_start
 
+    # Small per-source priors so that, between equally good fuzzy matches,
+    # builtins beat context patterns, which beat jedi and then local symbols
+    _COMPLETION_SOURCE_BONUS = {
+        "builtin": 6,
+        "context": 4,
+        "jedi": 2,
+        "local": 0,
+    }
+
+    def _get_local_completions_table(self) -> CandidateTable:
+        local_completions = self._get_local_completions()
+        table = self._local_completions_table
+        if table is None or self._local_completions_source is not local_completions:
+            table = CandidateTable(local_completions, key=lambda comp: comp.name)
+            self._local_completions_table = table
+            self._local_completions_source = local_completions
+        return table
+
     def _get_completions(self) -> list:
+        if self._get_large_file() is not None:
+            # Completion is disabled in large-file mode
+            return []
         try:
             current_word, _ = self._get_current_word()
             
@@ -1926,50 +3300,56 @@ class CodeEditor(TextArea):
                     seen.add(keyword)
                 return suggestions[:10]
 
-            # Builtins - most relevant
-            for name, (type_, desc) in self._builtins.items():
-                if name.startswith(current_word):
-                    comp = self._create_completion(name, "builtin", desc)
-                    comp.score = 1000
-                    suggestions.append(comp)
-                    seen.add(name)
+            limit = 15
+            ranked = {}
+
+            def add(comp, score: int, source: str) -> None:
+                score += self._COMPLETION_SOURCE_BONUS[source]
+                existing = ranked.get(comp.name)
+                if existing is None or existing.score < score:
+                    comp.score = score
+                    ranked[comp.name] = comp
+
+            # Builtins - precomputed table
+            for score, (name, (type_, desc)) in self._builtins_table.rank(
+                current_word, limit
+            ):
+                add(self._create_completion(name, "builtin", desc), score, "builtin")
 
             # Context suggestions - keywords, patterns
-            context_suggestions = self._get_context_suggestions()
-            for suggestion in context_suggestions:
-                if suggestion.name not in seen and suggestion.name.startswith(current_word):
-                    suggestion.score = 800
-                    suggestions.append(suggestion)
-                    seen.add(suggestion.name)
+            for suggestion in self._get_context_suggestions():
+                score = fuzzy_score(current_word, suggestion.name)
+                if score is not None:
+                    add(suggestion, score, "context")
 
             # Jedi completions - only for Python files and if not too many characters
             if self.current_file and str(self.current_file).endswith('.py') and len(self.text) < 50000:
                 try:
                     script = Script(code=self.text, path=str(self.current_file))
                     row, column = self.cursor_location
-                    jedi_completions = script.complete(row + 1, column)
+                    jedi_completions = script.complete(row + 1, column, fuzzy=True)
                     
                     # Limit jedi results to avoid performance issues
-                    for comp in jedi_completions[:20]:  # Max 20 jedi completions
-                        if comp.name not in seen and comp.name.startswith(current_word):
-                            comp.score = 500
-                            suggestions.append(comp)
-                            seen.add(comp.name)
+                    for comp in jedi_completions[:50]:
+                        score = fuzzy_score(current_word, comp.name)
+                        if score is not None:
+                            add(comp, score, "jedi")
                 except Exception:
                     # Silently fail for jedi - it's not critical
                     pass
 
-            # Local completions - cached and filtered
-            local_completions = self._get_local_completions()
-            for comp in local_completions:
-                if comp.name not in seen and comp.name.startswith(current_word):
-                    comp.score = 100
-                    suggestions.append(comp)
-                    seen.add(comp.name)
+            # Local completions - cached table, rebuilt only when the text changes
+            for score, comp in self._get_local_completions_table().rank(
+                current_word, limit
+            ):
+                add(comp, score, "local")
 
             # Sort by score and limit results
-            suggestions.sort(key=lambda x: (-getattr(x, "score", 0), x.name.lower()))
-            return suggestions[:15]  # Limit to 15 total suggestions
+            suggestions = sorted(
+                ranked.values(),
+                key=lambda x: (-x.score, len(x.name), x.name.lower()),
+            )
+            return suggestions[:limit]
 
         except Exception as e:
             # For debugging - show the error temporarily
@@ -1977,44 +3357,12 @@ class CodeEditor(TextArea):
             return []
 
     def _score_suggestion(self, suggestion, current_word: str) -> float:
-        name = suggestion.name.lower()
-        current = current_word.lower()
-
-        similarity = SequenceMatcher(None, current, name).ratio()
-        score = similarity * 100
-
-        if name.startswith(current):
-            score += 20
-
-        score += 1.0 / len(name)
-
-        type_bonus = {
-            "function": 2.0,
-            "class": 2.0,
-            "keyword": 3.0,
-            "module": 1.5,
-            "method": 1.5,
-            "property": 1.0,
-        }
-        score += type_bonus.get(getattr(suggestion, "type", ""), 0.0)
-
-        return score
+        score = fuzzy_score(current_word, suggestion.name)
+        return float(score) if score is not None else 0.0
 
     def _fuzzy_match(self, pattern: str, text: str) -> bool:
-        """Simple fuzzy matching algorithm"""
-        pattern = pattern.lower()
-        text = text.lower()
-
-        if not pattern or not text:
-            return False
-
-        pattern_idx = 0
-        for char in text:
-            if char == pattern[pattern_idx]:
-                pattern_idx += 1
-                if pattern_idx == len(pattern):
-                    return True
-        return False
+        """fzf-style subsequence match (smart case)."""
+        return fuzzy_match(pattern, text)
 
     def _get_context_suggestions(self) -> list:
         row, col = self.cursor_location
@@ -2108,11 +3456,23 @@ class CodeEditor(TextArea):
             self.cursor_blink = True
 
     def execute_command(self) -> None:
+        if self.command.startswith(("/", "?")):
+            self._search_command(self.command)
+            return
+
         command = self.command[1:].strip()
 
+        substitution = parse_substitute(command)
+        if substitution is not None:
+            self._substitute_command(substitution)
+            return
+
         # Handle line number jumps (e.g., :42)
         if command.isdigit():
             line_num = int(command) - 1  # Convert to 0-based
+            if self._get_large_file() is not None:
+                self._large_file_goto_line(max(0, line_num))
+                return
             lines = self.text.split("\n")
             if 0 <= line_num < len(lines):
                 self._move_cursor_preserve_scroll((line_num, 0))
@@ -2126,11 +3486,8 @@ class CodeEditor(TextArea):
             if not self.current_file:
                 self.notify("No file name", severity="error")
                 return
-            self.action_save_file()
-            if self.tabs:
-                self.close_current_tab()
-            else:
-                self.clear_editor()
+            # The tab is closed once the save has landed, see _finish_save
+            self.action_save_file(close_after=True)
         elif command == "q":
             if self._modified:
                 self.notify(
@@ -2146,11 +3503,11 @@ class CodeEditor(TextArea):
                 self.close_current_tab()
             else:
                 self.clear_editor()
-        elif command == "x" or command == "wq":
+        elif command == "x":
             # Save and quit
             if self._modified and self.current_file:
-                self.action_save_file()
-            if self.tabs:
+                self.action_save_file(close_after=True)
+            elif self.tabs:
                 self.close_current_tab()
             else:
                 self.clear_editor()
@@ -2163,7 +3520,7 @@ class CodeEditor(TextArea):
                 
                 self.active_tab_index = (self.active_tab_index + 1) % len(self.tabs)
                 tab = self.tabs[self.active_tab_index]
-                self.load_text(tab.content)
+                self._load_tab_content(tab)
                 self.current_file = tab.path
                 self._modified = tab.modified
                 self.set_language_from_file(str(tab.path))
@@ -2178,7 +3535,7 @@ class CodeEditor(TextArea):
                 
                 self.active_tab_index = (self.active_tab_index - 1) % len(self.tabs)
                 tab = self.tabs[self.active_tab_index]
-                self.load_text(tab.content)
+                self._load_tab_content(tab)
                 self.current_file = tab.path
                 self._modified = tab.modified
                 self.set_language_from_file(str(tab.path))
@@ -2192,7 +3549,8 @@ class CodeEditor(TextArea):
                 marker = "%" if i == self.active_tab_index else " "
                 modified = "+" if tab.modified else " "
                 name = os.path.basename(tab.path)
-                buffer_list.append(f"{i + 1}{marker}{modified} {name}")
+                memory = "disk" if tab.spilled else format_size(tab.memory_usage())
+                buffer_list.append(f"{i + 1}{marker}{modified} {name} ({memory})")
             self.notify("\n".join(buffer_list) if buffer_list else "No buffers")
         elif command.startswith("e "):
             # Edit file - :e filename
@@ -2202,6 +3560,38 @@ class CodeEditor(TextArea):
                     self.open_file(filename)
                 except Exception as e:
                     self.notify(f"Cannot edit {filename}: {str(e)}", severity="error")
+        elif command.startswith("set tabmem="):
+            # Tab memory budget in megabytes, e.g. :set tabmem=128
+            try:
+                budget = int(float(command.split("=", 1)[1]) * 1024 * 1024)
+            except (ValueError, OverflowError):
+                self.notify("Usage: :set tabmem=<megabytes>", severity="warning")
+                return
+            if budget < 1024 * 1024:
+                self.notify("Tab memory budget must be at least 1 MB", severity="error")
+                return
+            self._tab_cache.budget = budget
+            db = getattr(self.app, "db", None)
+            if db is not None:
+                db.save_tab_memory_budget(budget)
+            if self.tabs and self.active_tab_index >= 0:
+                self._enforce_tab_budget(self.tabs[self.active_tab_index])
+            self.notify(f"Tab memory budget: {format_size(budget)}")
+            self._update_status_info()
+        elif command.startswith("set treeignore="):
+            # Comma separated ignore patterns for the file tree, e.g.
+            # :set treeignore=node_modules/,dist/,*.log
+            value = command.split("=", 1)[1]
+            patterns = [part.strip() for part in value.split(",") if part.strip()]
+            db = getattr(self.app, "db", None)
+            if db is not None:
+                db.save_tree_ignore_patterns(patterns)
+            tree = getattr(self.app, "main_tree", None)
+            if tree is not None:
+                tree.set_ignore_patterns(patterns)
+            self.notify("Tree ignore patterns: " + (", ".join(patterns) or "none"))
+        elif command in ["noh", "nohlsearch"]:
+            self._set_search(self._search, highlight=False)
         elif command == "set number" or command == "set nu":
             self.show_line_numbers = True
         elif command == "set nonumber" or command == "set nonu":
@@ -2209,17 +3599,141 @@ class CodeEditor(TextArea):
         else:
             self.notify(f"Unknown command: :{command}", severity="warning")
 
+    def get_line(self, line_index: int) -> Text:
+        line = super().get_line(line_index)
+        if self._search_highlighted and self._search is not None:
+            # Only rendered lines are fetched, so highlighting costs one regex
+            # scan per visible line however big the buffer is
+            for start, end in self._search.line_spans(line.plain):
+                line.stylize("reverse", start, end)
+        return line
+
+    def _set_search(self, search, highlight: bool = True) -> None:
+        self._search = search
+        self._search_highlighted = highlight and search is not None
+        # Rendered lines are cached without regard to the search highlight
+        self._line_cache.clear()
+        self.refresh()
+
+    def _search_command(self, command: str) -> None:
+        """Run ``/pattern`` or ``?pattern``; an empty pattern reuses the last one."""
+        pattern = command[1:]
+        if not pattern:
+            if self._search is None:
+                self.notify("No previous search pattern", severity="warning")
+                return
+            pattern = self._search.pattern
+        try:
+            search = BufferSearch(pattern, backward=command[0] == "?")
+        except re.error as e:
+            self.notify(f"Invalid pattern: {e}", severity="error")
+            return
+        self._set_search(search)
+        self._search_next()
+
+    def _search_next(self, reverse: bool = False, count: int = 1) -> None:
+        """Jump to the next match of the last search (``n``/``N``)."""
+        search = self._search
+        if search is None:
+            self.notify("No previous search pattern", severity="warning")
+            return
+        if not self._search_highlighted:
+            self._set_search(search)
+        result = search.find(self.document.lines, self.cursor_location, reverse, count)
+        if result is None:
+            self.notify(f"Pattern not found: {search.pattern}", severity="warning")
+            return
+        self.move_cursor(result.location)
+        self.scroll_cursor_visible(center=True)
+        self._update_status_info()
+        prefix = "?" if search.backward else "/"
+        status = f"{prefix}{search.pattern} [{result.index}/{result.total}]"
+        if result.wrapped:
+            status += " (wrapped)"
+        self.status_bar.update_command(status)
+
+    def _substitute_command(self, substitution) -> None:
+        """Run ``:[range]s/pattern/replacement/[flags]`` as a single edit."""
+        if self._get_large_file() is not None:
+            self.notify(
+                "Substitute is not supported for large files", severity="warning"
+            )
+            return
+        lines = self.document.lines
+        try:
+            first, last = parse_range(
+                substitution.range,
+                self.cursor_location[0],
+                len(lines) - 1,
+                self._visual_rows,
+            )
+        except ValueError as e:
+            self.notify(str(e), severity="error")
+            return
+
+        pattern = substitution.pattern
+        if not pattern:
+            if self._search is None:
+                self.notify("No previous search pattern", severity="warning")
+                return
+            pattern = self._search.pattern
+        if "i" in substitution.flags:
+            pattern += "\\c"
+        elif "I" in substitution.flags:
+            pattern += "\\C"
+        try:
+            regex = compile_pattern(pattern)
+        except re.error as e:
+            self.notify(f"Invalid pattern: {e}", severity="error")
+            return
+
+        replace_all = "g" in substitution.flags
+        result = substitute(
+            lines, first, last, regex, substitution.replacement, replace_all
+        )
+        if result is None:
+            self.notify(f"Pattern not found: {pattern}", severity="warning")
+            return
+
+        # One undo state and one edit, however many lines changed
+        self._save_undo_state(self.text)
+        self.replace(
+            result.text,
+            (result.first_row, 0),
+            (result.last_row, len(lines[result.last_row])),
+        )
+        self._mark_modified()
+        self._text_changed_since_cache = True
+        self._set_search(BufferSearch(pattern))
+        self.goto_location(result.cursor_row)
+        self.status_bar.update_command(
+            f"{result.count} substitution{'s' if result.count != 1 else ''}"
+            f" on {result.lines} line{'s' if result.lines != 1 else ''}"
+        )
+
     def close_current_tab(self) -> None:
         if not self.tabs:
             return
-
-        self.tabs.pop(self.active_tab_index)
+        self._close_tab(self.active_tab_index)
+
+    def _close_tab(self, index: int) -> None:
+        """Close the tab at ``index``, freeing its spill file, swap and map."""
+        closed = self.tabs.pop(index)
+        closed.release()
+        if closed.large_file is not None:
+            closed.large_file.close()
+        if index != self.active_tab_index:
+            if index < self.active_tab_index:
+                self.active_tab_index -= 1
+            self._update_status_info()
+            self._save_session()
+            return
         if self.tabs:
             self.active_tab_index = max(
                 0, min(self.active_tab_index, len(self.tabs) - 1)
             )
             tab = self.tabs[self.active_tab_index]
-            self.load_text(tab.content)
+            self._load_tab_content(tab)
             self.current_file = tab.path
             self._modified = tab.modified
             
@@ -2231,6 +3745,7 @@ class CodeEditor(TextArea):
             self.current_file = None
             self._modified = False
         self._update_status_info()
+        self._save_session()
 
     def render(self) -> str:
         content = str(super().render())
@@ -2241,6 +3756,12 @@ class CodeEditor(TextArea):
         return content
 
     def set_language_from_file(self, filepath: str) -> None:
+        if self._get_large_file() is not None:
+            # Syntax highlighting is disabled in large-file mode
+            self.language = None
+            self._syntax = None
+            return
+
         ext = os.path.splitext(filepath)[1].lower()
         language_map = {
             ".py": "python",
@@ -2339,20 +3860,96 @@ class CodeEditor(TextArea):
             for _ in range(self.tab_size):
                 self.action_delete_left()
 
-    def action_save_file(self) -> None:
-        if self.current_file:
+    def action_save_file(self, close_after: bool = False) -> None:
+        """Save the active buffer in the background.
+
+        With ``close_after`` its tab is closed once the save has succeeded.
+        """
+        if not self.current_file:
+            return
+        if 0 <= self.active_tab_index < len(self.tabs) and not (
+            self.tabs[self.active_tab_index].loaded
+        ):
+            self.notify(
+                f"Not saving {os.path.basename(str(self.current_file))}: "
+                "it couldn't be read",
+                severity="error",
+            )
+            return
+        path = str(self.current_file)
+        text = self.text
+        large_file = self._get_large_file()
+        if large_file is not None:
+            tab = self.tabs[self.active_tab_index]
+            if not tab.chunk_loading:
+                large_file.set_chunk_text(tab.chunk, text)
+            write = large_file.save
+        else:
+            write = partial(atomic_write_text, path, text)
+
+        if not self.is_running:
+            self._finish_save(path, text, *self._write_file(write), close_after)
+            return
+        self.status_bar.update_progress(f"Saving {os.path.basename(path)}")
+        self.run_worker(
+            partial(self._save_worker, write, path, text, close_after),
+            thread=True,
+            group="file-save",
+        )
+
+    def _write_file(self, write) -> tuple:
+        """Run a blocking save, returning ``(saved_size, error)``."""
+        with self._save_lock:
             try:
-                with open(str(self.current_file), "w", encoding="utf-8") as file:
-                    file.write(self.text)
-                self._modified = False
-                self.post_message(self.FileModified(False))
-                saved_size = os.path.getsize(str(self.current_file))
-                self.notify(
-                    f"Wrote {saved_size} bytes to {os.path.basename(str(self.current_file))}"
-                )
-                self._update_status_info()
+                return write(), None
             except (IOError, OSError) as e:
-                self.notify(f"Error saving file: {e}", severity="error")
+                return None, e
+
+    def _save_worker(self, write, path: str, text: str, close_after: bool) -> None:
+        saved_size, error = self._write_file(write)
+        self.app.call_from_thread(
+            self._finish_save, path, text, saved_size, error, close_after
+        )
+
+    def _finish_save(
+        self,
+        path: str,
+        text: str,
+        saved_size: Optional[int],
+        error: Optional[Exception],
+        close_after: bool = False,
+    ) -> None:
+        self.status_bar.update_progress("")
+        if error is not None:
+            # The tab (and its swap journal) stays open so nothing is lost
+            self.notify(f"Error saving file: {error}", severity="error")
+            return
+
+        tab = next((tab for tab in self.tabs if str(tab.path) == path), None)
+        # Only mark clean (or reload a large file's chunk) if nothing was
+        # typed while the save was running
+        if tab is not None and self._buffer_text(tab) == text:
+            if close_after:
+                tab.modified = False
+                self.notify(f"Wrote {saved_size} bytes to {os.path.basename(path)}")
+                self._close_tab(self.tabs.index(tab))
+                self.post_message(self.FileSaved(path))
+                return
+            if tab.large_file is not None:
+                if tab is self.tabs[self.active_tab_index]:
+                    cursor = self.cursor_location
+                    self._load_tab_content(tab)
+                    self._move_cursor_preserve_scroll(cursor)
+            elif tab.swap is not None:
+                tab.swap.discard()
+            tab.modified = False
+
+        if str(self.current_file) == path and (tab is None or not tab.modified):
+            self._modified = False
+            self.post_message(self.FileModified(False))
+        self.notify(f"Wrote {saved_size} bytes to {os.path.basename(path)}")
+        self._update_status_info()
+        self.post_message(self.FileSaved(path))
 
     def watch_text(self, old_text: str, new_text: str) -> None:
         if old_text != new_text:
@@ -2363,8 +3960,7 @@ class CodeEditor(TextArea):
             if not self._is_undoing:
                 self._save_undo_state(old_text)
 
-            self._modified = True
-            self.post_message(self.FileModified(True))
+            self._mark_modified()
 
             # Update current tab content and state
             if self.tabs and self.active_tab_index >= 0:
@@ -2555,6 +4151,34 @@ class CodeEditor(TextArea):
         dialog = NewFileDialog(current_path)
         await self.app.push_screen(dialog)
 
+    def _open_large_file(self, filepath: str) -> None:
+        """Open a file in large-file mode: memory-mapped and loaded chunk by chunk."""
+        large_file = LargeFileBuffer(filepath)
+        large_file.start_indexing()
+        new_tab = EditorTab(filepath, "")
+        new_tab.large_file = large_file
+        self.tabs.append(new_tab)
+        self.active_tab_index = len(self.tabs) - 1
+
+        self.current_file = filepath
+        self.set_language_from_file(str(filepath))
+        self._load_tab_content(new_tab)
+        self._modified = False
+        self.mode = "normal"
+        self.status_bar.update_mode("NORMAL")
+        self.cursor_blink = False
+
+        self.move_cursor((0, 0))
+        self.scroll_to(0, 0, animate=False)
+
+        self.focus()
+        self._update_status_info()
+        self._save_session()
+        self.notify(
+            "Large file: syntax highlighting and completion are disabled",
+            severity="information",
+        )
+
     def open_file(self, filepath: str) -> None:
         try:
             # Save current buffer state before switching
@@ -2565,7 +4189,7 @@ class CodeEditor(TextArea):
             for i, tab in enumerate(self.tabs):
                 if tab.path == filepath:
                     self.active_tab_index = i
-                    self.load_text(tab.content)
+                    self._load_tab_content(tab)
                     self.current_file = tab.path
                     self._modified = tab.modified
                     self.set_language_from_file(str(filepath))
@@ -2575,49 +4199,149 @@ class CodeEditor(TextArea):
                     self._update_status_info()
                     return
 
+            if is_large_file(filepath):
+                self._open_large_file(filepath)
+                return
+
             # Open new file
             with open(filepath, "r", encoding="utf-8") as file:
                 content = file.read()
-                new_tab = EditorTab(filepath, content)
-                self.tabs.append(new_tab)
-                self.active_tab_index = len(self.tabs) - 1
-
-                self.load_text(content)
-                self.current_file = filepath
-                self.set_language_from_file(str(filepath))
-                self._modified = False
-                self.mode = "normal"
-                self.status_bar.update_mode("NORMAL")
-                self.cursor_blink = False
-                
-                # Reset cursor and scroll for new file
-                self.move_cursor((0, 0))
-                self.scroll_to(0, 0, animate=False)
-                
-                self.focus()
-                self._update_status_info()
+            self._add_tab(filepath, content)
         except Exception as e:
             self.notify(f"Error opening file: {str(e)}", severity="error")
 
+    def _add_tab(self, filepath: str, content: str) -> None:
+        new_tab = EditorTab(filepath, content)
+        self.tabs.append(new_tab)
+        self.active_tab_index = len(self.tabs) - 1
+
+        self._load_buffer_text(content)
+        self._enforce_tab_budget(new_tab)
+        self.current_file = filepath
+        self.set_language_from_file(str(filepath))
+        self._modified = False
+        self.mode = "normal"
+        self.status_bar.update_mode("NORMAL")
+        self.cursor_blink = False
+
+        # Reset cursor and scroll for new file
+        self.move_cursor((0, 0))
+        self.scroll_to(0, 0, animate=False)
+
+        self.focus()
+        self._update_status_info()
+        self._save_session()
+
+    def open_file_async(self, filepath: str, check_binary: bool = True) -> None:
+        """Open ``filepath`` without blocking the UI.
+
+        Binary sniffing and reading happen on a worker thread, streaming the
+        file in chunks with progress shown in the status bar. Opening another
+        file cancels a read that is still in flight.
+        """
+        if not self.is_running or any(tab.path == filepath for tab in self.tabs):
+            self.open_file(filepath)
+            return
+        self.run_worker(
+            partial(self._open_file_worker, filepath, check_binary),
+            thread=True,
+            group="file-open",
+            exclusive=True,
+        )
+
+    def _open_file_worker(self, filepath: str, check_binary: bool) -> None:
+        worker = get_current_worker()
+        name = os.path.basename(str(filepath))
+        last_percent = -1
+
+        def progress(done: int, total: int) -> None:
+            nonlocal last_percent
+            percent = done * 100 // total if total else 100
+            if percent != last_percent and not worker.is_cancelled:
+                last_percent = percent
+                self.app.call_from_thread(
+                    self.status_bar.update_progress, f"Loading {name}", percent
+                )
+
+        try:
+            if check_binary:
+                problem = sniff_file(filepath)
+                if problem:
+                    self.app.call_from_thread(self.notify, problem, severity="warning")
+                    return
+            if is_large_file(filepath):
+                self.app.call_from_thread(self._finish_open, filepath, None)
+                return
+            content = read_text(
+                filepath, progress=progress, cancelled=lambda: worker.is_cancelled
+            )
+            if content is not None and not worker.is_cancelled:
+                self.app.call_from_thread(self._finish_open, filepath, content)
+        except UnicodeDecodeError:
+            self.app.call_from_thread(
+                self.notify,
+                "Cannot open file: Not a valid UTF-8 text file",
+                severity="warning",
+            )
+        except (IOError, OSError) as e:
+            self.app.call_from_thread(
+                self.notify, f"Error opening file: {str(e)}", severity="error"
+            )
+        finally:
+            if not worker.is_cancelled:
+                self.app.call_from_thread(self.status_bar.update_progress, "")
+
+    def _finish_open(self, filepath: str, content: Optional[str]) -> None:
+        """Show a file read by :meth:`_open_file_worker` (None means large-file mode)."""
+        if self.tabs and self.active_tab_index >= 0:
+            self._save_buffer_state()
+        if any(tab.path == filepath for tab in self.tabs):
+            self.open_file(filepath)
+        elif content is None:
+            self._open_large_file(filepath)
+        else:
+            self._add_tab(filepath, content)
+
 
 class NestView(Container, InitialFocusMixin):
     BINDINGS = [
         Binding("ctrl+h", "toggle_hidden", "Toggle Hidden Files", show=True),
         Binding("ctrl+b", "toggle_sidebar", "Toggle Sidebar", show=True),
+        Binding("ctrl+o", "toggle_outline", "Outline", show=True, priority=True),
         Binding("ctrl+right", "focus_editor", "Focus Editor", show=True),
         Binding("r", "refresh_tree", "Refresh Tree", show=True),
         Binding("ctrl+n", "new_file", "New File", show=True),
         Binding("ctrl+shift+n", "new_folder", "New Folder", show=True),
         Binding("d", "delete_selected", "Delete Selected", show=True),
         Binding("ctrl+v", "paste", "Paste", show=True),
+        Binding("ctrl+g", "cancel_transfers", "Cancel Paste", show=False),
         Binding("shift+/", "ContextMenu", "ContextMenu", show=True),
+        # Priority so the editor's key handling doesn't swallow it
+        Binding("ctrl+p", "quick_open", "Quick Open", show=True, priority=True),
+        # Most terminals can't send ctrl+shift+f, so ctrl+f works too
+        Binding(
+            "ctrl+shift+f,ctrl+f",
+            "find_in_files",
+            "Find in Files",
+            show=True,
+            priority=True,
+        ),
     ]
 
     def __init__(self) -> None:
         super().__init__()
         self.show_hidden = False
         self.show_sidebar = True
+        self.show_outline = False
         self.editor = None
+        self._file_matcher: Optional[FileMatcher] = None
+        self._file_index_root: Optional[str] = None
+        # Root and ignore patterns of the file index being built, if any
+        self._file_index_running: Optional[Tuple] = None
+        # Copies and moves running in worker threads
+        self._transfers: List[FileTransfer] = []
+        self.symbol_index: Optional[SymbolIndex] = None
+        self._symbol_index_running = False
 
     async def action_new_file(self) -> None:
         editor = self.query_one(CodeEditor)
@@ -2657,14 +4381,7 @@ class NestView(Container, InitialFocusMixin):
                 tabs_to_remove.append(i)
 
         for i in sorted(tabs_to_remove, reverse=True):
-            if i == editor.active_tab_index:
-                editor.close_current_tab()
-            else:
-                editor.tabs.pop(i)
-                if i < editor.active_tab_index:
-                    editor.active_tab_index -= 1
-
-        editor._update_status_info()
+            editor._close_tab(i)
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -2695,11 +4412,20 @@ class NestView(Container, InitialFocusMixin):
                     FilterableDirectoryTree(
                         os.path.expanduser("~"),
                         show_hidden=self.show_hidden,
+                        watch=True,
                         id="main_tree",
                     ),
                     classes="file-nav",
                 ),
                 Container(CustomCodeEditor(), classes="editor-container"),
+                Container(
+                    Horizontal(
+                        Static("Outline", classes="nav-title"),
+                        classes="nav-header",
+                    ),
+                    OutlinePanel(id="outline"),
+                    classes="outline-nav hidden",
+                ),
                 classes="main-container",
             ),
             id="nest-view",
@@ -2711,6 +4437,16 @@ class NestView(Container, InitialFocusMixin):
         tree.focus()
 
         self.app.main_tree = tree
+        self._start_file_index()
+        db = getattr(self.app, "db", None)
+        if db is not None:
+            try:
+                self.editor.restore_session(db.get_editor_session())
+            except Exception as e:
+                self.notify(
+                    f"Could not restore editor session: {e}", severity="warning"
+                )
+        self.run_worker(self._swap_recovery_worker, thread=True, group="swap-recovery")
 
         self.editor.can_focus_tab = True
         self.editor.key_handlers = {
@@ -2724,6 +4460,201 @@ class NestView(Container, InitialFocusMixin):
             "ctrl+shift+n": self.action_new_folder,
         }
 
+    def _swap_recovery_worker(self) -> None:
+        """Look for swap journals left behind by a crash and offer to recover them."""
+        buffers = []
+        for buffer in recover_swaps():
+            try:
+                with open(buffer.path, "r", encoding="utf-8") as file:
+                    unchanged = file.read() == buffer.text
+            except (OSError, UnicodeDecodeError):
+                unchanged = False
+            if unchanged:
+                # Saved before the crash; nothing to recover
+                buffer.swap_file.unlink(missing_ok=True)
+            else:
+                buffers.append(buffer)
+        if buffers:
+            self.app.call_from_thread(self._offer_recovery, buffers)
+
+    def _offer_recovery(self, buffers: List[RecoveredBuffer]) -> None:
+        def handle(choice: Optional[str]) -> None:
+            if choice is None:
+                # Keep the journals and ask again next time
+                return
+            editor = self.query_one(CodeEditor)
+            for buffer in buffers:
+                if choice == "recover":
+                    editor.recover_buffer(buffer)
+                buffer.swap_file.unlink(missing_ok=True)
+            if choice == "recover":
+                editor.focus()
+                self.notify(f"Recovered {len(buffers)} unsaved buffer(s)")
+
+        self.app.push_screen(RecoverSwapDialog(buffers), handle)
+
+    def action_quick_open(self) -> None:
+        root = self._file_index_scope()[0]
+        if root != self._file_index_root:
+            self._file_matcher = None
+        # Picks up changes since the last build; unchanged directories are
+        # only stat-ed, so this is cheap even on large trees
+        self._start_file_index()
+        self.app.push_screen(
+            QuickOpenDialog(root, self._file_matcher), self._open_quick_open_result
+        )
+
+    def _open_quick_open_result(self, path: Optional[str]) -> None:
+        if not path:
+            return
+        editor = self.query_one(CodeEditor)
+        editor.open_file_async(path, check_binary=not path.endswith(".py"))
+        editor.focus()
+
+    def action_find_in_files(self) -> None:
+        root = str(self.query_one(FilterableDirectoryTree).path)
+        self.app.push_screen(FindInFilesDialog(root), self._open_search_result)
+
+    def _open_search_result(self, match: Optional[SearchMatch]) -> None:
+        if match is None:
+            return
+        editor = self.query_one(CodeEditor)
+        editor.open_file(match.path)
+        if editor.current_file == match.path:
+            editor.goto_location(match.line, match.column)
+        editor.focus()
+
+    def _file_index_scope(self) -> Tuple[str, Optional[List[str]]]:
+        """Root and ignore patterns of the quick open index.
+
+        The root is the git work tree the app was started in if it is inside
+        the tree, so a tree showing the home directory doesn't index all of
+        it, and otherwise the tree's root. Paths the tree hides as ignored
+        are left out of the index too.
+        """
+        tree = self.query_one("#main_tree", FilterableDirectoryTree)
+        root = str(Path(tree.path).expanduser().resolve())
+        patterns = None if tree.show_hidden else tree.ignore_patterns
+        directory = os.path.realpath(os.getcwd())
+        prefix = root.rstrip(os.sep) + os.sep
+        while directory.startswith(prefix):
+            if os.path.exists(os.path.join(directory, ".git")):
+                return directory, patterns
+            directory = os.path.dirname(directory)
+        return root, patterns
+
+    def _start_file_index(self) -> None:
+        root, patterns = self._file_index_scope()
+        key = (root, patterns)
+        if self._file_index_running == key:
+            # Already walking this tree; restarting would only lose progress
+            return
+        self._file_index_running = key
+        self.run_worker(
+            partial(self._file_index_worker, root, patterns),
+            thread=True,
+            group="file-index",
+            exclusive=True,
+        )
+
+    def _file_index_worker(self, root: str, patterns: Optional[List[str]]) -> None:
+        try:
+            self._build_file_index(root, patterns)
+        finally:
+            if self._file_index_running == (root, patterns):
+                self._file_index_running = None
+
+    def _build_file_index(self, root: str, patterns: Optional[List[str]]) -> None:
+        worker = get_current_worker()
+
+        def publish(index: FileIndex) -> None:
+            matcher = FileMatcher(index.paths())
+            matcher.warm()
+            if not worker.is_cancelled:
+                self.app.call_from_thread(self._set_file_matcher, root, matcher)
+
+        index = FileIndex(root, ignore_patterns=patterns)
+        if index.load() and (
+            self._file_matcher is None or self._file_index_root != root
+        ):
+            # Serve the cached listing while it is brought up to date
+            publish(index)
+        changed = index.update(cancelled=lambda: worker.is_cancelled)
+        if worker.is_cancelled:
+            return
+        if changed:
+            try:
+                index.save()
+            except OSError:
+                pass
+        if changed or self._file_matcher is None or self._file_index_root != root:
+            publish(index)
+        self.app.call_from_thread(self._start_symbol_index, root, index.paths())
+
+    def _start_symbol_index(self, root: str, paths: List[str]) -> None:
+        # Not exclusive like the file index: a long first build shouldn't be
+        # cancelled and lost because quick open refreshed the file list
+        if self._symbol_index_running:
+            return
+        self._symbol_index_running = True
+        self.run_worker(
+            partial(self._symbol_index_worker, root, paths),
+            thread=True,
+            group="symbol-index",
+        )
+
+    def _symbol_index_worker(self, root: str, paths: List[str]) -> None:
+        worker = get_current_worker()
+        try:
+            index = self.symbol_index
+            if index is None or index.root != os.path.abspath(root):
+                index = SymbolIndex(root)
+                # Serve the persisted index while it is brought up to date
+                self.app.call_from_thread(self._set_symbol_index, index)
+            index.update(paths, cancelled=lambda: worker.is_cancelled)
+        except (OSError, sqlite3.Error) as e:
+            self.app.call_from_thread(
+                self.notify, f"Cannot index symbols: {e}", severity="warning"
+            )
+        finally:
+            self._symbol_index_running = False
+
+    def _set_symbol_index(self, index: SymbolIndex) -> None:
+        self.symbol_index = index
+        self.query_one(CodeEditor).symbol_index = index
+
+    def _update_symbol_index(self, update, paths) -> None:
+        self.run_worker(
+            partial(self._symbol_index_update_worker, update, list(paths)),
+            thread=True,
+            group="symbol-index-update",
+        )
+
+    @staticmethod
+    def _symbol_index_update_worker(update, paths: List[str]) -> None:
+        try:
+            update(paths)
+        except (OSError, sqlite3.Error):
+            # The next full update catches up
+            pass
+
+    def on_filterable_directory_tree_directories_changed(
+        self, event: FilterableDirectoryTree.DirectoriesChanged
+    ) -> None:
+        if self.symbol_index is not None:
+            self._update_symbol_index(self.symbol_index.update_directories, event.paths)
+
+    def on_code_editor_file_saved(self, event: CodeEditor.FileSaved) -> None:
+        if self.symbol_index is not None:
+            self._update_symbol_index(self.symbol_index.update_files, [event.path])
+
+    def _set_file_matcher(self, root: str, matcher: FileMatcher) -> None:
+        self._file_matcher = matcher
+        self._file_index_root = root
+        screen = self.app.screen
+        if isinstance(screen, QuickOpenDialog) and screen.root == root:
+            screen.set_matcher(matcher)
+
     def action_toggle_hidden(self) -> None:
         self.show_hidden = not self.show_hidden
         tree = self.query_one(FilterableDirectoryTree)
@@ -2744,6 +4675,33 @@ class NestView(Container, InitialFocusMixin):
         else:
             file_nav.remove_class("hidden")
 
+    def action_toggle_outline(self) -> None:
+        self.show_outline = not self.show_outline
+        outline_nav = self.query_one(".outline-nav")
+        panel = self.query_one(OutlinePanel)
+        if self.show_outline:
+            outline_nav.remove_class("hidden")
+            panel.show_outline(self.query_one(CodeEditor).request_outline())
+            panel.focus()
+        else:
+            outline_nav.add_class("hidden")
+            if self.app.focused is panel:
+                self.query_one(CodeEditor).focus()
+
+    def on_code_editor_outline_changed(self, event: CodeEditor.OutlineChanged) -> None:
+        if self.show_outline:
+            self.query_one(OutlinePanel).show_outline(event.outline)
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        panel = self.query_one(OutlinePanel)
+        if event.data_table is not panel:
+            return
+        event.stop()
+        if 0 <= event.cursor_row < len(panel.symbols):
+            editor = self.query_one(CodeEditor)
+            editor.goto_symbol(panel.symbols[event.cursor_row])
+            editor.focus()
+
     def action_focus_editor(self) -> None:
         self.query_one(CodeEditor).focus()
 
@@ -2769,6 +4727,15 @@ class NestView(Container, InitialFocusMixin):
             self.notify("Source no longer exists", severity="error")
             self.app.file_clipboard = None
             return
+        if action == "cut" and any(
+            transfer.move and transfer.source == os.path.abspath(source_path)
+            for transfer in self._transfers
+        ):
+            self.notify(
+                f"'{os.path.basename(source_path)}' is already being moved",
+                severity="warning",
+            )
+            return
 
         tree = self.query_one(FilterableDirectoryTree)
         if tree.cursor_node and os.path.isdir(tree.cursor_node.data.path):
@@ -2778,36 +4745,136 @@ class NestView(Container, InitialFocusMixin):
 
         basename = os.path.basename(source_path)
         dest_path = os.path.join(dest_dir, basename)
+        move = action == "cut"
+
+        if os.path.abspath(dest_path) == os.path.abspath(source_path):
+            if move:
+                self.notify(f"'{basename}' is already here", severity="warning")
+                return
+            # Copying next to itself makes a copy under a new name
+            dest_path = unique_destination(dest_path)
+        elif os.path.lexists(dest_path):
+            self.app.push_screen(
+                PasteConflictDialog(basename, str(dest_dir)),
+                partial(self._resolve_paste_conflict, source_path, dest_path, move),
+            )
+            return
+        self._start_transfer(source_path, dest_path, move)
+
+    def _resolve_paste_conflict(
+        self, source: str, destination: str, move: bool, choice: Optional[str]
+    ) -> None:
+        if choice == "replace":
+            self._start_transfer(source, destination, move, replace=True)
+        elif choice == "keep":
+            self._start_transfer(source, unique_destination(destination), move)
 
-        if os.path.exists(dest_path):
-            self.notify(f"'{basename}' already exists in destination", severity="error")
+    def _start_transfer(
+        self, source: str, destination: str, move: bool, replace: bool = False
+    ) -> None:
+        """Copy or move ``source`` to ``destination`` in a worker thread."""
+        if not self.is_running:
+            transfer = FileTransfer(source, destination, move=move, replace=replace)
+            self._finish_transfer(transfer, self._run_transfer(transfer))
             return
 
+        label = f"{'Moving' if move else 'Copying'} {os.path.basename(source)}"
+        last_percent = -1
+
+        def progress(update: TransferProgress) -> None:
+            nonlocal last_percent
+            if update.percent != last_percent and not transfer.cancelled:
+                last_percent = update.percent
+                self.app.call_from_thread(
+                    self._show_transfer_progress, label, update.percent
+                )
+
+        transfer = FileTransfer(
+            source, destination, move=move, replace=replace, progress=progress
+        )
+        self._transfers.append(transfer)
+        self._show_transfer_progress(label, 0)
+        self.run_worker(
+            partial(self._transfer_worker, transfer),
+            thread=True,
+            group="file-transfer",
+        )
+
+    @staticmethod
+    def _run_transfer(transfer: FileTransfer) -> Optional[Exception]:
         try:
-            if action == "copy":
-                if os.path.isdir(source_path):
-                    shutil.copytree(source_path, dest_path)
-                    self.notify(f"Copied folder: {basename}")
-                else:
-                    shutil.copy2(source_path, dest_path)
-                    self.notify(f"Copied file: {basename}")
-            elif action == "cut":
-                shutil.move(source_path, dest_path)
-                self.notify(f"Moved: {basename}")
+            transfer.run()
+        except (TransferCancelled, OSError, ValueError) as e:
+            return e
+        return None
+
+    def _transfer_worker(self, transfer: FileTransfer) -> None:
+        error = self._run_transfer(transfer)
+        try:
+            self.app.call_from_thread(self._finish_transfer, transfer, error)
+        except RuntimeError:
+            # The app is shutting down
+            pass
+
+    def _show_transfer_progress(self, label: str, percent: int) -> None:
+        self.query_one(CodeEditor).status_bar.update_progress(label, percent)
+
+    def _finish_transfer(
+        self, transfer: FileTransfer, error: Optional[Exception]
+    ) -> None:
+        if transfer in self._transfers:
+            self._transfers.remove(transfer)
+        editor = self.query_one(CodeEditor)
+        if not self._transfers:
+            editor.status_bar.update_progress("")
+
+        name = os.path.basename(transfer.destination)
+        if isinstance(error, TransferCancelled):
+            self.notify(f"Cancelled pasting {name}", severity="warning")
+            return
+        if error is not None:
+            self.notify(f"Error during paste operation: {str(error)}", severity="error")
+            return
+
+        if transfer.move:
+            # The source is gone once moved, so it can't be pasted twice
+            clipboard = getattr(self.app, "file_clipboard", None)
+            if (
+                clipboard
+                and clipboard.get("action") == "cut"
+                and os.path.abspath(clipboard.get("path") or "") == transfer.source
+            ):
                 self.app.file_clipboard = None
+            if transfer.removal_error is not None:
+                self.notify(
+                    f"Moved {name}, but couldn't remove the original: "
+                    f"{transfer.removal_error}",
+                    severity="warning",
+                )
+            else:
+                self.notify(f"Moved: {name}")
+            editor.rename_tabs(transfer.source, transfer.destination)
+        elif os.path.isdir(transfer.destination):
+            self.notify(f"Copied folder: {name}")
+        else:
+            self.notify(f"Copied file: {name}")
 
-                editor = self.app.query_one(CodeEditor)
-                for i, tab in enumerate(editor.tabs):
-                    if tab.path == source_path:
-                        tab.path = dest_path
-                        if i == editor.active_tab_index:
-                            editor.current_file = dest_path
-                        editor._update_status_info()
+        # Only the directories that gained or lost an entry need updating
+        changed = {os.path.realpath(os.path.dirname(transfer.destination))}
+        if transfer.move:
+            changed.add(os.path.realpath(os.path.dirname(transfer.source)))
+        self.query_one(FilterableDirectoryTree).sync_directories(changed)
 
-            tree.refresh_tree()
+    def action_cancel_transfers(self) -> None:
+        if not self._transfers:
+            return
+        for transfer in self._transfers:
+            transfer.cancel()
+        self.notify("Cancelling paste...")
 
-        except Exception as e:
-            self.notify(f"Error during paste operation: {str(e)}", severity="error")
+    def on_unmount(self) -> None:
+        for transfer in self._transfers:
+            transfer.cancel()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "toggle_hidden":
@@ -2826,58 +4893,14 @@ class NestView(Container, InitialFocusMixin):
     def on_directory_tree_file_selected(
         self, event: DirectoryTree.FileSelected
     ) -> None:
-        try:
-            # First check if it's a Python file by extension - this is a quick check to avoid binary detection, will implenent
-            # a more robust solution later
-            if str(event.path).endswith(".py"):
-                editor = self.query_one(CodeEditor)
-                editor.open_file(event.path)
-                editor.focus()
-                event.stop()
-                return
-
-            # For non-Python files, do binary detection
-            with open(event.path, "rb") as file:
-                # Read first chunk
-                chunk = file.read(8192)
-
-                binary_signatures = [
-                    b"\x7fELF",
-                    b"MZ",
-                    b"\x89PNG",
-                    b"\xff\xd8\xff",
-                    b"GIF",
-                    b"BM",
-                    b"PK",
-                    b"\x1f\x8b",
-                ]
-
-                if any(chunk.startswith(sig) for sig in binary_signatures):
-                    self.notify("Cannot open binary file", severity="warning")
-                    event.stop()
-                    return
-
-                if b"\x00" in chunk:
-                    self.notify("Cannot open binary file", severity="warning")
-                    event.stop()
-                    return
-
-                try:
-                    chunk.decode("utf-8")
-                    editor = self.query_one(CodeEditor)
-                    editor.open_file(event.path)
-                    editor.focus()
-                    event.stop()
-                except UnicodeDecodeError:
-                    self.notify(
-                        "Cannot open file: Not a valid UTF-8 text file",
-                        severity="warning",
-                    )
-                    event.stop()
-
-        except (IOError, OSError) as e:
-            self.notify(f"Error opening file: {str(e)}", severity="error")
-            event.stop()
+        # Python files skip binary detection; everything else is sniffed on
+        # the editor's worker thread before it is read
+        editor = self.query_one(CodeEditor)
+        editor.open_file_async(
+            event.path, check_binary=not str(event.path).endswith(".py")
+        )
+        editor.focus()
+        event.stop()
 
     def get_initial_focus(self) -> Optional[Widget]:
         return self.query_one(FilterableDirectoryTree)
@@ -4,7 +4,9 @@ from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, Vertical
 from textual.widget import Widget
-from textual.widgets import Button, Static
+from textual.widgets import Button, Input, Static
+
+from .canvas import CanvasSettings
 
 
 class SettingsButton(Button):
@@ -52,6 +54,55 @@ class PersonalizationContent(Container):
                 yield ThemeButton(theme)
 
 
+class CanvasSettingsContent(Container):
+    def compose(self) -> ComposeResult:
+        yield Static("Canvas Settings", classes="settings-title")
+        yield Static("Enrollment term ID (empty for all current terms)")
+        yield Input(placeholder="All terms", id="canvas-term", type="integer")
+        yield Static("Course code contains (e.g. 2501)")
+        yield Input(placeholder="Any course", id="canvas-course-code")
+        yield Static("Items per page (1-100)")
+        yield Input(id="canvas-per-page", type="integer")
+        yield Static("Show announcements from the last N days")
+        yield Input(id="canvas-announcement-days", type="integer")
+        yield Button("Save", id="canvas-settings-save", variant="primary")
+
+    def on_mount(self) -> None:
+        settings = CanvasSettings.from_dict(self.app.db.get_canvas_settings())
+        term = settings.enrollment_term_id
+        self.query_one("#canvas-term", Input).value = "" if term is None else str(term)
+        self.query_one("#canvas-course-code", Input).value = settings.course_code
+        self.query_one("#canvas-per-page", Input).value = str(settings.per_page)
+        self.query_one("#canvas-announcement-days", Input).value = str(
+            settings.announcement_days
+        )
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id != "canvas-settings-save":
+            return
+        event.stop()
+        term = self.query_one("#canvas-term", Input).value.strip()
+        try:
+            settings = CanvasSettings(
+                enrollment_term_id=int(term) if term else None,
+                course_code=self.query_one("#canvas-course-code", Input).value.strip(),
+                per_page=int(self.query_one("#canvas-per-page", Input).value),
+                announcement_days=int(
+                    self.query_one("#canvas-announcement-days", Input).value
+                ),
+            )
+        except ValueError:
+            self.notify("Please enter whole numbers", severity="error")
+            return
+        if not 1 <= settings.per_page <= 100 or settings.announcement_days < 1:
+            self.notify(
+                "Items per page must be 1-100 and days at least 1", severity="error"
+            )
+            return
+        self.app.db.save_canvas_settings(settings._asdict())
+        self.notify("Canvas settings saved")
+
+
 class SettingsView(Container):
     BINDINGS = [
         Binding("up", "move_up", "Up", show=True),
@@ -64,9 +115,11 @@ class SettingsView(Container):
             with Horizontal(classes="settings-layout"):
                 with Vertical(classes="settings-sidebar"):
                     yield SettingsButton("Personalization", "personalization")
+                    yield SettingsButton("Canvas", "canvas")
 
                 with Container(classes="settings-content"):
                     yield PersonalizationContent()
+                    yield CanvasSettingsContent()
 
     def on_mount(self) -> None:
         personalization_btn = self.query_one("SettingsButton#setting_personalization")
@@ -85,6 +138,7 @@ class SettingsView(Container):
         setting_buttons = self.query(SettingsButton)
 
         personalization_content = self.query_one(PersonalizationContent)
+        canvas_content = self.query_one(CanvasSettingsContent)
 
         for button in setting_buttons:
             event.stop()
@@ -92,12 +146,15 @@ class SettingsView(Container):
 
         all_content = [
             personalization_content,
+            canvas_content,
         ]
         for content in all_content:
             content.styles.display = "none"
 
         if event.button.id == "setting_personalization":
             personalization_content.styles.display = "block"
+        elif event.button.id == "setting_canvas":
+            canvas_content.styles.display = "block"
 
     async def action_move_up(self) -> None:
         buttons = list(self.query(SettingsButton))
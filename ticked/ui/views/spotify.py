@@ -6,8 +6,10 @@ import webbrowser
 from datetime import datetime, timedelta
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 import spotipy
+from rich.text import Text
 from spotipy.oauth2 import SpotifyOAuth
 from textual import work
 from textual.app import ComposeResult
@@ -15,10 +17,12 @@ from textual.binding import Binding
 from textual.containers import Container, Horizontal, ScrollableContainer, Vertical
 from textual.message import Message
 from textual.widget import Widget
-from textual.widgets import Button, Input, Static
+from textual.widgets import Button, DataTable, Input, Static
 from textual.worker import get_current_worker
 
 from ...core.database.ticked_db import CalendarDB
+from ...utils.async_spotify import AsyncSpotify, create_client
+from ...utils.playback_poller import PlaybackPoller
 
 
 class SpotifyCallbackHandler(BaseHTTPRequestHandler):
@@ -106,7 +110,7 @@ class SpotifyAuth:
 
         expiry = datetime.fromisoformat(stored_tokens["token_expiry"])
         if expiry > datetime.now():
-            self.spotify_client = spotipy.Spotify(auth=stored_tokens["access_token"])
+            self.spotify_client = create_client(stored_tokens["access_token"])
             return True
 
         try:
@@ -114,7 +118,7 @@ class SpotifyAuth:
                 stored_tokens["refresh_token"]
             )
             if token_info:
-                self.spotify_client = spotipy.Spotify(auth=token_info["access_token"])
+                self.spotify_client = create_client(token_info["access_token"])
                 self.db.save_spotify_tokens(
                     token_info["access_token"],
                     token_info["refresh_token"],
@@ -143,9 +147,7 @@ class SpotifyAuth:
                     SpotifyCallbackHandler.auth_code
                 )
                 if token_info:
-                    self.spotify_client = spotipy.Spotify(
-                        auth=token_info["access_token"]
-                    )
+                    self.spotify_client = create_client(token_info["access_token"])
                     self.db.save_spotify_tokens(
                         token_info["access_token"],
                         token_info["refresh_token"],
@@ -210,15 +212,20 @@ class SpotifyLogin(Widget):
 
 
 class SpotifyPlayer(Container):
-    def notify_current_track(self, spotify_client):
-        try:
-            current = spotify_client.current_playback()
-            if current and current.get("item"):
-                track = current["item"]
-                artist_names = ", ".join(artist["name"] for artist in track["artists"])
-                self.notify(f"Now playing - {track['name']} by {artist_names}")
-        except Exception as e:
-            print(f"Error getting track info: {e}")
+    def on_mount(self) -> None:
+        self._announce_track = False
+        self.app.playback_poller.subscribe(self)
+
+    def on_unmount(self) -> None:
+        self.app.playback_poller.unsubscribe(self)
+
+    def on_playback_poller_changed(self, message: PlaybackPoller.Changed) -> None:
+        current = message.playback
+        if self._announce_track and current and current.get("item"):
+            self._announce_track = False
+            track = current["item"]
+            artist_names = ", ".join(artist["name"] for artist in track["artists"])
+            self.notify(f"Now playing - {track['name']} by {artist_names}")
 
     def compose(self) -> ComposeResult:
         yield Horizontal(
@@ -229,13 +236,16 @@ class SpotifyPlayer(Container):
 
     @work
     async def on_button_pressed(self, event: Button.Pressed):
-        spotify_client = self.app.get_spotify_client()
-        if not spotify_client:
+        spotify = self.app.get_async_spotify()
+        if not spotify:
             self.notify("No Spotify client available", severity="error")
             return
 
+        poller = self.app.playback_poller
         try:
-            current_playback = spotify_client.current_playback()
+            # The poller's state can be many seconds old, and playback may
+            # have changed on another device since
+            current_playback = await spotify.current_playback()
 
             if not current_playback:
                 self.notify(
@@ -250,11 +260,12 @@ class SpotifyPlayer(Container):
                 event.stop()
                 try:
                     if current_playback["is_playing"]:
-                        spotify_client.pause_playback()
+                        await spotify.pause_playback()
                         self.notify("Paused")
                     else:
-                        spotify_client.start_playback()
-                        self.notify_current_track(spotify_client)
+                        await spotify.start_playback()
+                        self._announce_track = True
+                    poller.poke()
                 except Exception as e:
                     print(f"Playback error: {str(e)}")
                     self.notify("Error controlling playback", severity="error")
@@ -268,9 +279,9 @@ class SpotifyPlayer(Container):
                             severity="warning",
                         )
                         return
-                    spotify_client.next_track()
-                    await asyncio.sleep(0.5)
-                    self.notify_current_track(spotify_client)
+                    await spotify.next_track()
+                    self._announce_track = True
+                    poller.poke()
                 except Exception as e:
                     print(f"Next track error: {str(e)}")
                     self.notify("Error skipping to next track", severity="error")
@@ -284,9 +295,9 @@ class SpotifyPlayer(Container):
                             severity="warning",
                         )
                         return
-                    spotify_client.previous_track()
-                    await asyncio.sleep(0.5)
-                    self.notify_current_track(spotify_client)
+                    await spotify.previous_track()
+                    self._announce_track = True
+                    poller.poke()
                 except Exception as e:
                     print(f"Previous track error: {str(e)}")
                     self.notify("Error going to previous track", severity="error")
@@ -366,11 +377,12 @@ class LibrarySection(Container):
     def compose(self) -> ComposeResult:
         yield ScrollableContainer(id="playlists-container", classes="playlists-scroll")
 
-    def load_playlists(self, spotify_client):
-        if spotify_client:
+    @work(exclusive=True)
+    async def load_playlists(self, spotify: AsyncSpotify) -> bool:
+        if spotify:
             try:
-                spotify_client.current_user()
-                playlists = spotify_client.current_user_playlists()
+                await spotify.current_user()
+                playlists = await spotify.current_user_playlists()
 
                 container = self.query_one("#playlists-container")
                 container.remove_children()
@@ -408,13 +420,14 @@ class RecentlyPlayedView(Container):
             id="recently-played-container", classes="tracks-scroll"
         )
 
-    def load_recent_tracks(self, spotify_client) -> None:
-        if not spotify_client:
+    @work(exclusive=True)
+    async def load_recent_tracks(self, spotify: AsyncSpotify) -> None:
+        if not spotify:
             self.notify("No spotify client")
             return
 
         try:
-            results = spotify_client.current_user_recently_played(limit=20)
+            results = await spotify.current_user_recently_played(limit=20)
             tracks_container = self.query_one("#recently-played-container")
             if tracks_container:
                 tracks_container.remove_children()
@@ -441,65 +454,107 @@ class RecentlyPlayedView(Container):
 
 
 class PlaylistView(Container):
+    """
+    Tracks of a playlist or of Liked Songs.
+
+    Tracks are requested a page at a time, a few pages at once, and added
+    to a DataTable as the pages arrive. The first page shows straight away,
+    and only the rows scrolled into view are ever rendered.
+    """
+
+    # Most tracks Spotify returns per request
+    PLAYLIST_PAGE_SIZE = 100
+    SAVED_TRACKS_PAGE_SIZE = 50
+    # Pages requested at once after the first
+    PAGES_IN_FLIGHT = 4
+    TRACK_FIELDS = "total,items(track(id,name,artists(name)))"
+
     def __init__(self) -> None:
         super().__init__()
         self.current_playlist_id = None
+        # Track id and playlist position of each row
+        self._rows: List[Tuple[str, int]] = []
 
     def compose(self) -> ComposeResult:
         yield Static(
             "Select a playlist", id="playlist-title", classes="content-header-cont"
         )
-        yield ScrollableContainer(id="tracks-container", classes="tracks-scroll")
+        yield DataTable(id="tracks-table", classes="tracks-scroll", cursor_type="row")
 
-    def load_playlist(self, spotify_client, playlist_id: str) -> None:
-        if not spotify_client:
+    def on_mount(self) -> None:
+        self.query_one("#tracks-table", DataTable).add_columns("Title", "Artist")
+
+    def _page_size(self, playlist_id: str) -> int:
+        if playlist_id == "liked_songs":
+            return self.SAVED_TRACKS_PAGE_SIZE
+        return self.PLAYLIST_PAGE_SIZE
+
+    async def _fetch_page(
+        self, spotify: AsyncSpotify, playlist_id: str, offset: int
+    ) -> Dict:
+        limit = self._page_size(playlist_id)
+        if playlist_id == "liked_songs":
+            return await spotify.current_user_saved_tracks(limit=limit, offset=offset)
+        return await spotify.playlist_items(
+            playlist_id,
+            fields=self.TRACK_FIELDS,
+            limit=limit,
+            offset=offset,
+            additional_types=("track",),
+        )
+
+    def _add_tracks(self, offset: int, items: List[Dict]) -> None:
+        rows = []
+        for i, item in enumerate(items):
+            track_info = item.get("track")
+            # Local files and unavailable tracks can't be played by id
+            if not track_info or not track_info.get("id"):
+                continue
+            artist_names = ", ".join(artist["name"] for artist in track_info["artists"])
+            self._rows.append((track_info["id"], offset + i))
+            # Text, so names like "[/x]" aren't parsed as markup
+            rows.append((Text(track_info["name"]), Text(artist_names)))
+        self.query_one("#tracks-table", DataTable).add_rows(rows)
+
+    @work(exclusive=True)
+    async def load_playlist(self, spotify: AsyncSpotify, playlist_id: str) -> None:
+        if not spotify:
             return
 
         try:
             self.current_playlist_id = playlist_id
-            tracks_container = self.query_one("#tracks-container")
-            if tracks_container:
-                tracks_container.remove_children()
+            self.query_one("#tracks-table", DataTable).clear()
+            self._rows = []
 
+            first_page = self._fetch_page(spotify, playlist_id, 0)
             if playlist_id == "liked_songs":
-                results = spotify_client.current_user_saved_tracks()
                 self.query_one("#playlist-title").update("Liked Songs")
-                for i, item in enumerate(results["items"]):
-                    track_info = item["track"]
-                    artist_names = ", ".join(
-                        artist["name"] for artist in track_info["artists"]
-                    )
-                    tracks_container.mount(
-                        SearchResult(
-                            track_info["name"],
-                            track_info["id"],
-                            "track",
-                            artist_names,
-                            position=i,
-                        )
-                    )
+                first = await first_page
             else:
-                playlist = spotify_client.playlist(playlist_id)
-                self.query_one("#playlist-title").update(playlist["name"])
-                for i, item in enumerate(playlist["tracks"]["items"]):
-                    track_info = item["track"]
-                    if track_info:
-                        artist_names = ", ".join(
-                            artist["name"] for artist in track_info["artists"]
-                        )
-                        tracks_container.mount(
-                            SearchResult(
-                                track_info["name"],
-                                track_info["id"],
-                                "track",
-                                artist_names,
-                                position=i,
-                            )
-                        )
+                playlist, first = await asyncio.gather(
+                    spotify.playlist(playlist_id, fields="name"), first_page
+                )
+                self.query_one("#playlist-title").update(Text(playlist["name"]))
+            self._add_tracks(0, first["items"])
+
+            size = self._page_size(playlist_id)
+            offsets = list(range(size, first["total"], size))
+            for start in range(0, len(offsets), self.PAGES_IN_FLIGHT):
+                batch = offsets[start : start + self.PAGES_IN_FLIGHT]
+                pages = await asyncio.gather(
+                    *(self._fetch_page(spotify, playlist_id, o) for o in batch)
+                )
+                for offset, page in zip(batch, pages):
+                    self._add_tracks(offset, page["items"])
         except Exception as e:
             print(f"Error loading playlist: {e}")
             self.query_one("#playlist-title").update("Error loading playlist")
 
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        event.stop()
+        track_id, position = self._rows[event.cursor_row]
+        self.post_message(SearchResult.Selected(track_id, "track", position))
+
 
 class SearchView(Container):
     def compose(self) -> ComposeResult:
@@ -536,13 +591,13 @@ class SearchView(Container):
 
         if search_id != self._search_id:
             return
-        spotify_client = self.app.get_spotify_client()
-        if not spotify_client:
+        spotify = self.app.get_async_spotify()
+        if not spotify:
             return
         worker = get_current_worker()
 
         try:
-            results = spotify_client.search(q=query, type="track,playlist", limit=10)
+            results = await spotify.search(q=query, type="track,playlist", limit=10)
 
             if worker.is_cancelled:
                 return
@@ -587,10 +642,11 @@ class MainContent(Container):
         yield Container(SearchView(), classes="search-view")
 
     def on_mount(self) -> None:
-        if self.app.get_spotify_client():
+        spotify = self.app.get_async_spotify()
+        if spotify:
             recently_played = self.query_one(RecentlyPlayedView)
             if recently_played:
-                recently_played.load_recent_tracks(self.app.get_spotify_client())
+                recently_played.load_recent_tracks(spotify)
 
 
 class SpotifyView(Container):
@@ -611,7 +667,7 @@ class SpotifyView(Container):
         self._search_id = 0
         if self.call_after_refresh:
             library_section = self.query_one(LibrarySection)
-            library_section.load_playlists(self.auth.spotify_client)
+            library_section.load_playlists(self.app.get_async_spotify())
 
     def compose(self) -> ComposeResult:
         if not self.auth.spotify_client:
@@ -664,9 +720,7 @@ class SpotifyView(Container):
                 SpotifyCallbackHandler.auth_code
             )
             if token_info:
-                self.auth.spotify_client = spotipy.Spotify(
-                    auth=token_info["access_token"]
-                )
+                self.auth.spotify_client = create_client(token_info["access_token"])
 
                 # Remove SpotifyLogin and mount the new UI components
                 login_widget = self.query_one(SpotifyLogin)
@@ -708,13 +762,14 @@ class SpotifyView(Container):
                     )
                 )
 
+                spotify = self.app.get_async_spotify()
                 library_section = self.query_one(LibrarySection)
-                library_section.load_playlists(self.auth.spotify_client)
+                library_section.load_playlists(spotify)
 
                 main_content = self.query_one(MainContent)
                 recently_played = main_content.query_one(RecentlyPlayedView)
                 if recently_played:
-                    recently_played.load_recent_tracks(self.auth.spotify_client)
+                    recently_played.load_recent_tracks(spotify)
 
                 self.notify("Successfully connected to Spotify!")
             else:
@@ -758,13 +813,13 @@ class SpotifyView(Container):
 
         if search_id != self._search_id:
             return
-        spotify_client = self.app.get_spotify_client()
-        if not spotify_client:
+        spotify = self.app.get_async_spotify()
+        if not spotify:
             return
         worker = get_current_worker()
 
         try:
-            results = spotify_client.search(q=query, type="track,playlist", limit=10)
+            results = await spotify.search(q=query, type="track,playlist", limit=10)
 
             if worker.is_cancelled:
                 return
@@ -799,16 +854,17 @@ class SpotifyView(Container):
 
     def on_playlist_item_selected(self, message: PlaylistItem.Selected) -> None:
         playlist_view = self.query_one(PlaylistView)
-        playlist_view.load_playlist(self.auth.spotify_client, message.playlist_id)
+        playlist_view.load_playlist(self.app.get_async_spotify(), message.playlist_id)
 
     @work
     async def on_search_result_selected(self, message: SearchResult.Selected) -> None:
         if message.result_type == "playlist":
             playlist_view = self.query_one(PlaylistView)
-            playlist_view.load_playlist(self.auth.spotify_client, message.result_id)
+            playlist_view.load_playlist(self.app.get_async_spotify(), message.result_id)
         elif message.result_type == "track":
+            spotify = self.app.get_async_spotify()
             try:
-                devices = self.auth.spotify_client.devices()
+                devices = await spotify.devices()
                 if not devices["devices"]:
                     self.notify(
                         "No Spotify devices found. Please open Spotify on any device.",
@@ -826,13 +882,13 @@ class SpotifyView(Container):
 
                 if current_playlist_id and current_playlist_id != "liked_songs":
                     if message.position is not None:
-                        self.auth.spotify_client.start_playback(
+                        await spotify.start_playback(
                             device_id=active_device["id"],
                             context_uri=f"spotify:playlist:{current_playlist_id}",
                             offset={"position": message.position},
                         )
                         await asyncio.sleep(0.5)
-                        current = self.auth.spotify_client.current_playback()
+                        current = await spotify.current_playback()
                         if current and current.get("item"):
                             track = current["item"]
                             artist_names = ", ".join(
@@ -842,9 +898,7 @@ class SpotifyView(Container):
                                 f"Now playing - {track['name']} by {artist_names}"
                             )
                     else:
-                        playlist = self.auth.spotify_client.playlist(
-                            current_playlist_id
-                        )
+                        playlist = await spotify.playlist(current_playlist_id)
                         track_uris = [
                             track["track"]["uri"]
                             for track in playlist["tracks"]["items"]
@@ -855,13 +909,13 @@ class SpotifyView(Container):
                             track_index = track_uris.index(
                                 f"spotify:track:{message.result_id}"
                             )
-                            self.auth.spotify_client.start_playback(
+                            await spotify.start_playback(
                                 device_id=active_device["id"],
                                 context_uri=f"spotify:playlist:{current_playlist_id}",
                                 offset={"position": track_index},
                             )
                             await asyncio.sleep(0.5)
-                            current = self.auth.spotify_client.current_playback()
+                            current = await spotify.current_playback()
                             if current and current.get("item"):
                                 track = current["item"]
                                 artist_names = ", ".join(
@@ -871,12 +925,12 @@ class SpotifyView(Container):
                                     f"Now playing - {track['name']} by {artist_names}"
                                 )
                         except ValueError:
-                            self.auth.spotify_client.start_playback(
+                            await spotify.start_playback(
                                 device_id=active_device["id"],
                                 uris=[f"spotify:track:{message.result_id}"],
                             )
                             await asyncio.sleep(0.5)
-                            current = self.auth.spotify_client.current_playback()
+                            current = await spotify.current_playback()
                             if current and current.get("item"):
                                 track = current["item"]
                                 artist_names = ", ".join(
@@ -886,12 +940,12 @@ class SpotifyView(Container):
                                     f"Now playing - {track['name']} by {artist_names}"
                                 )
                 else:
-                    self.auth.spotify_client.start_playback(
+                    await spotify.start_playback(
                         device_id=active_device["id"],
                         uris=[f"spotify:track:{message.result_id}"],
                     )
                     await asyncio.sleep(0.5)
-                    current = self.auth.spotify_client.current_playback()
+                    current = await spotify.current_playback()
                     if current and current.get("item"):
                         track = current["item"]
                         artist_names = ", ".join(
@@ -908,20 +962,21 @@ class SpotifyView(Container):
     def action_refresh(self) -> None:
         if self.auth.spotify_client:
             library_section = self.query_one(LibrarySection)
-            library_section.load_playlists(self.auth.spotify_client)
+            library_section.load_playlists(self.app.get_async_spotify())
 
             playlist_view = self.query_one(PlaylistView)
             if playlist_view.current_playlist_id:
                 playlist_view.load_playlist(
-                    self.auth.spotify_client, playlist_view.current_playlist_id
+                    self.app.get_async_spotify(), playlist_view.current_playlist_id
                 )
 
             main_content = self.query_one(MainContent)
             recently_played = main_content.query_one(RecentlyPlayedView)
             if recently_played:
-                recently_played.load_recent_tracks(self.auth.spotify_client)
+                recently_played.load_recent_tracks(self.app.get_async_spotify())
 
     def on_spotify_login_message(self, message: SpotifyLoginMessage) -> None:
         save_spotify_credentials(message.client_id, message.client_secret)
         self.auth = SpotifyAuth(self.app.db)
+        self.app.set_spotify_auth(self.auth)
         self.action_authenticate()
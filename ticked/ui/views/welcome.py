@@ -11,6 +11,7 @@ from textual.containers import Container, Grid, Horizontal, Vertical
 from textual.widget import Widget
 from textual.widgets import Button, Markdown, Static, TextArea
 
+from ticked.utils.playback_poller import PlaybackPoller
 from ticked.widgets.task_widget import Task
 
 
@@ -118,71 +119,55 @@ class NowPlayingCard(Container):
         self.query_one("#track-name").update(track_name)
         self.query_one("#artist-name").update(artist_name)
 
-    async def on_mount(self) -> None:
-        self.set_interval(3, self.poll_spotify_now_playing)
-
-    def poll_spotify_now_playing(self) -> None:
-        spotify_client = self.app.get_spotify_client()
-        if not spotify_client:
-            self.update_track(
-                "No track playing - Make sure you authenticate in the Spotify page", ""
-            )
-            return
-
-        try:
-            playback = spotify_client.current_playback()
-            if playback and playback.get("item"):
-                track_name = playback["item"]["name"]
-                artist_name = ", ".join(a["name"] for a in playback["item"]["artists"])
-                self.update_track(track_name, artist_name)
-            else:
-                self.update_track(
-                    "No track playing - Make sure you authenticate in the Spotify page",
-                    "",
-                )
-        except Exception as e:
-            print(f"Error fetching Spotify playback: {e}")
+    def on_mount(self) -> None:
+        self._announce_track = False
+        self.app.playback_poller.subscribe(self)
+
+    def on_unmount(self) -> None:
+        self.app.playback_poller.unsubscribe(self)
+
+    def on_playback_poller_changed(self, message: PlaybackPoller.Changed) -> None:
+        playback = message.playback
+        if playback and playback.get("item"):
+            track_name = playback["item"]["name"]
+            artist_name = ", ".join(a["name"] for a in playback["item"]["artists"])
+            self.update_track(track_name, artist_name)
+            if self._announce_track:
+                self._announce_track = False
+                self.notify(f"Now playing: {track_name} by {artist_name}")
+        else:
             self.update_track(
                 "No track playing - Make sure you authenticate in the Spotify page", ""
             )
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        spotify_client = self.app.get_spotify_client()
-        if not spotify_client:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        spotify = self.app.get_async_spotify()
+        if not spotify:
             self.notify("No Spotify connection", severity="error")
             return
 
+        poller = self.app.playback_poller
         try:
             if event.button.id == "play-pause-btn":
                 event.stop()
-                current_playback = spotify_client.current_playback()
+                # The poller's state can be many seconds old; decide from the
+                # live state, as playback may have changed on another device
+                current_playback = await spotify.current_playback()
                 if current_playback and current_playback["is_playing"]:
-                    spotify_client.pause_playback()
+                    await spotify.pause_playback()
                 else:
-                    spotify_client.start_playback()
-                self.poll_spotify_now_playing()
+                    await spotify.start_playback()
+                poller.poke()
             elif event.button.id == "prev-btn":
                 event.stop()
-                spotify_client.previous_track()
-                self.poll_spotify_now_playing()
-                playback = spotify_client.current_playback()
-                if playback and playback.get("item"):
-                    track_name = playback["item"]["name"]
-                    artist_name = ", ".join(
-                        a["name"] for a in playback["item"]["artists"]
-                    )
-                    self.notify(f"Now playing: {track_name} by {artist_name}")
+                await spotify.previous_track()
+                self._announce_track = True
+                poller.poke()
             elif event.button.id == "next-btn":
                 event.stop()
-                spotify_client.next_track()
-                self.poll_spotify_now_playing()
-                playback = spotify_client.current_playback()
-                if playback and playback.get("item"):
-                    track_name = playback["item"]["name"]
-                    artist_name = ", ".join(
-                        a["name"] for a in playback["item"]["artists"]
-                    )
-                    self.notify(f"Now playing: {track_name} by {artist_name}")
+                await spotify.next_track()
+                self._announce_track = True
+                poller.poke()
         except Exception as e:
             self.notify(f"Playback error: {str(e)}", severity="error")
 
@@ -0,0 +1,146 @@
+"""Non-blocking access to the Spotify Web API.
+
+spotipy is synchronous, so :class:`AsyncSpotify` runs its calls on a small
+shared thread pool and awaits them, keeping the Textual event loop free.
+Every client made by :func:`create_client` sends its requests through one
+pooled ``requests`` session, so connections to the API are kept alive and
+reused instead of being opened per call. Identical read requests that are
+in flight at the same time are coalesced: the first one goes to Spotify
+and the others wait for its response.
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+import spotipy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Spotify calls running at once
+MAX_WORKERS = 4
+# Seconds before a request to Spotify is abandoned
+REQUEST_TIMEOUT = 10
+
+# Calls that only read, and so can share one response when duplicated.
+# Playback commands are never coalesced.
+READ_METHODS = frozenset(
+    {
+        "current_playback",
+        "current_user",
+        "current_user_playlists",
+        "current_user_recently_played",
+        "current_user_saved_tracks",
+        "devices",
+        "next",
+        "playlist",
+        "playlist_items",
+        "search",
+    }
+)
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def shared_session() -> requests.Session:
+    """The keep-alive session all Spotify clients send requests through."""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            # The retries spotipy sets up for the sessions it makes itself
+            retry = Retry(
+                total=3,
+                connect=None,
+                read=False,
+                allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+                status=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=retry
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="spotify"
+            )
+        return _executor
+
+
+def create_client(access_token: str) -> spotipy.Spotify:
+    """A spotipy client using the shared session."""
+    return spotipy.Spotify(
+        auth=access_token,
+        requests_session=shared_session(),
+        requests_timeout=REQUEST_TIMEOUT,
+    )
+
+
+def _request_key(method: str, args: Tuple, kwargs: Dict[str, Any]) -> str:
+    return json.dumps([method, args, kwargs], sort_keys=True, default=repr)
+
+
+class AsyncSpotify:
+    """Awaitable versions of the methods of a spotipy client.
+
+    ``await AsyncSpotify(client).playlist(playlist_id)`` runs
+    ``client.playlist(playlist_id)`` on the shared thread pool.
+    """
+
+    def __init__(
+        self, client: spotipy.Spotify, executor: Optional[ThreadPoolExecutor] = None
+    ) -> None:
+        self.client = client
+        self._executor = executor
+        # Request key -> future of the read request in flight
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run ``client.<method>(*args, **kwargs)`` without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        function = getattr(self.client, method)
+        executor = self._executor or _shared_executor()
+        if method not in READ_METHODS:
+            return await loop.run_in_executor(
+                executor, lambda: function(*args, **kwargs)
+            )
+
+        key = _request_key(method, args, kwargs)
+        future = self._in_flight.get(key)
+        if future is None:
+            future = loop.run_in_executor(executor, lambda: function(*args, **kwargs))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._forget(key, future))
+        # One waiter being cancelled mustn't cancel the others' request
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Don't warn about errors nobody is left waiting for
+        if not future.cancelled():
+            future.exception()
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.call(method, *args, **kwargs)
+
+        return call
@@ -0,0 +1,59 @@
+"""Freshness of the Canvas data kept in tick.db.
+
+Each resource (courses, todos, announcements) is stored with the time it
+was fetched, the HTTP validators (``ETag``/``Last-Modified``) of the Canvas
+endpoints it was built from, and the settings it was fetched with. The
+Canvas view shows stored data straight away. Once a resource is older than
+its TTL it is revalidated with conditional requests, and only downloaded
+again if the server says one of its endpoints changed.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional
+
+# How long a resource is served without asking the server about it
+TTLS = {
+    "courses": timedelta(hours=6),
+    "todos": timedelta(minutes=10),
+    "announcements": timedelta(minutes=15),
+}
+DEFAULT_TTL = timedelta(minutes=10)
+
+# Validators of one endpoint: {"etag": ..., "last_modified": ...}
+Validators = Dict[str, Optional[str]]
+
+
+class SyncState(NamedTuple):
+    fetched_at: datetime
+    # Endpoint -> validators it returned when the data was fetched
+    validators: Dict[str, Validators]
+    # Settings the data was fetched with
+    params: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "SyncState":
+        return cls(
+            datetime.fromisoformat(row["fetched_at"]),
+            row.get("validators") or {},
+            row.get("params"),
+        )
+
+    def is_fresh(self, resource: str, now: Optional[datetime] = None) -> bool:
+        age = (now or datetime.now()) - self.fetched_at
+        return age < TTLS.get(resource, DEFAULT_TTL)
+
+    def fetched_with(self, params: Dict[str, Any]) -> bool:
+        # Compared as JSON, the way they are stored
+        return self.params == json.loads(json.dumps(params))
+
+
+def conditional_headers(validators: Optional[Validators]) -> Dict[str, str]:
+    """Request headers that let the server answer 304 if nothing changed."""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
@@ -0,0 +1,429 @@
+"""Persistent project file index and fast fuzzy path matching.
+
+:class:`FileIndex` lists every file under a root directory and caches the
+listing on disk keyed by directory mtimes. A directory's mtime changes
+whenever an entry is added, removed or renamed in it, so an update only has
+to ``stat`` each directory and re-list the ones whose mtime changed. Given
+ignore patterns, paths matched by them or by ``.gitignore``/``.ignore``
+files are left out, and ignored directories are never walked; the ignore
+files' mtimes are kept alongside so edits to them re-list what they cover.
+
+:class:`FileMatcher` ranks paths against a query fast enough for quick-open
+over very large trees. Scoring every fuzzy match with fzf's algorithm is too
+slow in Python when a short query matches most of 200k paths, so candidates
+are gathered in tiers (basename substring, basename subsequence, path
+subsequence) and capped at a fixed number, and only those are scored. Each
+tier first ANDs together per-character bitmasks of the paths so only paths
+containing every pattern character are checked, in batches, by one regex.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+from bisect import bisect_right
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .fuzzy import compute_bonuses, fuzzy_score
+from .ignore import IGNORE_FILES, IgnoreCache
+from .tab_cache import get_cache_home
+
+INDEX_VERSION = 2
+
+# Hard limit so indexing something like a home directory stays bounded
+MAX_FILES = 500_000
+
+# Directories that are never worth indexing
+SKIP_DIRECTORIES = {"node_modules", "__pycache__"}
+
+# Candidates scored per query; the tiers make sure these are the best ones
+MAX_CANDIDATES = 250
+
+# Texts checked per regex scan when gathering candidates
+_BATCH_SIZE = 512
+
+# Above this many selected names the literal tier scans all names instead
+_BLOB_SCAN_THRESHOLD = 4 * _BATCH_SIZE
+
+# Extra score for matches within the file name rather than the whole path
+NAME_MATCH_BONUS = 32
+
+
+_BIT_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def _is_subsequence(pattern: str, text: str) -> bool:
+    pos = -1
+    for char in pattern:
+        pos = text.find(char, pos + 1)
+        if pos < 0:
+            return False
+    return True
+
+
+def _line_matches(regex: "re.Pattern[str]", blob: str) -> Iterator[int]:
+    """Indices of the newline separated lines of ``blob`` that ``regex`` matches."""
+    search = regex.search
+    pos = 0
+    line = 0
+    while True:
+        match = search(blob, pos)
+        if match is None:
+            return
+        line += blob.count("\n", pos, match.start())
+        yield line
+        # Patterns never span lines, so skip to the start of the next one
+        pos = blob.find("\n", match.end())
+        if pos < 0:
+            return
+        pos += 1
+        line += 1
+
+
+def default_cache_path(root: str) -> Path:
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return get_cache_home() / "ticked" / "file_index" / f"{digest}.json"
+
+
+def _skip_entry(name: str) -> bool:
+    return name.startswith(".")
+
+
+class FileIndex:
+    """Relative paths of all files under ``root``, cached on disk."""
+
+    def __init__(
+        self,
+        root: str,
+        cache_path: Optional[Path] = None,
+        skip: Callable[[str], bool] = _skip_entry,
+        max_files: int = MAX_FILES,
+        ignore_patterns: Optional[List[str]] = None,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.cache_path = Path(cache_path) if cache_path else default_cache_path(root)
+        self.skip = skip
+        self.max_files = max_files
+        # None indexes ignored paths too
+        self.ignore_patterns = (
+            None if ignore_patterns is None else list(ignore_patterns)
+        )
+        self._ignore = (
+            None if ignore_patterns is None else IgnoreCache(self.root, ignore_patterns)
+        )
+        # Relative directory path -> [mtime_ns, subdirectories, files,
+        # mtimes of the directory's ignore files]
+        self._dirs: Dict[str, list] = {}
+        self.truncated = False
+
+    def load(self) -> bool:
+        """Load the cached listing, returning False if there is none."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if (
+            data.get("version") != INDEX_VERSION
+            or data.get("root") != self.root
+            or data.get("ignore") != self.ignore_patterns
+        ):
+            return False
+        self._dirs = data["dirs"]
+        return True
+
+    def save(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "root": self.root,
+                    "ignore": self.ignore_patterns,
+                    "dirs": self._dirs,
+                },
+                file,
+            )
+        os.replace(temp_path, self.cache_path)
+
+    def update(self, cancelled: Callable[[], bool] = lambda: False) -> bool:
+        """Bring the listing up to date; return True if anything changed.
+
+        Unchanged directories are not re-listed, only ``stat``-ed.
+        """
+        old_dirs = self._dirs
+        new_dirs: Dict[str, list] = {}
+        changed = False
+        file_count = 0
+        self.truncated = False
+        # (relative path, whether ignore rules above it changed)
+        stack = [("", False)]
+        while stack:
+            if cancelled():
+                return False
+            relative, rules_changed = stack.pop()
+            path = os.path.join(self.root, relative) if relative else self.root
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            stamp = self._ignore_stamp(path)
+            old_entry = old_dirs.get(relative)
+            rules_changed = rules_changed or old_entry is None or old_entry[3] != stamp
+            if rules_changed or old_entry[0] != mtime:
+                entry = self._list_directory(path, mtime, stamp)
+                changed = True
+            else:
+                entry = old_entry
+            if entry is None:
+                continue
+            new_dirs[relative] = entry
+            file_count += len(entry[2])
+            if file_count > self.max_files:
+                self.truncated = True
+                break
+            for name in entry[1]:
+                stack.append((f"{relative}/{name}" if relative else name, rules_changed))
+
+        if set(new_dirs) != set(old_dirs):
+            changed = True
+        self._dirs = new_dirs
+        return changed
+
+    def _ignore_stamp(self, path: str) -> Optional[List[int]]:
+        if self._ignore is None:
+            return None
+        stamp = []
+        for name in IGNORE_FILES:
+            try:
+                stamp.append(os.stat(os.path.join(path, name)).st_mtime_ns)
+            except OSError:
+                stamp.append(0)
+        return stamp
+
+    def _list_directory(
+        self, path: str, mtime: int, stamp: Optional[List[int]]
+    ) -> Optional[list]:
+        subdirs: List[str] = []
+        files: List[str] = []
+        rules = None if self._ignore is None else self._ignore.rules_for(path)
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if self.skip(name):
+                        continue
+                    try:
+                        # Symlinked directories are listed as files to avoid cycles
+                        if entry.is_dir(follow_symlinks=False):
+                            if name in SKIP_DIRECTORIES or (
+                                rules is not None and rules.is_ignored(entry.path, True)
+                            ):
+                                continue
+                            subdirs.append(name)
+                        elif entry.is_file():
+                            if rules is None or not rules.is_ignored(entry.path, False):
+                                files.append(name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return [mtime, sorted(subdirs), sorted(files), stamp]
+
+    def __iter__(self) -> Iterator[str]:
+        for relative, (_, _, files, _) in self._dirs.items():
+            prefix = f"{relative}/" if relative else ""
+            for name in files:
+                yield prefix + name
+
+    def paths(self) -> List[str]:
+        return list(self)
+
+    def __len__(self) -> int:
+        return sum(len(entry[2]) for entry in self._dirs.values())
+
+
+class FileMatcher:
+    """Ranks relative paths against a quick-open query."""
+
+    def __init__(self, paths: List[str], max_candidates: int = MAX_CANDIDATES) -> None:
+        self.paths = sorted(paths, key=lambda path: (len(path), path))
+        self.max_candidates = max_candidates
+        self._lowered = [path.lower() for path in self.paths]
+        self._name_starts = [path.rfind("/") + 1 for path in self.paths]
+        self._names = [
+            path[start:] for path, start in zip(self._lowered, self._name_starts)
+        ]
+        # Character -> bitmask of the paths (or names) containing it
+        self._path_masks: Dict[str, int] = {}
+        self._name_masks: Dict[str, int] = {}
+        self._name_blob = "\n".join(self._names)
+        self._name_offsets = []
+        offset = 0
+        for name in self._names:
+            self._name_offsets.append(offset)
+            offset += len(name) + 1
+        self._name_bonuses: Dict[int, bytes] = {}
+        self._path_bonuses: Dict[int, bytes] = {}
+
+        self._last_pattern = ""
+        self._last_candidates: Dict[int, bool] = {}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @staticmethod
+    def _char_mask(masks: Dict[str, int], texts: List[str], char: str) -> int:
+        mask = masks.get(char)
+        if mask is None:
+            flags = bytes(char in text for text in texts).translate(_BIT_DIGITS)
+            # Reverse so that bit ``i`` of the integer belongs to text ``i``
+            mask = int(flags[::-1] or b"0", 2)
+            masks[char] = mask
+        return mask
+
+    def warm(self, chars: str = "abcdefghijklmnopqrstuvwxyz0123456789_-./") -> None:
+        """Build the character masks ahead of time (e.g. on a worker thread)."""
+        for char in chars:
+            self._char_mask(self._path_masks, self._lowered, char)
+            self._char_mask(self._name_masks, self._names, char)
+
+    def _selection(self, masks: Dict[str, int], texts: List[str], pattern: str) -> str:
+        """Bit string (bit ``i`` first) of texts containing every pattern character."""
+        mask = -1
+        for char in set(pattern):
+            mask &= self._char_mask(masks, texts, char)
+            if not mask:
+                return ""
+        return bin(mask)[:1:-1]
+
+    @staticmethod
+    def _batches(texts: List[str], bits: str) -> Iterator[Tuple[List[int], str]]:
+        """Yield ``(positions, joined)`` batches of the texts selected by ``bits``."""
+        bit = bits.find("1")
+        while bit >= 0:
+            batch = []
+            while bit >= 0 and len(batch) < _BATCH_SIZE:
+                batch.append(bit)
+                bit = bits.find("1", bit + 1)
+            yield batch, "\n".join([texts[position] for position in batch])
+
+    def _scan_names(self, needle: str, found: Dict[int, bool]) -> bool:
+        """Add every name containing ``needle``; False once the cap is hit."""
+        blob = self._name_blob
+        offsets = self._name_offsets
+        pos = blob.find(needle)
+        while pos >= 0:
+            position = bisect_right(offsets, pos) - 1
+            found.setdefault(position, True)
+            if len(found) >= self.max_candidates:
+                return False
+            if position + 1 >= len(offsets):
+                break
+            pos = blob.find(needle, offsets[position + 1])
+        return True
+
+    def _add_matches(
+        self,
+        found: Dict[int, bool],
+        batches: Iterable[Tuple[List[int], str]],
+        regex: "re.Pattern[str]",
+        in_name: bool,
+    ) -> bool:
+        """Record texts ``regex`` matches; False once the cap is hit."""
+        for positions, joined in batches:
+            for line in _line_matches(regex, joined):
+                position = positions[line]
+                if position not in found:
+                    found[position] = in_name
+                    if len(found) >= self.max_candidates:
+                        return False
+        return True
+
+    def _candidates(self, pattern: str) -> Tuple[Dict[int, bool], bool]:
+        """Candidates and whether they are complete.
+
+        Maps candidate positions, best tiers first, to whether the pattern
+        matched within the file name.
+        """
+        # dict keeps insertion order, so earlier tiers stay first
+        found: Dict[int, bool] = {}
+        regex = re.compile(
+            re.escape(pattern[0])
+            + "".join(
+                f"[^\\n{re.escape(char)}]*{re.escape(char)}" for char in pattern[1:]
+            )
+        )
+        literal = re.compile(re.escape(pattern))
+
+        if len(pattern) == 1:
+            return found, self._scan_names(pattern, found)
+
+        name_bits = self._selection(self._name_masks, self._names, pattern)
+        if name_bits.count("1") > _BLOB_SCAN_THRESHOLD:
+            # Cheaper to search every name in C than to gather this many
+            name_batches = self._batches(self._names, name_bits)
+            complete = self._scan_names(pattern, found)
+        else:
+            name_batches = list(self._batches(self._names, name_bits))
+            complete = self._add_matches(found, name_batches, literal, True)
+        complete = (
+            complete
+            and self._add_matches(found, name_batches, regex, True)
+            and self._add_matches(
+                found,
+                self._batches(
+                    self._lowered,
+                    self._selection(self._path_masks, self._lowered, pattern),
+                ),
+                regex,
+                False,
+            )
+        )
+        return found, complete
+
+    def rank(self, pattern: str, limit: int = 50) -> List[Tuple[int, str]]:
+        """Return up to ``limit`` ``(score, path)`` pairs, best first."""
+        if not pattern:
+            return [(0, path) for path in self.paths[:limit]]
+
+        lowered = pattern.lower()
+        if self._last_pattern and lowered.startswith(self._last_pattern):
+            # Narrowing: the previous query's candidates were complete
+            candidates = {
+                position: in_name and _is_subsequence(lowered, self._names[position])
+                for position, in_name in self._last_candidates.items()
+                if _is_subsequence(lowered, self._lowered[position])
+            }
+            complete = True
+        else:
+            candidates, complete = self._candidates(lowered)
+        self._last_pattern = lowered if complete else ""
+        self._last_candidates = candidates if complete else {}
+
+        results = []
+        for position, in_name in candidates.items():
+            path = self.paths[position]
+            if in_name:
+                bonuses = self._name_bonuses.get(position)
+                name = path[self._name_starts[position] :]
+                if bonuses is None:
+                    bonuses = self._name_bonuses[position] = compute_bonuses(name)
+                score = fuzzy_score(pattern, name, bonuses)
+                if score is not None:
+                    results.append((-score - NAME_MATCH_BONUS, len(path), position))
+                    continue
+            bonuses = self._path_bonuses.get(position)
+            if bonuses is None:
+                bonuses = self._path_bonuses[position] = compute_bonuses(path)
+            score = fuzzy_score(pattern, path, bonuses)
+            if score is not None:
+                results.append((-score, len(path), position))
+        return [
+            (-score, self.paths[position])
+            for score, _, position in heapq.nsmallest(limit, results)
+        ]
@@ -0,0 +1,105 @@
+"""Blocking file helpers for the editor, meant to run in worker threads."""
+
+import codecs
+import os
+import stat
+import tempfile
+from typing import Callable, Optional
+
+# Magic numbers of common binary formats (ELF, PE, PNG, JPEG, GIF, BMP, zip, gzip)
+BINARY_SIGNATURES = (
+    b"\x7fELF",
+    b"MZ",
+    b"\x89PNG",
+    b"\xff\xd8\xff",
+    b"GIF",
+    b"BM",
+    b"PK",
+    b"\x1f\x8b",
+)
+
+SNIFF_SIZE = 8192
+READ_CHUNK_SIZE = 1024 * 1024
+
+BINARY_FILE_MESSAGE = "Cannot open binary file"
+NOT_UTF8_MESSAGE = "Cannot open file: Not a valid UTF-8 text file"
+
+
+def is_binary_chunk(chunk: bytes) -> bool:
+    """Return True if the leading bytes of a file look like binary data."""
+    if any(chunk.startswith(sig) for sig in BINARY_SIGNATURES):
+        return True
+    return b"\x00" in chunk
+
+
+def is_utf8_chunk(chunk: bytes) -> bool:
+    """Return True if ``chunk`` decodes as UTF-8, allowing a truncated last character."""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(chunk, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def sniff_file(path: str) -> Optional[str]:
+    """Return a reason the file can't be edited as text, or None if it can."""
+    with open(path, "rb") as file:
+        chunk = file.read(SNIFF_SIZE)
+    if is_binary_chunk(chunk):
+        return BINARY_FILE_MESSAGE
+    if not is_utf8_chunk(chunk):
+        return NOT_UTF8_MESSAGE
+    return None
+
+
+def read_text(
+    path: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    chunk_size: int = READ_CHUNK_SIZE,
+) -> Optional[str]:
+    """Read a UTF-8 text file in chunks, reporting ``(bytes_read, total)``.
+
+    Returns None if ``cancelled`` reports that the read should stop.
+    """
+    total = os.path.getsize(path)
+    parts = []
+    with open(path, "r", encoding="utf-8") as file:
+        while True:
+            if cancelled is not None and cancelled():
+                return None
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            parts.append(chunk)
+            if progress is not None:
+                progress(file.buffer.tell(), total)
+    return "".join(parts)
+
+
+def atomic_write_text(path: str, text: str) -> int:
+    """Write ``text`` to ``path`` atomically and return the size written.
+
+    The text goes to a temporary file next to the target which then replaces
+    it with ``os.replace``, so a crash or full disk mid-write never leaves a
+    truncated file behind. Symlinks are followed and permissions preserved.
+    """
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(prefix=".ticked-", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(fd)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return os.path.getsize(path)
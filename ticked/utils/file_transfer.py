@@ -0,0 +1,349 @@
+"""Copying and moving files and folders off the UI thread, with progress.
+
+A :class:`FileTransfer` copies or moves one file or folder into place and is
+meant to run in a worker thread. The work is staged under a hidden name next
+to the destination and only renamed into place once it is complete, so a
+cancelled or failed transfer never leaves a half-copied file behind and a
+replaced destination is only removed once its replacement is ready.
+
+File contents are copied by the kernel where possible, with
+``os.copy_file_range`` (which can clone blocks on filesystems that support
+it) or ``os.sendfile``, falling back to plain reads and writes. Moves within
+a filesystem are a single rename.
+"""
+
+import errno
+import os
+import shutil
+import threading
+import uuid
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+# Bytes copied between progress reports and cancellation checks
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Errors meaning a copy method isn't available for these files, so the next
+# one should be tried
+_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EPERM,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+    errno.EOPNOTSUPP,
+}
+
+STAGING_PREFIX = ".ticked-partial-"
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+class TransferProgress(NamedTuple):
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+
+    @property
+    def percent(self) -> int:
+        if self.bytes_total:
+            return self.bytes_done * 100 // self.bytes_total
+        if self.files_total:
+            return self.files_done * 100 // self.files_total
+        return 100
+
+
+def _copy_file_range(source_fd: int, dest_fd: int, count: int) -> int:
+    return os.copy_file_range(source_fd, dest_fd, count)
+
+
+def _sendfile(source_fd: int, dest_fd: int, count: int) -> int:
+    return os.sendfile(dest_fd, source_fd, None, count)
+
+
+def _kernel_copy_methods() -> List[Callable[[int, int, int], int]]:
+    methods = []
+    if hasattr(os, "copy_file_range"):
+        methods.append(_copy_file_range)
+    if hasattr(os, "sendfile") and os.name == "posix":
+        methods.append(_sendfile)
+    return methods
+
+
+def copy_file_data(
+    source: str,
+    destination: str,
+    progress: Optional[Callable[[int], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """Copy the contents of ``source`` into a new file ``destination``.
+
+    ``progress`` is called with the number of bytes copied by each chunk.
+    Raises :class:`TransferCancelled` if ``cancelled`` reports that the
+    copy should stop. Returns the number of bytes copied.
+    """
+    copied = 0
+    source_fd = os.open(source, os.O_RDONLY)
+    try:
+        mode = os.fstat(source_fd).st_mode & 0o777
+        dest_fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        try:
+            # Both file offsets advance with every call and a failed call
+            # copies nothing, so any method can carry on where another failed
+            for method in _kernel_copy_methods():
+                try:
+                    while True:
+                        if cancelled is not None and cancelled():
+                            raise TransferCancelled
+                        count = method(source_fd, dest_fd, chunk_size)
+                        if count == 0:
+                            break
+                        copied += count
+                        if progress is not None:
+                            progress(count)
+                except OSError as e:
+                    if e.errno not in _FALLBACK_ERRNOS:
+                        raise
+                    continue
+                if copied:
+                    return copied
+                # Nothing copied: the file may be empty, or be one of the
+                # special files that report a size of 0; reading settles it
+                break
+
+            buffer = bytearray(min(chunk_size, 1024 * 1024))
+            view = memoryview(buffer)
+            while True:
+                if cancelled is not None and cancelled():
+                    raise TransferCancelled
+                count = os.readv(source_fd, [buffer])
+                if count == 0:
+                    break
+                written = 0
+                while written < count:
+                    written += os.write(dest_fd, view[written:count])
+                copied += count
+                if progress is not None:
+                    progress(count)
+        finally:
+            os.close(dest_fd)
+    finally:
+        os.close(source_fd)
+    return copied
+
+
+def unique_destination(path: str) -> str:
+    """A free name next to ``path``: ``name copy.ext``, ``name copy 2.ext``..."""
+    directory, name = os.path.split(path)
+    stem, ext = os.path.splitext(name)
+    if name.startswith(".") and not ext:
+        stem, ext = name, ""
+    candidate = os.path.join(directory, f"{stem} copy{ext}")
+    number = 2
+    while os.path.lexists(candidate):
+        candidate = os.path.join(directory, f"{stem} copy {number}{ext}")
+        number += 1
+    return candidate
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class FileTransfer:
+    """Copy or move ``source`` to ``destination``; call :meth:`run` in a thread.
+
+    With ``replace`` an existing destination is replaced, otherwise finding
+    one raises ``FileExistsError``. :meth:`cancel` may be called from any
+    thread. If a move across filesystems can't remove the source once the
+    copy is in place, the error is kept in :attr:`removal_error`.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        destination: str,
+        move: bool = False,
+        replace: bool = False,
+        progress: Optional[Callable[[TransferProgress], None]] = None,
+    ) -> None:
+        self.source = os.path.abspath(source)
+        self.destination = os.path.abspath(destination)
+        self.move = move
+        self.replace = replace
+        self._progress = progress
+        self._cancel = threading.Event()
+        self._files_total = 0
+        self._bytes_total = 0
+        self._files_done = 0
+        self._bytes_done = 0
+        self.removal_error: Optional[OSError] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def progress(self) -> TransferProgress:
+        return TransferProgress(
+            self._files_done, self._files_total, self._bytes_done, self._bytes_total
+        )
+
+    def _check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise TransferCancelled
+
+    def _report(self) -> None:
+        if self._progress is not None:
+            self._progress(self.progress)
+
+    def _validate(self) -> None:
+        if not os.path.lexists(self.source):
+            raise FileNotFoundError(
+                errno.ENOENT, "No such file or directory", self.source
+            )
+        if self.source == self.destination:
+            raise FileExistsError(
+                errno.EEXIST, "Source and destination are the same", self.destination
+            )
+        if os.path.isdir(self.source) and not os.path.islink(self.source):
+            real_source = os.path.realpath(self.source)
+            real_parent = os.path.realpath(os.path.dirname(self.destination))
+            if os.path.commonpath([real_source, real_parent]) == real_source:
+                raise ValueError("Cannot paste a folder into itself")
+        if os.path.lexists(self.destination) and not self.replace:
+            raise FileExistsError(errno.EEXIST, "File exists", self.destination)
+
+    def _staging_path(self, label: str = "") -> str:
+        name = f"{STAGING_PREFIX}{label}{uuid.uuid4().hex[:12]}"
+        return os.path.join(os.path.dirname(self.destination), name)
+
+    def _plan(self) -> List[Tuple[str, str]]:
+        """``(relative path, kind)`` of every entry of the source, parents first.
+
+        Also counts the files and bytes to copy for progress.
+        """
+        if not os.path.isdir(self.source) or os.path.islink(self.source):
+            self._files_total = 1
+            self._bytes_total = os.lstat(self.source).st_size
+            return [("", "link" if os.path.islink(self.source) else "file")]
+
+        entries = [("", "dir")]
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            with os.scandir(os.path.join(self.source, relative)) as scan:
+                children = list(scan)
+            for entry in children:
+                self._check_cancelled()
+                child = os.path.join(relative, entry.name)
+                if entry.is_symlink():
+                    entries.append((child, "link"))
+                    self._files_total += 1
+                elif entry.is_dir():
+                    entries.append((child, "dir"))
+                    stack.append(child)
+                else:
+                    entries.append((child, "file"))
+                    self._files_total += 1
+                    try:
+                        self._bytes_total += entry.stat().st_size
+                    except OSError:
+                        pass
+        return entries
+
+    def _copy_to(self, target: str) -> None:
+        entries = self._plan()
+        self._report()
+        directories = []
+
+        def on_bytes(count: int) -> None:
+            self._bytes_done += count
+            self._report()
+
+        for relative, kind in entries:
+            self._check_cancelled()
+            source = os.path.join(self.source, relative) if relative else self.source
+            dest = os.path.join(target, relative) if relative else target
+            if kind == "dir":
+                os.mkdir(dest)
+                directories.append((source, dest))
+                continue
+            if kind == "link":
+                os.symlink(os.readlink(source), dest)
+            else:
+                copy_file_data(source, dest, on_bytes, lambda: self._cancel.is_set())
+                shutil.copystat(source, dest)
+            self._files_done += 1
+            self._report()
+        # Directory times are only final once their contents are written
+        for source, dest in reversed(directories):
+            shutil.copystat(source, dest)
+
+    def _commit(self, staged: str) -> None:
+        """Rename ``staged`` to the destination, replacing what's there."""
+        if os.path.lexists(self.destination):
+            if not self.replace:
+                raise FileExistsError(errno.EEXIST, "File exists", self.destination)
+            old = self._staging_path("old-")
+            os.rename(self.destination, old)
+            try:
+                os.rename(staged, self.destination)
+            except OSError:
+                os.rename(old, self.destination)
+                raise
+            _remove(old)
+        else:
+            os.rename(staged, self.destination)
+
+    def run(self) -> str:
+        """Do the transfer and return the destination.
+
+        Raises :class:`TransferCancelled` if cancelled; nothing is left
+        behind at the destination then, and a move leaves the source intact.
+        """
+        self._validate()
+        if self.move:
+            try:
+                # Within one filesystem a move is a rename, which is instant
+                self._commit(self.source)
+                self._files_total = self._files_done = 1
+                self._report()
+                return self.destination
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        staged = self._staging_path()
+        try:
+            self._copy_to(staged)
+            self._check_cancelled()
+            self._commit(staged)
+        except BaseException:
+            _remove(staged)
+            raise
+        if self.move:
+            self._remove_source()
+        return self.destination
+
+    def _remove_source(self) -> None:
+        """Delete the source of a move whose copy is in place."""
+        try:
+            if os.path.isdir(self.source) and not os.path.islink(self.source):
+                shutil.rmtree(self.source)
+            else:
+                os.unlink(self.source)
+        except OSError as e:
+            # The move itself succeeded, so this isn't raised
+            self.removal_error = e
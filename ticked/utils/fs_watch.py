@@ -0,0 +1,244 @@
+"""Directory watchers that report which directories changed.
+
+:class:`InotifyWatcher` uses Linux inotify (through ctypes, so there is no
+extra dependency) and :class:`PollingWatcher` compares directory mtimes on
+other platforms. Both watch individual directories, not whole trees, and
+report changes in debounced batches: once something changes the watcher
+waits until the filesystem has been quiet for ``debounce`` seconds (or
+``max_delay`` has passed) and then calls the callback once with the set of
+directories whose entries were created, deleted or renamed. A burst such as
+a ``git checkout`` therefore results in a single update.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+ChangeCallback = Callable[[Set[str]], None]
+
+DEBOUNCE = 0.2
+MAX_DELAY = 1.0
+POLL_INTERVAL = 1.0
+
+# Flags from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+_WATCH_MASK = (
+    IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _BaseWatcher:
+    def __init__(
+        self,
+        callback: ChangeCallback,
+        debounce: float = DEBOUNCE,
+        max_delay: float = MAX_DELAY,
+    ) -> None:
+        self.callback = callback
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dirty: Set[str] = set()
+        self._first_change = 0.0
+        self._last_change = 0.0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=type(self).__name__, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def _mark_dirty(self, path: str) -> None:
+        now = time.monotonic()
+        if not self._dirty:
+            self._first_change = now
+        self._last_change = now
+        self._dirty.add(path)
+
+    def _flush_timeout(self) -> Optional[float]:
+        """Seconds until pending changes should be flushed, or None if idle."""
+        if not self._dirty:
+            return None
+        now = time.monotonic()
+        deadline = min(
+            self._last_change + self.debounce, self._first_change + self.max_delay
+        )
+        return max(0.0, deadline - now)
+
+    def _flush(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if dirty and not self._stopped.is_set():
+            self.callback(dirty)
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+
+class InotifyWatcher(_BaseWatcher):
+    def __init__(self, callback: ChangeCallback, **kwargs) -> None:
+        super().__init__(callback, **kwargs)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: Dict[int, str] = {}
+        self._watches: Dict[str, int] = {}
+
+    def watch(self, path: str) -> None:
+        with self._lock:
+            if path in self._watches or self._fd < 0:
+                return
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd >= 0:
+                self._watches[path] = wd
+                self._paths[wd] = path
+
+    def unwatch(self, path: str) -> None:
+        with self._lock:
+            wd = self._watches.pop(path, None)
+            if wd is not None:
+                self._paths.pop(wd, None)
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _handle_events(self, data: bytes) -> None:
+        offset = 0
+        with self._lock:
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; everything might have changed
+                    for path in self._watches:
+                        self._mark_dirty(path)
+                    continue
+                path = self._paths.get(wd)
+                if path is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # The kernel dropped the watch (directory deleted/unmounted)
+                    self._paths.pop(wd, None)
+                    self._watches.pop(path, None)
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    self._mark_dirty(os.path.dirname(path))
+                else:
+                    self._mark_dirty(path)
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                timeout = self._flush_timeout()
+                # Wake up at least every half second to notice stop()
+                ready, _, _ = select.select(
+                    [self._fd], [], [], 0.5 if timeout is None else min(timeout, 0.5)
+                )
+                if ready:
+                    try:
+                        data = os.read(self._fd, 64 * 1024)
+                    except BlockingIOError:
+                        data = b""
+                    self._handle_events(data)
+                if self._flush_timeout() == 0:
+                    self._flush()
+        finally:
+            with self._lock:
+                os.close(self._fd)
+                self._fd = -1
+
+
+class PollingWatcher(_BaseWatcher):
+    def __init__(
+        self, callback: ChangeCallback, interval: float = POLL_INTERVAL, **kwargs
+    ) -> None:
+        super().__init__(callback, **kwargs)
+        self.interval = interval
+        self._mtimes: Dict[str, Optional[int]] = {}
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def watch(self, path: str) -> None:
+        mtime = self._mtime(path)
+        with self._lock:
+            self._mtimes.setdefault(path, mtime)
+
+    def unwatch(self, path: str) -> None:
+        with self._lock:
+            self._mtimes.pop(path, None)
+
+    def _poll(self) -> None:
+        with self._lock:
+            watched = list(self._mtimes.items())
+        for path, old_mtime in watched:
+            mtime = self._mtime(path)
+            if mtime == old_mtime:
+                continue
+            with self._lock:
+                if path not in self._mtimes:
+                    continue
+                if mtime is None:
+                    del self._mtimes[path]
+                    self._mark_dirty(os.path.dirname(path))
+                else:
+                    self._mtimes[path] = mtime
+                    self._mark_dirty(path)
+
+    def _run(self) -> None:
+        next_poll = 0.0
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            if now >= next_poll:
+                self._poll()
+                next_poll = now + self.interval
+            timeout = self._flush_timeout()
+            if timeout == 0:
+                self._flush()
+                continue
+            wait = next_poll - time.monotonic()
+            if timeout is not None:
+                wait = min(wait, timeout)
+            self._stopped.wait(max(0.0, wait))
+
+
+def create_watcher(callback: ChangeCallback, **kwargs) -> _BaseWatcher:
+    """Return an inotify watcher on Linux, falling back to polling."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(callback, **kwargs)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(callback, **kwargs)
@@ -0,0 +1,347 @@
+"""fzf-style fuzzy matching and ranking.
+
+Scoring follows fzf's v1 algorithm: a forward scan finds the first position
+where the whole pattern has been matched, a backward scan from there finds
+the shortest span that still contains the pattern, and that span is scored
+with bonuses for word boundaries, camelCase humps and consecutive runs, and
+penalties for gaps.
+"""
+
+import heapq
+from itertools import islice
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+
+BONUS_BOUNDARY = SCORE_MATCH // 2
+BONUS_NON_WORD = SCORE_MATCH // 2
+BONUS_CAMEL = BONUS_BOUNDARY + SCORE_GAP_EXTENSION
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+
+_BIT_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+_CHAR_NON_WORD = 0
+_CHAR_LOWER = 1
+_CHAR_UPPER = 2
+_CHAR_NUMBER = 3
+
+
+def _char_class(char: str) -> int:
+    if char.islower():
+        return _CHAR_LOWER
+    if char.isupper():
+        return _CHAR_UPPER
+    if char.isdigit():
+        return _CHAR_NUMBER
+    if char.isalpha():
+        return _CHAR_LOWER
+    return _CHAR_NON_WORD
+
+
+def _bonus_for(prev_class: int, cur_class: int) -> int:
+    if prev_class == _CHAR_NON_WORD and cur_class != _CHAR_NON_WORD:
+        # Start of a word, e.g. the "c" in "get_config" or "/src"
+        return BONUS_BOUNDARY
+    if (prev_class == _CHAR_LOWER and cur_class == _CHAR_UPPER) or (
+        prev_class != _CHAR_NUMBER and cur_class == _CHAR_NUMBER
+    ):
+        # camelCase hump or the start of a number
+        return BONUS_CAMEL
+    if cur_class == _CHAR_NON_WORD:
+        return BONUS_NON_WORD
+    return 0
+
+
+class _CharClassTable(dict):
+    """``str.translate`` table mapping code points to their character class."""
+
+    def __missing__(self, codepoint: int) -> int:
+        char_class = _char_class(chr(codepoint))
+        self[codepoint] = char_class
+        return char_class
+
+
+_CHAR_CLASSES = _CharClassTable()
+_PAIR_BONUSES = bytes(
+    _bonus_for(pair >> 2, pair & 3) if pair < 16 else 0 for pair in range(256)
+)
+
+
+def compute_bonuses(text: str) -> bytes:
+    """Per-character position bonuses for ``text``.
+
+    The beginning of the string counts as a word boundary.
+    """
+    if not text:
+        return b""
+    classes = text.translate(_CHAR_CLASSES).encode("latin-1")
+    # Pair every character class with the one before it in a single big-int
+    # operation (classes fit in two bits, so the bytes never carry), then map
+    # each (previous, current) pair to its bonus.
+    current = int.from_bytes(classes, "big")
+    previous = current >> 8
+    pairs = (previous * 4 + current).to_bytes(len(classes), "big")
+    return pairs.translate(_PAIR_BONUSES)
+
+
+def _match_span(pattern: str, text: str) -> Optional[Tuple[int, int]]:
+    """Return the ``[start, end)`` span of the shortest match ending earliest."""
+    pos = -1
+    for char in pattern:
+        pos = text.find(char, pos + 1)
+        if pos < 0:
+            return None
+    end = pos + 1
+
+    start = end
+    for char in reversed(pattern):
+        start = text.rfind(char, 0, start)
+    return start, end
+
+
+def _score_span(
+    pattern: str, text: str, bonuses: bytes, start: int, end: int
+) -> int:
+    score = 0
+    prev = -1
+    first_bonus = 0
+    pos = start
+    for pattern_idx, char in enumerate(pattern):
+        pos = text.find(char, pos, end)
+        bonus = bonuses[pos]
+        if pattern_idx == 0:
+            first_bonus = bonus
+            score += SCORE_MATCH + bonus * BONUS_FIRST_CHAR_MULTIPLIER
+        elif pos == prev + 1:
+            # A consecutive run keeps the bonus of the boundary it started on
+            if bonus >= BONUS_BOUNDARY and bonus > first_bonus:
+                first_bonus = bonus
+            score += SCORE_MATCH + max(bonus, first_bonus, BONUS_CONSECUTIVE)
+        else:
+            gap = pos - prev - 1
+            score += SCORE_GAP_START + (gap - 1) * SCORE_GAP_EXTENSION
+            first_bonus = bonus
+            score += SCORE_MATCH + bonus
+        prev = pos
+        pos += 1
+    return score
+
+
+def _score_single_char(char: str, text: str, bonuses: bytes) -> Optional[int]:
+    best = -1
+    pos = text.find(char)
+    while pos >= 0:
+        if bonuses[pos] > best:
+            best = bonuses[pos]
+            if best >= BONUS_BOUNDARY:
+                break
+        pos = text.find(char, pos + 1)
+    if best < 0:
+        return None
+    return SCORE_MATCH + best * BONUS_FIRST_CHAR_MULTIPLIER
+
+
+def is_case_sensitive(pattern: str) -> bool:
+    """Smart case: only patterns containing an uppercase letter match exactly."""
+    return pattern != pattern.lower()
+
+
+def fuzzy_score(
+    pattern: str, text: str, bonuses: Optional[bytes] = None
+) -> Optional[int]:
+    """Score ``text`` against ``pattern``, returning ``None`` when it doesn't match.
+
+    Higher is better. An empty pattern matches everything with a score of 0.
+    """
+    if not pattern:
+        return 0
+    if bonuses is None:
+        bonuses = compute_bonuses(text)
+    if not is_case_sensitive(pattern):
+        text = text.lower()
+
+    if len(pattern) == 1:
+        return _score_single_char(pattern, text, bonuses)
+
+    span = _match_span(pattern, text)
+    if span is None:
+        return None
+    return _score_span(pattern, text, bonuses, span[0], span[1])
+
+
+def fuzzy_match(pattern: str, text: str) -> bool:
+    """Return True if every character of ``pattern`` appears in order in ``text``."""
+    return bool(pattern) and fuzzy_score(pattern, text) is not None
+
+
+def perfect_score(pattern: str) -> int:
+    """The highest score any text can get for ``pattern``."""
+    if not pattern:
+        return 0
+    return (
+        SCORE_MATCH * len(pattern)
+        + BONUS_BOUNDARY * BONUS_FIRST_CHAR_MULTIPLIER
+        + BONUS_BOUNDARY * (len(pattern) - 1)
+    )
+
+
+class CandidateTable(Generic[T]):
+    """A precomputed table of candidates for repeated fuzzy ranking.
+
+    Candidates are stored shortest first. A query ANDs together per-character
+    bitmasks of the lowercased keys, so only candidates containing every
+    pattern character are scanned, and because ties are broken by length,
+    scanning them in order lets a query stop as soon as it has ``limit``
+    candidates with a perfect score. A single character can only score one
+    of a few values, so its matches are scored once and kept grouped by
+    score. Masks and position bonuses are computed lazily the first time they
+    are needed, and the matches of the previous query are remembered so that
+    typing one more character only rescores the survivors.
+    """
+
+    def __init__(
+        self, items: Iterable[T], key: Callable[[T], str] = lambda item: item
+    ) -> None:
+        self.items: List[T] = list(items)
+        keys = [key(item).replace("\n", " ") for item in self.items]
+        order = sorted(range(len(keys)), key=lambda index: (len(keys[index]), index))
+
+        self._order: List[int] = order
+        self._keys: List[str] = [keys[index] for index in order]
+        self._lowered: List[str] = [text.lower() for text in self._keys]
+        self._bonuses: List[Optional[bytes]] = [None] * len(order)
+        # Character -> bitmask of the candidates whose lowered key contains it
+        self._masks: Dict[str, int] = {}
+        # Single character pattern -> (score, positions) best first
+        self._tiers: Dict[str, List[Tuple[int, List[int]]]] = {}
+
+        self._last_pattern = ""
+        self._last_positions: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _get_bonuses(self, position: int) -> bytes:
+        bonuses = self._bonuses[position]
+        if bonuses is None:
+            bonuses = compute_bonuses(self._keys[position])
+            self._bonuses[position] = bonuses
+        return bonuses
+
+    def _char_mask(self, char: str) -> int:
+        mask = self._masks.get(char)
+        if mask is None:
+            flags = bytes(char in text for text in self._lowered).translate(
+                _BIT_DIGITS
+            )
+            # Reverse so that bit ``i`` of the integer belongs to position ``i``
+            mask = int(flags[::-1] or b"0", 2)
+            self._masks[char] = mask
+        return mask
+
+    def _selection(self, pattern: str) -> str:
+        """Bit string (position ``i`` first) of keys containing every character."""
+        mask = -1
+        for char in set(pattern.lower()):
+            mask &= self._char_mask(char)
+            if not mask:
+                return ""
+        return bin(mask)[:1:-1]
+
+    def _candidate_positions(self, pattern: str) -> Iterator[int]:
+        """Table positions of candidates that may contain ``pattern``.
+
+        Every candidate yielded contains each pattern character, in order or
+        not; the caller still has to check for a match.
+        """
+        bits = self._selection(pattern)
+        if self._last_pattern and pattern.startswith(self._last_pattern):
+            # Narrowing: only the previous matches can still match
+            for position in self._last_positions:
+                if bits[position : position + 1] == "1":
+                    yield position
+            return
+
+        position = bits.find("1")
+        while position >= 0:
+            yield position
+            position = bits.find("1", position + 1)
+
+    def rank(
+        self, pattern: str, limit: Optional[int] = None
+    ) -> List[Tuple[int, T]]:
+        """Return ``(score, item)`` pairs for matching items, best first.
+
+        Ties are broken by shorter keys and then by original order.
+        """
+        order = self._order
+        if not pattern:
+            positions = order if limit is None else order[:limit]
+            return [(0, self.items[index]) for index in positions]
+
+        tiers = self._tiers.get(pattern)
+        if tiers is not None:
+            # The mask of a single character is exact, so there's nothing to
+            # narrow from
+            self._last_pattern = ""
+            self._last_positions = []
+            ranked = (
+                (score, self.items[order[position]])
+                for score, positions in tiers
+                for position in positions
+            )
+            return list(islice(ranked, limit))
+
+        texts = self._keys if is_case_sensitive(pattern) else self._lowered
+        get_bonuses = self._get_bonuses
+        single_char = len(pattern) == 1
+        best = perfect_score(pattern)
+        perfect = 0
+        matched: List[int] = []
+        results: List[Tuple[int, int]] = []
+        exhausted = True
+        for position in self._candidate_positions(pattern):
+            text = texts[position]
+            if single_char:
+                score = _score_single_char(pattern, text, get_bonuses(position))
+                if score is None:
+                    continue
+            else:
+                span = _match_span(pattern, text)
+                if span is None:
+                    continue
+                score = _score_span(
+                    pattern, text, get_bonuses(position), span[0], span[1]
+                )
+            matched.append(position)
+            results.append((-score, position))
+            if score == best:
+                perfect += 1
+                if limit is not None and perfect >= limit:
+                    exhausted = False
+                    break
+
+        if exhausted:
+            # Only a complete scan can seed narrowing for the next keystroke
+            self._last_pattern = pattern
+            self._last_positions = matched
+            if single_char:
+                # Every match was scored, so keep them grouped by score
+                by_score: Dict[int, List[int]] = {}
+                for score, position in results:
+                    by_score.setdefault(-score, []).append(position)
+                self._tiers[pattern] = sorted(by_score.items(), reverse=True)
+        else:
+            self._last_pattern = ""
+            self._last_positions = []
+
+        if limit is not None and limit < len(results):
+            results = heapq.nsmallest(limit, results)
+        else:
+            results.sort()
+        return [(-score, self.items[order[position]]) for score, position in results]
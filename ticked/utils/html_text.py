@@ -0,0 +1,216 @@
+"""Convert the HTML of Canvas content to Markdown-flavoured text.
+
+:func:`html_to_text` streams the HTML through lxml's parser with a target
+that writes text as tags open and close, so no document tree is built.
+Paragraphs, line breaks, links, emphasis and (nested) lists are kept as
+Markdown; scripts, styles and other markup are dropped.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional
+
+from lxml import etree
+
+# Tags that start and end a paragraph of their own
+BLOCK_TAGS = frozenset(
+    {
+        "address",
+        "article",
+        "blockquote",
+        "div",
+        "dl",
+        "dd",
+        "dt",
+        "figure",
+        "footer",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "p",
+        "pre",
+        "section",
+        "table",
+    }
+)
+
+# Tags whose content isn't text
+SKIP_TAGS = frozenset({"head", "noscript", "script", "style", "template", "title"})
+
+EMPHASIS = {"b": "**", "strong": "**", "em": "*", "i": "*"}
+
+# Characters that would otherwise be read as Markdown
+_ESCAPES = str.maketrans({char: "\\" + char for char in "\\`*_[]<>#|"})
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+# A hard line break (a backslash ending the line) that ends a paragraph
+_DANGLING_BREAK_RE = re.compile(r"\\\n(?=\n|$)")
+
+
+class _TextTarget:
+    """lxml parser target that writes Markdown as the HTML streams past."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.parts: List[str] = []
+        self._skip = 0
+        self._pre = 0
+        # One entry per open list: the next item number, or None if unordered
+        self._lists: List[Optional[int]] = []
+        # Output position and href of each open link
+        self._links: List[tuple] = []
+        self._at_line_start = True
+
+    def _write(self, text: str) -> None:
+        self.parts.append(text)
+        self._at_line_start = text.endswith("\n")
+
+    def _newline(self) -> None:
+        if not self._at_line_start:
+            self._write("\n")
+
+    def _paragraph(self) -> None:
+        self._newline()
+        self._write("\n")
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self._skip or tag in SKIP_TAGS:
+            self._skip += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._paragraph()
+            if tag == "pre":
+                self._pre += 1
+                self._write("```\n")
+            elif tag == "hr":
+                self._write("---\n")
+            elif tag[0] == "h" and tag[1:].isdigit():
+                self._write("#" * int(tag[1:]) + " ")
+                self._at_line_start = True
+        elif tag == "br":
+            if self._lists:
+                # Continue the list item on the next line
+                self._write("\n" + "  " * len(self._lists))
+                self._at_line_start = True
+            elif not self._at_line_start:
+                self._write("\\\n")
+        elif tag in ("ul", "ol"):
+            if not self._lists:
+                self._paragraph()
+            self._lists.append(1 if tag == "ol" else None)
+        elif tag == "li":
+            self._newline()
+            depth = max(len(self._lists), 1)
+            number = self._lists[-1] if self._lists else None
+            if number is None:
+                marker = "- "
+            else:
+                marker = f"{number}. "
+                self._lists[-1] = number + 1
+            self._write("  " * (depth - 1) + marker)
+            self._at_line_start = True
+        elif tag == "a":
+            self._links.append((len(self.parts), attrib.get("href", "").strip()))
+        elif tag in EMPHASIS:
+            self._write(EMPHASIS[tag])
+        elif tag == "tr":
+            self._newline()
+        elif tag in ("td", "th"):
+            if not self._at_line_start:
+                self._write(" | ")
+
+    def end(self, tag: str) -> None:
+        if self._skip:
+            self._skip -= 1
+            return
+        if tag in BLOCK_TAGS:
+            if tag == "pre":
+                self._pre -= 1
+                self._newline()
+                self._write("```\n")
+            self._paragraph()
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            if not self._lists:
+                self._paragraph()
+        elif tag == "li":
+            self._newline()
+        elif tag == "tr":
+            # One line per row
+            if not self._at_line_start:
+                self._write("\\\n")
+        elif tag == "a" and self._links:
+            self._end_link()
+        elif tag in EMPHASIS:
+            self._write(EMPHASIS[tag])
+
+    def _end_link(self) -> None:
+        start, href = self._links.pop()
+        if not href or href.startswith(("javascript:", "#")):
+            return
+        label = "".join(self.parts[start:]).strip()
+        del self.parts[start:]
+        href = href.replace(" ", "%20").replace(")", "%29")
+        self._write(f"[{label or _escape(href)}]({href})")
+
+    def data(self, text: str) -> None:
+        # Called for every run of text, so this avoids regular expressions
+        if self._skip:
+            return
+        if self._pre:
+            self._write(text)
+            return
+        words = text.split()
+        if not words:
+            if text and not self._at_line_start and self.parts[-1][-1:] != " ":
+                self._write(" ")
+            return
+        collapsed = " ".join(words).translate(_ESCAPES)
+        if text[0].isspace() and not self._at_line_start:
+            if self.parts[-1][-1:] != " ":
+                collapsed = " " + collapsed
+        if text[-1].isspace():
+            collapsed += " "
+        self.parts.append(collapsed)
+        self._at_line_start = False
+
+    def close(self) -> str:
+        text = "".join(self.parts)
+        self.reset()
+        text = _TRAILING_SPACE_RE.sub("\n", text)
+        text = _DANGLING_BREAK_RE.sub("\n", text)
+        return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def _escape(text: str) -> str:
+    return text.translate(_ESCAPES)
+
+
+# Creating a parser with a target costs about as much as converting a short
+# announcement, so each thread reuses one
+_local = threading.local()
+
+
+def html_to_text(html: str) -> str:
+    """Markdown text of an HTML fragment, keeping links, lists and paragraphs."""
+    if not html or not html.strip():
+        return ""
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        _local.target = _TextTarget()
+        parser = etree.HTMLParser(target=_local.target, remove_comments=True)
+    # Forget the parser while in use, in case the conversion fails midway
+    _local.parser = None
+    _local.target.reset()
+    parser.feed(html)
+    text = parser.close()
+    _local.parser = parser
+    return text
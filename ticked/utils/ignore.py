@@ -0,0 +1,307 @@
+""".gitignore pattern matching for tree walks.
+
+Rules are read per directory and chained to the rules of the parent
+directory, mirroring how git applies nested ``.gitignore`` files: a pattern
+applies relative to the directory of the file that contains it, the last
+matching pattern wins and deeper files take precedence over shallower ones.
+``.ignore`` files (as used by ripgrep and other tools) are read too and take
+precedence over ``.gitignore`` in the same directory. Walkers are expected
+not to descend into ignored directories, which also gives git's "a file
+can't be re-included if its directory is excluded" behaviour for free.
+
+:class:`IgnoreCache` keeps the rules of every directory of one tree, plus
+user patterns that apply below its root, so that re-listing a directory
+doesn't re-read and re-compile its ignore files.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Later files take precedence
+IGNORE_FILES = (".gitignore", ".ignore")
+
+# User patterns used until configured otherwise
+DEFAULT_IGNORE_PATTERNS = ["node_modules/", "__pycache__/", ".venv/", "*.pyc"]
+
+
+class IgnorePattern(NamedTuple):
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+
+
+def _translate_glob(glob: str) -> str:
+    """Regex source for a gitignore glob matched against ``/`` separated paths."""
+    parts = []
+    i = 0
+    length = len(glob)
+    while i < length:
+        char = glob[i]
+        at_boundary = i == 0 or glob[i - 1] == "/"
+        if glob.startswith("**/", i) and at_boundary:
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("**", i) and i + 2 == length and at_boundary:
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = glob.find("]", i + 2 if glob.startswith("[!", i) else i + 1)
+            if end < 0:
+                parts.append(re.escape(char))
+            else:
+                body = glob[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif char == "\\" and i + 1 < length:
+            i += 1
+            parts.append(re.escape(glob[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def parse_pattern(line: str) -> Optional[IgnorePattern]:
+    """Parse one line of an ignore file, or return None for blanks/comments."""
+    line = line.rstrip("\n\r")
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\#") or line.startswith("\\!"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to its directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+    source = _translate_glob(line)
+    if not anchored:
+        source = "(?:.*/)?" + source
+    try:
+        regex = re.compile(source, re.DOTALL)
+    except re.error:
+        return None
+    return IgnorePattern(regex, negate, dir_only)
+
+
+def parse_patterns(text: str) -> List[IgnorePattern]:
+    patterns = []
+    for line in text.splitlines():
+        pattern = parse_pattern(line)
+        if pattern is not None:
+            patterns.append(pattern)
+    return patterns
+
+
+def read_sources(directory: str) -> Tuple[str, ...]:
+    """Contents of the ignore files in ``directory`` ("" for missing ones)."""
+    sources = []
+    for name in IGNORE_FILES:
+        try:
+            with open(
+                os.path.join(directory, name), "r", encoding="utf-8", errors="replace"
+            ) as file:
+                sources.append(file.read())
+        except OSError:
+            sources.append("")
+    return tuple(sources)
+
+
+def _combine(patterns: List[IgnorePattern]) -> Optional["re.Pattern[str]"]:
+    if not patterns:
+        return None
+    return re.compile(
+        "|".join(f"(?:{pattern.regex.pattern})" for pattern in patterns), re.DOTALL
+    )
+
+
+class IgnoreRules:
+    """Ignore patterns of one directory, chained to its parent's rules."""
+
+    def __init__(
+        self,
+        base: str,
+        patterns: List[IgnorePattern],
+        parent: Optional["IgnoreRules"] = None,
+    ) -> None:
+        self.base = base.rstrip(os.sep)
+        self.patterns = patterns
+        self.parent = parent
+        self._prefix = self.base + os.sep
+        # Without negations the order doesn't matter, so one alternation per
+        # entry kind answers "is anything matching" in a single regex call
+        if not any(pattern.negate for pattern in patterns):
+            self._file_regex = _combine([p for p in patterns if not p.dir_only])
+            self._dir_regex = _combine(patterns)
+            self._combined = True
+        else:
+            self._combined = False
+
+    @classmethod
+    def for_directory(
+        cls, directory: str, parent: Optional["IgnoreRules"] = None
+    ) -> Optional["IgnoreRules"]:
+        """Rules for ``directory``: its ignore files chained to ``parent``.
+
+        Returns ``parent`` itself when the directory has no ignore rules.
+        """
+        return cls.from_sources(directory, read_sources(directory), parent)
+
+    @classmethod
+    def from_sources(
+        cls,
+        directory: str,
+        sources: Iterable[str],
+        parent: Optional["IgnoreRules"] = None,
+    ) -> Optional["IgnoreRules"]:
+        patterns = parse_patterns("\n".join(sources))
+        if not patterns:
+            return parent
+        return cls(directory, patterns, parent)
+
+    @classmethod
+    def for_root(
+        cls, root: str, parent: Optional["IgnoreRules"] = None
+    ) -> Optional["IgnoreRules"]:
+        """Rules for a walk starting at ``root``.
+
+        Ignore files in the directories above ``root``, up to the enclosing
+        git work tree, apply as well.
+        """
+        rules = parent
+        for directory in reversed(_work_tree_ancestors(os.path.abspath(root))):
+            rules = cls.for_directory(directory, rules)
+        return rules
+
+    def _match(self, relative: str, is_dir: bool) -> Optional[bool]:
+        if self._combined:
+            regex = self._dir_regex if is_dir else self._file_regex
+            if regex is not None and regex.fullmatch(relative):
+                return True
+            return None
+        for pattern in reversed(self.patterns):
+            if pattern.dir_only and not is_dir:
+                continue
+            if pattern.regex.fullmatch(relative):
+                return not pattern.negate
+        return None
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        """Whether the absolute ``path`` is ignored by these rules."""
+        rules: Optional[IgnoreRules] = self
+        while rules is not None:
+            if path.startswith(rules._prefix):
+                relative = path[len(rules._prefix) :]
+                if os.sep != "/":
+                    relative = relative.replace(os.sep, "/")
+                matched = rules._match(relative, is_dir)
+                if matched is not None:
+                    return matched
+            rules = rules.parent
+        return False
+
+
+def _work_tree_ancestors(root: str) -> List[str]:
+    """``root`` and its parents up to the enclosing git work tree, if any."""
+    ancestors = []
+    directory = root
+    while True:
+        ancestors.append(directory)
+        if os.path.exists(os.path.join(directory, ".git")):
+            return ancestors
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            # Not inside a git work tree: only the root's own rules apply
+            return [root]
+        directory = parent
+
+
+class IgnoreCache:
+    """Compiled ignore rules of every directory below ``root``, built on demand.
+
+    Safe to use from the worker threads that list directories.
+    """
+
+    def __init__(self, root: str, user_patterns: Iterable[str] = ()) -> None:
+        self.root = os.path.abspath(root)
+        self.user_patterns = list(user_patterns)
+        self._lock = threading.Lock()
+        # Directory -> (ignore file contents, rules in effect there)
+        self._entries: Dict[str, Tuple[Tuple[str, ...], Optional[IgnoreRules]]] = {}
+
+    def _user_rules(self) -> Optional[IgnoreRules]:
+        patterns = parse_patterns("\n".join(self.user_patterns))
+        return IgnoreRules(self.root, patterns) if patterns else None
+
+    def rules_for(self, directory: str) -> Optional[IgnoreRules]:
+        """Rules that apply to the entries of ``directory``."""
+        with self._lock:
+            return self._rules_for(os.path.abspath(directory))
+
+    def _rules_for(self, directory: str) -> Optional[IgnoreRules]:
+        entry = self._entries.get(directory)
+        if entry is not None:
+            return entry[1]
+        if directory == self.root:
+            # User patterns have the lowest precedence (like core.excludesFile),
+            # then come ignore files above the root within its git work tree
+            parent = self._user_rules()
+            for ancestor in reversed(_work_tree_ancestors(directory)[1:]):
+                parent = IgnoreRules.for_directory(ancestor, parent)
+        elif directory.startswith(self.root.rstrip(os.sep) + os.sep):
+            parent = self._rules_for(os.path.dirname(directory))
+        else:
+            return None
+        sources = read_sources(directory)
+        rules = IgnoreRules.from_sources(directory, sources, parent)
+        self._entries[directory] = (sources, rules)
+        return rules
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        rules = self.rules_for(os.path.dirname(path))
+        return rules is not None and rules.is_ignored(path, is_dir)
+
+    def invalidate(self, directory: Optional[str] = None) -> bool:
+        """Forget the rules of ``directory`` and everything below it.
+
+        Returns True if the directory's ignore files changed, meaning the
+        listings of its loaded subdirectories may be stale too. Without a
+        directory the whole cache is cleared.
+        """
+        with self._lock:
+            if directory is None:
+                self._entries.clear()
+                return True
+            directory = os.path.abspath(directory)
+            entry = self._entries.get(directory)
+            if entry is None:
+                return False
+            changed = read_sources(directory) != entry[0]
+            if changed:
+                prefix = directory.rstrip(os.sep) + os.sep
+                for key in [key for key in self._entries if key.startswith(prefix)]:
+                    del self._entries[key]
+                del self._entries[directory]
+            return changed
@@ -0,0 +1,307 @@
+"""Memory-mapped, lazily loaded buffers for very large files.
+
+A :class:`LargeFileBuffer` never reads the whole file into memory. The file
+is memory-mapped, a background thread builds an index of line start offsets,
+and the editor asks for one fixed-size chunk of lines at a time. Edited
+chunks are kept as text overlays keyed by chunk number, and saving streams
+untouched chunks straight from the map into a temporary file that then
+replaces the original, so at no point are two full copies held in memory.
+"""
+
+import errno
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from typing import Dict, Optional, Tuple
+
+# Files at or above this size are opened in large-file mode
+LARGE_FILE_THRESHOLD = 16 * 1024 * 1024
+
+# Number of lines the editor shows (and edits) at once in large-file mode
+CHUNK_LINES = 2000
+
+_INDEX_BLOCK_SIZE = 4 * 1024 * 1024
+_COPY_BLOCK_SIZE = 1024 * 1024
+
+
+def is_large_file(path: str, threshold: int = LARGE_FILE_THRESHOLD) -> bool:
+    try:
+        return os.path.getsize(path) >= threshold
+    except OSError:
+        return False
+
+
+class LargeFileBuffer:
+    def __init__(
+        self, path: str, encoding: str = "utf-8", chunk_lines: int = CHUNK_LINES
+    ) -> None:
+        self.path = path
+        self.encoding = encoding
+        self.chunk_lines = chunk_lines
+
+        # Edited chunks: chunk index -> (text, ended with a newline)
+        self.edits: Dict[int, Tuple[str, bool]] = {}
+
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._size = 0
+        self._offsets = array("Q", [0])
+        self._indexed = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        # Held while saving so the UI thread can't read or edit chunks while
+        # the map is being swapped out from under it
+        self._lock = threading.RLock()
+
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        # Zero-length files can't be mapped
+        if self._size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = None
+        self._offsets = array("Q", [0])
+        self._indexed = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    @property
+    def indexed(self) -> bool:
+        """True once every line start offset is known."""
+        return self._indexed
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines indexed so far (the total once :attr:`indexed`)."""
+        with self._condition:
+            return len(self._offsets) - (1 if self._indexed else 0)
+
+    def start_indexing(self) -> threading.Thread:
+        """Index line offsets on a daemon thread and return that thread."""
+        self._thread = threading.Thread(
+            target=self._build_index, name=f"index:{self.path}", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def _build_index(self) -> None:
+        data = self._map
+        size = self._size
+        pos = 0
+        while pos < size and not self._closed:
+            end = min(pos + _INDEX_BLOCK_SIZE, size)
+            block_offsets = array("Q")
+            found = data.find(b"\n", pos, end)
+            while found >= 0:
+                if found + 1 < size:
+                    block_offsets.append(found + 1)
+                found = data.find(b"\n", found + 1, end)
+            with self._condition:
+                self._offsets.extend(block_offsets)
+                self._condition.notify_all()
+            pos = end
+
+        with self._condition:
+            # Sentinel so line ``n`` always spans offsets[n]:offsets[n + 1]
+            self._offsets.append(size)
+            self._indexed = True
+            self._condition.notify_all()
+
+    def wait_for_line(self, line: int, timeout: Optional[float] = None) -> bool:
+        """Block until ``line`` is indexed or indexing has finished."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._indexed or len(self._offsets) > line + 1,
+                timeout=timeout,
+            )
+
+    def wait_until_indexed(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._indexed, timeout=timeout)
+
+    def chunk_ready(self, chunk: int) -> bool:
+        """Whether ``chunk`` can be read without waiting for the indexer."""
+        if chunk in self.edits or self._map is None:
+            return True
+        return self.wait_for_line((chunk + 1) * self.chunk_lines, timeout=0)
+
+    @property
+    def chunk_count(self) -> int:
+        lines = self.line_count
+        return max(1, -(-lines // self.chunk_lines))
+
+    def _chunk_byte_range(self, chunk: int) -> Tuple[int, int]:
+        first_line = chunk * self.chunk_lines
+        self.wait_for_line(first_line + self.chunk_lines)
+        with self._condition:
+            offsets = self._offsets
+            line_total = len(offsets) - (1 if self._indexed else 0)
+            if first_line >= line_total:
+                return self._size, self._size
+            start = offsets[first_line]
+            last = first_line + self.chunk_lines
+            end = offsets[last] if last < len(offsets) else self._size
+        return start, end
+
+    def read_chunk(self, chunk: int) -> str:
+        """Return the text of ``chunk`` without its final newline."""
+        with self._lock:
+            if chunk in self.edits:
+                return self.edits[chunk][0]
+            if self._map is None:
+                return ""
+            start, end = self._chunk_byte_range(chunk)
+            raw = self._map[start:end]
+        if raw.endswith(b"\n"):
+            raw = raw[:-1]
+        return raw.decode(self.encoding, errors="replace")
+
+    def chunk_ends_with_newline(self, chunk: int) -> bool:
+        with self._lock:
+            if chunk in self.edits:
+                return self.edits[chunk][1]
+            if self._map is None:
+                return False
+            start, end = self._chunk_byte_range(chunk)
+            return end > start and self._map[end - 1 : end] == b"\n"
+
+    def chunk_start_line(self, chunk: int) -> int:
+        """Line number (0-based) where ``chunk`` starts, accounting for edits."""
+        line = chunk * self.chunk_lines
+        with self._lock:
+            for edited, (text, _) in self.edits.items():
+                if edited < chunk:
+                    line += text.count("\n") + 1 - self.chunk_lines
+        return line
+
+    def locate_line(self, line: int) -> Tuple[int, int]:
+        """Map an absolute (0-based) line to ``(chunk, row within chunk)``."""
+        shift = 0
+        with self._lock:
+            edits = dict(self.edits)
+        for edited in sorted(edits):
+            start = edited * self.chunk_lines + shift
+            if line < start:
+                break
+            length = edits[edited][0].count("\n") + 1
+            if line < start + length:
+                return edited, line - start
+            shift += length - self.chunk_lines
+        return divmod(max(0, line - shift), self.chunk_lines)
+
+    def set_chunk_text(self, chunk: int, text: str) -> None:
+        """Record ``text`` as the new content of ``chunk`` if it changed."""
+        with self._lock:
+            if chunk not in self.edits and text == self.read_chunk(chunk):
+                return
+            self.edits[chunk] = (text, self.chunk_ends_with_newline(chunk))
+
+    @property
+    def modified(self) -> bool:
+        return bool(self.edits)
+
+    def save(self, path: Optional[str] = None) -> int:
+        """Stream the buffer (with edits applied) to ``path`` and return its size.
+
+        Untouched chunks are copied straight out of the map. The output goes
+        to a temporary file in the target directory which then atomically
+        replaces the target. The line index of the new file is built while
+        writing it, so chunks can be read straight away. Safe to call from a
+        worker thread.
+        """
+        with self._lock:
+            return self._save(path)
+
+    def _save(self, path: Optional[str]) -> int:
+        if self._file is None:
+            raise OSError(errno.EBADF, "Buffer is closed", self.path)
+        target = path or self.path
+        self.wait_until_indexed()
+        # Write through symlinks instead of replacing them
+        real_target = os.path.realpath(target)
+        directory = os.path.dirname(real_target)
+        fd, temp_path = tempfile.mkstemp(prefix=".ticked-", dir=directory)
+        # Line start offsets of the file being written, as _build_index
+        # would find them
+        offsets = array("Q", [0])
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in range(self.chunk_count):
+                    if chunk in self.edits:
+                        text, newline = self.edits[chunk]
+                        data = text.encode(self.encoding) + (b"\n" if newline else b"")
+                        out.write(data)
+                        found = data.find(b"\n")
+                        while found >= 0:
+                            offsets.append(written + found + 1)
+                            found = data.find(b"\n", found + 1)
+                        written += len(data)
+                        continue
+                    start, end = self._chunk_byte_range(chunk)
+                    # An untouched chunk's lines just move by the size change
+                    # of the chunks before it
+                    first_line = chunk * self.chunk_lines
+                    last = min(first_line + self.chunk_lines, len(self._offsets) - 1)
+                    inner = self._offsets[first_line + 1 : last]
+                    delta = written - start
+                    offsets.extend(inner if not delta else (o + delta for o in inner))
+                    if end > start and self._map[end - 1 : end] == b"\n":
+                        offsets.append(end + delta)
+                    written += end - start
+                    while start < end:
+                        stop = min(start + _COPY_BLOCK_SIZE, end)
+                        out.write(self._map[start:stop])
+                        start = stop
+            if os.path.exists(real_target):
+                os.chmod(temp_path, os.stat(real_target).st_mode & 0o7777)
+            os.replace(temp_path, real_target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        # Only swap the map once the new file is in place, so a failed save
+        # leaves the buffer readable
+        self._close_map()
+        self.path = target
+        self.edits.clear()
+        self._closed = False
+        self._open()
+        if offsets[-1] == written and len(offsets) > 1:
+            # A final newline doesn't start another line
+            offsets.pop()
+        offsets.append(written)
+        with self._condition:
+            self._offsets = offsets
+            self._indexed = True
+            self._condition.notify_all()
+        return self._size
+
+    def _close_map(self) -> None:
+        self._closed = True
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        # Waits for a save in progress rather than unmapping under it
+        with self._lock:
+            self._close_map()
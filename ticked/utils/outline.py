@@ -0,0 +1,183 @@
+"""Symbol outlines of editor buffers, parsed once per buffer version.
+
+Every change to a buffer gives it a new version number. An :class:`Outline`
+is what one parse of a version yields: the classes, functions and methods
+of a Python buffer and the identifiers used in it. Outlines are kept in an
+:class:`OutlineCache` keyed by version, so the outline panel, completion
+and go-to-definition all share one parse rather than each re-reading the
+buffer, and switching back to an unchanged buffer needs no parse at all.
+
+Parsing is meant to run in a worker thread once typing pauses. While the
+buffer doesn't parse (which is most of the time while typing), the symbols
+of the previous outline are kept.
+"""
+
+import ast
+import itertools
+import keyword
+import re
+from collections import OrderedDict
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+# Seconds without changes before a buffer is parsed again
+PARSE_DELAY = 0.3
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+_KEYWORDS = frozenset(keyword.kwlist)
+
+# Buffer versions are unique across buffers, so a version alone identifies
+# the text it was parsed from
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    return next(_versions)
+
+
+class Symbol(NamedTuple):
+    name: str
+    kind: str  # "class", "function" or "method"
+    row: int  # 0-based row and column of the name
+    column: int
+    end_row: int  # last row of the definition's body
+    depth: int
+    parent: Optional[str]  # qualified name of the enclosing definition
+
+    @property
+    def qualname(self) -> str:
+        return f"{self.parent}.{self.name}" if self.parent else self.name
+
+
+def _name_column(lines: Sequence[str], node: ast.AST, name: str) -> int:
+    line = lines[node.lineno - 1] if node.lineno <= len(lines) else ""
+    column = line.find(name, node.col_offset)
+    return column if column >= 0 else node.col_offset
+
+
+def iter_symbols(tree: ast.AST, lines: Sequence[str]) -> Iterator[Symbol]:
+    """Definitions of a parsed module in source order, nested ones included."""
+    stack = [(child, 0, None, False) for child in reversed(tree.body)]
+    while stack:
+        node, depth, parent, in_class = stack.pop()
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "method" if in_class else "function"
+        else:
+            # Definitions inside if/try/with blocks still belong to the outline
+            children = []
+            for field in ("body", "handlers", "orelse", "finalbody"):
+                children.extend(getattr(node, field, None) or [])
+            stack.extend(
+                (child, depth, parent, in_class) for child in reversed(children)
+            )
+            continue
+        symbol = Symbol(
+            node.name,
+            kind,
+            node.lineno - 1,
+            _name_column(lines, node, node.name),
+            (node.end_lineno or node.lineno) - 1,
+            depth,
+            parent,
+        )
+        yield symbol
+        for child in reversed(node.body):
+            stack.append((child, depth + 1, symbol.qualname, kind == "class"))
+
+
+class Outline:
+    """The symbols and identifiers of one buffer version."""
+
+    def __init__(
+        self,
+        version: int,
+        symbols: List[Symbol],
+        identifiers: List[str],
+        parsed: bool = True,
+    ) -> None:
+        self.version = version
+        self.symbols = symbols
+        self.identifiers = identifiers
+        # False when the text didn't parse and the symbols are from an
+        # earlier version
+        self.parsed = parsed
+
+    def scope_at(self, row: int) -> Optional[Symbol]:
+        """The innermost definition containing ``row``."""
+        scope = None
+        # Nested definitions follow the one containing them
+        for symbol in self.symbols:
+            if symbol.row > row:
+                break
+            if symbol.end_row >= row:
+                scope = symbol
+        return scope
+
+    def find_definition(self, name: str, row: int) -> Optional[Symbol]:
+        """The definition of ``name`` that code at ``row`` most likely refers to.
+
+        Definitions in the scopes enclosing ``row`` win, innermost first, then
+        top-level ones, then the first definition anywhere.
+        """
+        candidates = [symbol for symbol in self.symbols if symbol.name == name]
+        if not candidates:
+            return None
+        by_qualname = {symbol.qualname: symbol for symbol in self.symbols}
+        scopes = set()
+        scope = self.scope_at(row)
+        while scope is not None:
+            scopes.add(scope.qualname)
+            scope = by_qualname.get(scope.parent) if scope.parent else None
+        enclosed = [symbol for symbol in candidates if symbol.parent in scopes]
+        if enclosed:
+            return max(enclosed, key=lambda symbol: symbol.depth)
+        top_level = [symbol for symbol in candidates if symbol.parent is None]
+        return (top_level or candidates)[0]
+
+
+def scan_identifiers(text: str) -> List[str]:
+    """Sorted distinct identifiers of ``text``, without keywords or single letters."""
+    return sorted(
+        name
+        for name in set(_IDENTIFIER_RE.findall(text))
+        if len(name) > 1 and name not in _KEYWORDS
+    )
+
+
+def parse_outline(
+    text: str,
+    version: int,
+    python: bool = True,
+    previous: Optional[Outline] = None,
+) -> Outline:
+    """Outline ``text``; symbols come from ``previous`` if it doesn't parse."""
+    identifiers = scan_identifiers(text)
+    if not python:
+        return Outline(version, [], identifiers)
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        symbols = previous.symbols if previous is not None else []
+        return Outline(version, symbols, identifiers, parsed=False)
+    return Outline(version, list(iter_symbols(tree, text.split("\n"))), identifiers)
+
+
+class OutlineCache:
+    """The outlines of the most recent buffer versions."""
+
+    def __init__(self, size: int = 32) -> None:
+        self.size = size
+        self._outlines: "OrderedDict[int, Outline]" = OrderedDict()
+
+    def get(self, version: int) -> Optional[Outline]:
+        outline = self._outlines.get(version)
+        if outline is not None:
+            self._outlines.move_to_end(version)
+        return outline
+
+    def put(self, outline: Outline) -> None:
+        self._outlines[outline.version] = outline
+        self._outlines.move_to_end(outline.version)
+        while len(self._outlines) > self.size:
+            self._outlines.popitem(last=False)
@@ -0,0 +1,174 @@
+"""One shared poller of the Spotify playback state.
+
+Widgets that show what is playing subscribe to the app's
+:class:`PlaybackPoller` instead of polling Spotify themselves. The poller
+runs as a single asyncio task while anything is subscribed, reads
+``current_playback`` through the app's
+:class:`~ticked.utils.async_spotify.AsyncSpotify`, and posts a
+:class:`PlaybackPoller.Changed` message to every subscriber when the track,
+play state or device changes.
+
+How long it waits before the next poll depends on what it last saw: just
+past the end of the current track while playing, longer when paused or
+when nothing is playing. Errors back off exponentially, and a 429 from
+Spotify waits at least as long as its ``Retry-After`` header asks.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from spotipy.exceptions import SpotifyException
+from textual.message import Message
+
+from .async_spotify import AsyncSpotify
+
+Playback = Optional[Dict[str, Any]]
+
+# Seconds between polls
+PLAYING_INTERVAL = 5.0
+PAUSED_INTERVAL = 15.0
+IDLE_INTERVAL = 30.0
+NO_CLIENT_INTERVAL = 5.0
+# Never poll more often than this, even right at the end of a track
+MIN_INTERVAL = 1.0
+# Extra wait after a track ends, for Spotify to move on to the next one
+TRACK_END_SLACK = 0.5
+MIN_BACKOFF = 2.0
+MAX_BACKOFF = 300.0
+# Wait after a playback command before reading its effect
+COMMAND_DELAY = 0.5
+
+
+def playback_key(playback: Playback) -> Optional[Tuple]:
+    """What subscribers are told about when it changes."""
+    if not playback:
+        return None
+    item = playback.get("item") or {}
+    device = playback.get("device") or {}
+    return (
+        item.get("id") or item.get("uri"),
+        bool(playback.get("is_playing")),
+        device.get("id"),
+    )
+
+
+def next_interval(playback: Playback) -> float:
+    """Seconds to wait before polling again after seeing ``playback``."""
+    if not playback or not playback.get("item"):
+        return IDLE_INTERVAL
+    if not playback.get("is_playing"):
+        return PAUSED_INTERVAL
+    duration = playback["item"].get("duration_ms")
+    progress = playback.get("progress_ms")
+    if duration is None or progress is None:
+        return PLAYING_INTERVAL
+    remaining = (duration - progress) / 1000 + TRACK_END_SLACK
+    return max(MIN_INTERVAL, min(PLAYING_INTERVAL, remaining))
+
+
+def retry_delay(error: Exception, failures: int) -> float:
+    """Seconds to wait after the ``failures``-th failed poll in a row."""
+    delay = min(MAX_BACKOFF, MIN_BACKOFF * 2 ** (failures - 1))
+    if isinstance(error, SpotifyException) and error.http_status == 429:
+        try:
+            retry_after = float((error.headers or {}).get("Retry-After", 0))
+        except (TypeError, ValueError):
+            retry_after = 0
+        delay = max(delay, retry_after)
+    return delay
+
+
+class PlaybackPoller:
+    """Polls Spotify's playback state for the widgets subscribed to it."""
+
+    class Changed(Message):
+        """The track, play state or device changed."""
+
+        def __init__(self, playback: Playback) -> None:
+            # None when nothing is playing or Spotify isn't connected
+            self.playback = playback
+            super().__init__()
+
+    def __init__(self, get_client: Callable[[], Optional[AsyncSpotify]]) -> None:
+        self.get_client = get_client
+        # Last playback state seen
+        self.playback: Playback = None
+        self._key: Optional[Tuple] = None
+        self._known = False
+        self._subscribers: List[Any] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, subscriber: Any) -> None:
+        """Post :class:`Changed` messages to ``subscriber`` (e.g. a widget).
+
+        The subscriber gets the last known state straight away, and polling
+        starts if it isn't running.
+        """
+        if subscriber in self._subscribers:
+            return
+        self._subscribers.append(subscriber)
+        if self._known:
+            subscriber.post_message(self.Changed(self.playback))
+        if not self.running:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def unsubscribe(self, subscriber: Any) -> None:
+        """Stop posting to ``subscriber``; polling stops with the last one."""
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def poke(self, delay: float = COMMAND_DELAY) -> None:
+        """Poll again after ``delay`` seconds, e.g. after a playback command.
+
+        Does nothing while backing off after errors.
+        """
+        if not self.running or self._failures:
+            return
+        loop = asyncio.get_running_loop()
+        loop.call_later(delay, self._wake.set)
+
+    def _publish(self, playback: Playback) -> None:
+        self.playback = playback
+        key = playback_key(playback)
+        if self._known and key == self._key:
+            return
+        self._key = key
+        self._known = True
+        for subscriber in list(self._subscribers):
+            subscriber.post_message(self.Changed(playback))
+
+    async def poll(self) -> float:
+        """Poll once and publish any change; seconds until the next poll."""
+        client = self.get_client()
+        if client is None:
+            self._publish(None)
+            return NO_CLIENT_INTERVAL
+        try:
+            playback = await client.current_playback()
+        except Exception as e:
+            self._failures += 1
+            print(f"Error fetching Spotify playback: {e}")
+            return retry_delay(e, self._failures)
+        self._failures = 0
+        self._publish(playback)
+        return next_interval(playback)
+
+    async def _run(self) -> None:
+        wake = self._wake
+        while True:
+            wake.clear()
+            delay = await self.poll()
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
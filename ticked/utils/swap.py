@@ -0,0 +1,236 @@
+"""Crash-recovery swap journals for unsaved editor buffers.
+
+Like vim's swap files, every modified buffer gets a journal in the data
+directory so its changes survive a crash. Instead of dumping the whole
+buffer after each change, a journal starts with one snapshot of the text and
+then appends a small record per edit, so writes stay proportional to what
+was typed. Records are buffered and appended in batches, and once the edits
+outweigh the snapshot the journal is compacted into a new snapshot.
+
+Journals are JSON lines: a header with the file path and the owning process
+id, then ``["s", text]`` snapshots and ``["e", row, column, end_row,
+end_column, text]`` edits (replace the range with the text). A journal whose
+process is no longer running was left behind by a crash and can be
+recovered by replaying it.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from textual.widgets.text_area import Document
+
+from ..core.database.ticked_db import get_data_home
+from .file_io import atomic_write_text
+from .tab_cache import pid_alive
+
+SWAP_SUFFIX = ".swp"
+SWAP_VERSION = 1
+
+# Journals are compacted once their edits take more than this many bytes and
+# more than the last snapshot
+COMPACT_MIN_BYTES = 64 * 1024
+
+# Seconds between an edit and writing it to the journal
+FLUSH_DELAY = 1.0
+
+Location = Tuple[int, int]
+
+
+def get_swap_dir() -> Path:
+    return get_data_home() / "ticked" / "swap"
+
+
+def _record(data: list) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class SwapJournal:
+    """Append-only journal of one buffer's edits."""
+
+    def __init__(self, path: str, directory: Optional[Path] = None) -> None:
+        self.path = os.path.abspath(path)
+        if directory is None:
+            directory = get_swap_dir()
+        self.directory = Path(directory)
+        digest = hashlib.sha1(self.path.encode("utf-8", "surrogatepass")).hexdigest()
+        self.file = self.directory / f"{digest[:16]}-{os.getpid()}{SWAP_SUFFIX}"
+        self._pending: List[str] = []
+        self._snapshot_bytes = 0
+        self._edit_bytes = 0
+        self._started = False
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are records that haven't been written yet."""
+        return bool(self._pending)
+
+    def _header(self) -> str:
+        return _record(
+            [
+                "h",
+                {
+                    "version": SWAP_VERSION,
+                    "path": self.path,
+                    "pid": os.getpid(),
+                    "time": time.time(),
+                },
+            ]
+        )
+
+    def record_snapshot(self, text: str) -> None:
+        """Record that the buffer now holds ``text``, dropping earlier records."""
+        self._pending = [_record(["s", text])]
+        self._snapshot_bytes = len(self._pending[0])
+        self._edit_bytes = 0
+        # Earlier records are superseded: rewrite the journal on the next flush
+        self._started = False
+
+    @property
+    def has_snapshot(self) -> bool:
+        """Whether edits can be recorded (a snapshot was written or is pending)."""
+        return self._started or bool(self._pending)
+
+    def record_edit(self, start: Location, end: Location, text: str) -> None:
+        """Record that the range ``start``-``end`` was replaced with ``text``.
+
+        Must follow a snapshot, as edits are replayed on top of one.
+        """
+        record = _record(["e", start[0], start[1], end[0], end[1], text])
+        self._pending.append(record)
+        self._edit_bytes += len(record)
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self._edit_bytes > max(COMPACT_MIN_BYTES, self._snapshot_bytes)
+
+    def flush(self) -> None:
+        """Write pending records, appending unless a new snapshot was taken."""
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._started:
+            with open(self.file, "a", encoding="utf-8") as file:
+                file.write(data)
+        else:
+            # A fresh journal is written whole so a crash can't leave it
+            # without its header and snapshot
+            atomic_write_text(str(self.file), self._header() + data)
+            self._started = True
+        self._pending = []
+
+    def discard(self) -> None:
+        """Delete the journal, e.g. once the buffer was saved or closed."""
+        self._pending = []
+        self._snapshot_bytes = 0
+        self._edit_bytes = 0
+        self._started = False
+        try:
+            self.file.unlink()
+        except OSError:
+            pass
+
+
+def line_diff(
+    old: Sequence[str], new: Sequence[str]
+) -> Optional[Tuple[Location, Location, str]]:
+    """The single edit turning lines ``old`` into ``new``, or None if equal.
+
+    Returns ``(start, end, text)`` covering the rows between the common
+    leading and trailing lines, for when a buffer is replaced wholesale but
+    only part of it changed.
+    """
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    if prefix == len(old) == len(new):
+        return None
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_end = len(old) - suffix  # exclusive
+    new_end = len(new) - suffix
+    inserted = "\n".join(new[prefix:new_end])
+    if prefix < old_end and prefix < new_end:
+        # Changed lines: replace their content
+        return (prefix, 0), (old_end - 1, len(old[old_end - 1])), inserted
+    if prefix < new_end:
+        # Inserted lines
+        if prefix < len(old):
+            return (prefix, 0), (prefix, 0), inserted + "\n"
+        end_of_text = (prefix - 1, len(old[-1]))
+        return end_of_text, end_of_text, "\n" + inserted
+    # Deleted lines
+    if old_end < len(old):
+        return (prefix, 0), (old_end, 0), ""
+    return (prefix - 1, len(old[prefix - 1])), (old_end - 1, len(old[-1])), ""
+
+
+class RecoveredBuffer(NamedTuple):
+    path: str
+    text: str
+    swap_file: Path
+    modified_at: float
+
+
+def replay(swap_file: Path) -> Optional[RecoveredBuffer]:
+    """Rebuild a buffer from its journal, or None if it has no snapshot.
+
+    A torn record at the end (the process died while writing it) is ignored.
+    """
+    header = None
+    document: Optional[Document] = None
+    with open(swap_file, "r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            kind = record[0]
+            if kind == "h":
+                header = record[1]
+            elif kind == "s":
+                document = Document(record[1])
+            elif kind == "e" and document is not None:
+                _, row, column, end_row, end_column, text = record
+                document.replace_range((row, column), (end_row, end_column), text)
+    if header is None or document is None:
+        return None
+    return RecoveredBuffer(header["path"], document.text, swap_file, header["time"])
+
+
+def find_orphaned_swaps(directory: Optional[Path] = None) -> List[Path]:
+    """Journals whose owning process is no longer running."""
+    directory = Path(directory) if directory is not None else get_swap_dir()
+    orphans = []
+    try:
+        entries = list(directory.iterdir())
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.name.endswith(SWAP_SUFFIX):
+            continue
+        pid = entry.name[: -len(SWAP_SUFFIX)].rpartition("-")[2]
+        if pid.isdigit() and not pid_alive(int(pid)):
+            orphans.append(entry)
+    return sorted(orphans)
+
+
+def recover_swaps(directory: Optional[Path] = None) -> List[RecoveredBuffer]:
+    """Replay every orphaned journal, deleting the ones that can't be replayed."""
+    recovered = []
+    for swap_file in find_orphaned_swaps(directory):
+        try:
+            buffer = replay(swap_file)
+        except (OSError, TypeError, ValueError, KeyError, IndexError):
+            buffer = None
+        if buffer is None:
+            swap_file.unlink(missing_ok=True)
+        else:
+            recovered.append(buffer)
+    return recovered
@@ -0,0 +1,356 @@
+"""Project-wide index of Python definitions, for go-to-definition across files.
+
+:class:`SymbolIndex` keeps the classes, functions and methods of every
+Python file under a root directory in an SQLite database in the cache
+directory, with the mtime and size each file had when it was parsed. An
+update only parses files that are new or changed since, so after the first
+build opening a project costs a ``stat`` per file. Large batches of files
+are parsed in a pool of processes, as parsing is CPU bound; the results are
+written in a single transaction.
+
+Lookups by name hit an index and take well under a millisecond. The
+database is in WAL mode so they don't wait for an update being written.
+"""
+
+import ast
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .outline import iter_symbols
+from .tab_cache import get_cache_home
+
+INDEX_VERSION = 1
+
+# Files bigger than this are most likely generated and aren't indexed
+MAX_FILE_SIZE = 2 * 1024 * 1024
+
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+# Files handed to a worker process at a time
+_PARSE_BATCH = 32
+
+# Third-party code installed inside the tree isn't part of the project
+SKIP_DIRECTORIES = {"site-packages", "dist-packages"}
+
+# (name, kind, row, column, parent) of a definition
+SymbolRow = Tuple[str, str, int, int, Optional[str]]
+
+
+class IndexedSymbol(NamedTuple):
+    path: str  # absolute
+    name: str
+    kind: str
+    row: int
+    column: int
+    parent: Optional[str]
+
+    @property
+    def qualname(self) -> str:
+        return f"{self.parent}.{self.name}" if self.parent else self.name
+
+
+def default_index_path(root: str) -> Path:
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return get_cache_home() / "ticked" / "symbols" / f"{digest}.db"
+
+
+def is_indexed_file(relative: str) -> bool:
+    """Whether a path relative to the root is a Python file worth indexing."""
+    if not relative.endswith((".py", ".pyi")):
+        return False
+    return not SKIP_DIRECTORIES.intersection(relative.split("/"))
+
+
+def parse_symbols(path: str) -> Optional[List[SymbolRow]]:
+    """Definitions of a Python file, or None if it can't be read or parsed."""
+    try:
+        with open(path, "rb") as file:
+            source = file.read()
+        text = source.decode("utf-8")
+        tree = ast.parse(text)
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError, RecursionError):
+        return None
+    return [
+        (symbol.name, symbol.kind, symbol.row, symbol.column, symbol.parent)
+        for symbol in iter_symbols(tree, text.split("\n"))
+    ]
+
+
+def _parse_batch(paths: List[str]) -> List[Optional[List[SymbolRow]]]:
+    # Runs in a worker process
+    return [parse_symbols(path) for path in paths]
+
+
+class SymbolIndex:
+    """Definitions in the Python files under ``root``, persisted in SQLite."""
+
+    def __init__(self, root: str, db_path: Optional[Path] = None) -> None:
+        self.root = os.path.abspath(root)
+        self.db_path = Path(db_path) if db_path else default_index_path(root)
+        # Serializes updates from different worker threads
+        self._write_lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != INDEX_VERSION:
+                conn.execute("DROP TABLE IF EXISTS symbols")
+                conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS symbols (
+                    file_id INTEGER NOT NULL
+                        REFERENCES files(id) ON DELETE CASCADE,
+                    name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    col INTEGER NOT NULL,
+                    parent TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id)"
+            )
+            conn.execute(f"PRAGMA user_version={INDEX_VERSION}")
+
+    def _relative(self, path: str) -> Optional[str]:
+        path = os.path.abspath(path)
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return None
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _indexed(self, conn: sqlite3.Connection, prefix: str = "") -> Dict[str, tuple]:
+        if prefix:
+            rows = conn.execute(
+                "SELECT path, mtime_ns, size FROM files WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+        else:
+            rows = conn.execute("SELECT path, mtime_ns, size FROM files")
+        return {path: (mtime, size) for path, mtime, size in rows}
+
+    def update(
+        self,
+        paths: Iterable[str],
+        cancelled: Callable[[], bool] = lambda: False,
+        workers: Optional[int] = None,
+    ) -> int:
+        """Bring the index in line with the full list of files under the root.
+
+        ``paths`` are relative to the root, like :class:`FileIndex` lists
+        them; files not among them are dropped from the index. Returns the
+        number of files that were (re)parsed or dropped.
+        """
+        wanted = [path for path in paths if is_indexed_file(path)]
+        with self._connect() as conn:
+            indexed = self._indexed(conn)
+        return self._apply(wanted, indexed, cancelled, workers)
+
+    def update_files(self, paths: Iterable[str]) -> int:
+        """Re-index individual files, e.g. after a save; missing ones are dropped."""
+        wanted = []
+        relatives = []
+        for path in paths:
+            relative = self._relative(path)
+            if relative is None or not is_indexed_file(relative):
+                continue
+            relatives.append(relative)
+            if os.path.isfile(path):
+                wanted.append(relative)
+        if not relatives:
+            return 0
+        with self._connect() as conn:
+            indexed = {}
+            for relative in relatives:
+                row = conn.execute(
+                    "SELECT mtime_ns, size FROM files WHERE path = ?", (relative,)
+                ).fetchone()
+                if row is not None:
+                    indexed[relative] = row
+        return self._apply(wanted, indexed, lambda: False, 1)
+
+    def update_directories(self, directories: Iterable[str]) -> int:
+        """Re-index directories whose entries changed (file watcher events).
+
+        Files directly in each directory are checked; indexed files anywhere
+        below it that are gone (e.g. a removed subdirectory) are dropped.
+        """
+        changed = 0
+        for directory in directories:
+            relative = self._relative(directory)
+            if relative is None:
+                continue
+            prefix = "" if relative == "." else relative + "/"
+            wanted = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(".") or not entry.is_file():
+                            continue
+                        path = prefix + entry.name
+                        if is_indexed_file(path):
+                            wanted.append(path)
+            except OSError:
+                pass
+            with self._connect() as conn:
+                indexed = self._indexed(conn, prefix)
+            # Files in subdirectories are only checked for existence
+            for path in list(indexed):
+                if "/" in path[len(prefix) :] and os.path.exists(
+                    os.path.join(self.root, path)
+                ):
+                    del indexed[path]
+            changed += self._apply(wanted, indexed, lambda: False, 1)
+        return changed
+
+    def _apply(
+        self,
+        wanted: List[str],
+        indexed: Dict[str, tuple],
+        cancelled: Callable[[], bool],
+        workers: Optional[int],
+    ) -> int:
+        stale = []
+        for relative in wanted:
+            try:
+                stat = os.stat(os.path.join(self.root, relative))
+            except OSError:
+                continue
+            if stat.st_size > MAX_FILE_SIZE:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if indexed.get(relative) != signature:
+                stale.append((relative, signature))
+            if cancelled():
+                return 0
+        removed = set(indexed).difference(wanted)
+        if not stale and not removed:
+            return 0
+
+        parsed = self._parse(
+            [os.path.join(self.root, relative) for relative, _ in stale],
+            cancelled,
+            workers,
+        )
+        if parsed is None:
+            return 0
+
+        with self._write_lock, self._connect() as conn:
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executemany(
+                "DELETE FROM files WHERE path = ?",
+                [(path,) for path in removed],
+            )
+            for (relative, (mtime, size)), symbols in zip(stale, parsed):
+                conn.execute("DELETE FROM files WHERE path = ?", (relative,))
+                cursor = conn.execute(
+                    "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (relative, mtime, size),
+                )
+                if symbols:
+                    file_id = cursor.lastrowid
+                    conn.executemany(
+                        "INSERT INTO symbols (file_id, name, kind, row, col, parent)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        [(file_id, *symbol) for symbol in symbols],
+                    )
+        return len(stale) + len(removed)
+
+    @staticmethod
+    def _parse(
+        paths: List[str],
+        cancelled: Callable[[], bool],
+        workers: Optional[int],
+    ) -> Optional[List[Optional[List[SymbolRow]]]]:
+        """Parse files, in a process pool when there are many; None if cancelled."""
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(paths) < PARALLEL_THRESHOLD:
+            results = []
+            for path in paths:
+                if cancelled():
+                    return None
+                results.append(parse_symbols(path))
+            return results
+
+        batches = [
+            paths[start : start + _PARSE_BATCH]
+            for start in range(0, len(paths), _PARSE_BATCH)
+        ]
+        results = []
+        # Spawned rather than forked: forking a process with running threads
+        # (the UI, file watchers) can deadlock the child
+        with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(_parse_batch, batch) for batch in batches]
+            for future in futures:
+                if cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                results.extend(future.result())
+        return results
+
+    def find(self, name: str, limit: int = 50) -> List[IndexedSymbol]:
+        """Definitions named ``name``, classes and functions before methods."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT files.path, symbols.name, kind, row, col, parent
+                FROM symbols JOIN files ON files.id = symbols.file_id
+                WHERE symbols.name = ?
+                ORDER BY parent IS NOT NULL, files.path, row
+                LIMIT ?
+                """,
+                (name, limit),
+            ).fetchall()
+        return [
+            IndexedSymbol(os.path.join(self.root, path), *rest)
+            for path, *rest in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
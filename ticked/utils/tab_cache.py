@@ -0,0 +1,143 @@
+"""Spill inactive editor buffers to disk to keep tab memory under a budget.
+
+Each open tab holds its text plus full-text undo and redo snapshots, so a
+few dozen tabs can use a lot of memory. :class:`TabCache` tracks when tabs
+were last active and, once the tabs held in memory exceed the budget,
+writes the least recently used inactive ones to a per-process cache
+directory. A spilled tab reloads itself the next time its content is used.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_TAB_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+def get_cache_home() -> Path:
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return Path(xdg_cache_home)
+    return Path.home() / ".cache"
+
+
+def format_size(size: int) -> str:
+    """Human readable size, e.g. ``"512B"`` or ``"1.5M"``."""
+    if size < 1024:
+        return f"{size}B"
+    for unit in "KMG":
+        size /= 1024
+        if size < 1024 or unit == "G":
+            return f"{size:.1f}{unit}"
+
+
+def buffer_memory(content: str, undo_stack: list, redo_stack: list) -> int:
+    """Approximate bytes held by a buffer's text and undo/redo snapshots."""
+    size = sys.getsizeof(content)
+    for stack in (undo_stack, redo_stack):
+        size += sum(sys.getsizeof(state["text"]) for state in stack)
+    return size
+
+
+def write_buffer(path: Path, content: str, undo_stack: list, redo_stack: list) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"content": content, "undo": undo_stack, "redo": redo_stack}, file)
+
+
+def read_buffer(path: Path) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    def restore(state: Dict[str, Any]) -> Dict[str, Any]:
+        # JSON turns the location tuples into lists
+        return {
+            "text": state["text"],
+            "cursor": tuple(state["cursor"]),
+            "scroll": tuple(state["scroll"]),
+        }
+
+    return (
+        data["content"],
+        [restore(state) for state in data["undo"]],
+        [restore(state) for state in data["redo"]],
+    )
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class TabCache:
+    """LRU memory budget for editor tabs.
+
+    Tabs are expected to provide ``last_active``, ``spilled``,
+    ``memory_usage()`` and ``spill(path)``.
+    """
+
+    def __init__(
+        self, budget: int = DEFAULT_TAB_MEMORY_BUDGET, root: Optional[Path] = None
+    ) -> None:
+        self.budget = budget
+        if root is None:
+            root = get_cache_home() / "ticked" / "tabs"
+        self.root = Path(root)
+        self.directory = self.root / str(os.getpid())
+        self.resident_memory = 0
+
+    def _ensure_directory(self) -> None:
+        if self.directory.exists():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Clean up after instances that exited without removing their cache
+        for entry in self.root.iterdir():
+            if (
+                entry.name.isdigit()
+                and entry != self.directory
+                and not pid_alive(int(entry.name))
+            ):
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def touch(self, tab) -> None:
+        tab.last_active = time.monotonic()
+
+    def enforce(self, tabs: Sequence, active) -> List:
+        """Spill least recently used inactive tabs until within budget.
+
+        Returns the tabs that were spilled.
+        """
+        resident = [tab for tab in tabs if not tab.spilled]
+        usage = {id(tab): tab.memory_usage() for tab in resident}
+        total = sum(usage.values())
+        spilled = []
+        if total > self.budget:
+            candidates = sorted(
+                (tab for tab in resident if tab is not active),
+                key=lambda tab: tab.last_active,
+            )
+            for tab in candidates:
+                if total <= self.budget:
+                    break
+                try:
+                    self._ensure_directory()
+                    tab.spill(self.directory / f"{uuid.uuid4().hex}.json")
+                except OSError:
+                    # Keep the tab in memory if the cache can't be written
+                    continue
+                total -= usage[id(tab)]
+                spilled.append(tab)
+        self.resident_memory = total
+        return spilled
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
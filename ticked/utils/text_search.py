@@ -0,0 +1,308 @@
+"""Project-wide text search ("find in files").
+
+Files under the root are walked in the calling thread, honouring
+``.gitignore`` and skipping hidden entries like the directory tree does,
+and searched in batches on a worker pool. Binary files are skipped with the
+same signature sniffing the editor uses before opening a file. Matching
+lines are handed to a callback batch by batch as they are found, so a UI
+can show results while the search is still running.
+
+The default pool uses threads: reading overlaps well, and a batch of small
+files is decoded and scanned by C code. :func:`search_batch` is a plain
+top-level function, so a ``ProcessPoolExecutor`` can be passed instead when
+the scan itself is the bottleneck (e.g. complex regexes on many cores).
+"""
+
+import os
+import re
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .file_io import SNIFF_SIZE, is_binary_chunk
+from .fuzzy import is_case_sensitive
+from .ignore import IgnoreRules
+
+# Files bigger than this are skipped (they'd have to be read whole)
+MAX_FILE_SIZE = 32 * 1024 * 1024
+
+# Stop once this many matching lines were found
+MAX_MATCHES = 10_000
+
+# Matched lines are trimmed to this many characters for display
+MAX_PREVIEW_LENGTH = 200
+
+# Files are searched in batches of roughly this many bytes (or files)
+BATCH_BYTES = 1024 * 1024
+BATCH_FILES = 64
+
+SKIP_DIRECTORIES = {"node_modules", "__pycache__"}
+
+
+class SearchMatch(NamedTuple):
+    path: str
+    line: int  # 0-based
+    column: int
+    length: int
+    preview: str
+
+
+class SearchStats(NamedTuple):
+    files: int
+    bytes: int
+    matches: int
+    seconds: float
+    truncated: bool
+
+    @property
+    def throughput(self) -> float:
+        """Searched megabytes per second."""
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes / (1024 * 1024) / self.seconds
+
+
+def compile_query(query: str, regex: bool = False) -> "re.Pattern[str]":
+    """Compile a search query, matching case insensitively unless it has capitals.
+
+    Raises ``re.error`` for an invalid regular expression.
+    """
+    flags = re.MULTILINE
+    if not is_case_sensitive(query):
+        flags |= re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def iter_files(
+    root: str, cancelled: Callable[[], bool] = lambda: False
+) -> Iterator[Tuple[str, int]]:
+    """Yield ``(path, size)`` for every searchable file under ``root``."""
+    root = os.path.abspath(root)
+    stack: List[Tuple[str, Optional[IgnoreRules]]] = [
+        (root, IgnoreRules.for_root(root))
+    ]
+    while stack:
+        if cancelled():
+            return
+        directory, parent_rules = stack.pop()
+        rules = (
+            parent_rules
+            if directory == root
+            else IgnoreRules.for_directory(directory, parent_rules)
+        )
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if rules is not None and rules.is_ignored(entry.path, is_dir):
+                            continue
+                        if is_dir:
+                            if entry.name not in SKIP_DIRECTORIES:
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            size = entry.stat().st_size
+                            if 0 < size <= MAX_FILE_SIZE:
+                                yield entry.path, size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        for path in sorted(subdirs, reverse=True):
+            stack.append((path, rules))
+
+
+def search_text(
+    path: str, text: str, regex: "re.Pattern[str]", limit: int
+) -> List[SearchMatch]:
+    """Matching lines of ``text``, at most one match per line."""
+    matches: List[SearchMatch] = []
+    search = regex.search
+    pos = 0
+    line = 0
+    line_start = 0
+    length = len(text)
+    while pos < length and len(matches) < limit:
+        match = search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        newlines = text.count("\n", line_start, start)
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        if line_end < 0:
+            line_end = length
+        preview = text[line_start:line_end][:MAX_PREVIEW_LENGTH].rstrip("\r")
+        matches.append(
+            SearchMatch(path, line, start - line_start, match.end() - start, preview)
+        )
+        # One result per line: continue on the next one
+        pos = line_end + 1
+        line += 1
+        line_start = pos
+    return matches
+
+
+def read_searchable(path: str) -> Optional[bytes]:
+    """Contents of ``path``, or None if it is binary, too big or unreadable."""
+    try:
+        # Unbuffered: readall() sizes its buffer from fstat, saving a copy
+        with open(path, "rb", buffering=0) as file:
+            head = file.read(SNIFF_SIZE)
+            if is_binary_chunk(head):
+                return None
+            data = head + file.readall()
+    except OSError:
+        return None
+    if len(data) > MAX_FILE_SIZE:
+        return None
+    return data
+
+
+def literal_needle(regex: "re.Pattern[str]") -> Optional[bytes]:
+    """Bytes to prefilter files with when ``regex`` is a plain ASCII literal.
+
+    The needle is lowercased for case insensitive patterns, so it has to be
+    looked for in lowercased data.
+    """
+    text = re.sub(r"\\(.)", r"\1", regex.pattern, flags=re.DOTALL)
+    if not text or not text.isascii() or re.escape(text) != regex.pattern:
+        return None
+    if regex.flags & re.IGNORECASE:
+        text = text.lower()
+    return text.encode("ascii")
+
+
+def search_batch(
+    paths: List[str], pattern: str, flags: int, limit: int
+) -> Tuple[List[SearchMatch], int, int]:
+    """Search a batch of files, returning ``(matches, files, bytes)`` searched.
+
+    Takes the pattern source rather than a compiled regex so it can run in a
+    process pool.
+    """
+    regex = re.compile(pattern, flags)
+    needle = literal_needle(regex)
+    fold = bool(flags & re.IGNORECASE)
+    matches: List[SearchMatch] = []
+    files = 0
+    size = 0
+    for path in paths:
+        if len(matches) >= limit:
+            break
+        data = read_searchable(path)
+        if data is None:
+            continue
+        if needle is not None and needle not in (data.lower() if fold else data):
+            # Most files don't match; skip decoding and the regex for them
+            files += 1
+            size += len(data)
+            continue
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+        files += 1
+        size += len(data)
+        matches.extend(search_text(path, text, regex, limit - len(matches)))
+    return matches, files, size
+
+
+def _batches(files: Iterator[Tuple[str, int]]) -> Iterator[List[str]]:
+    batch: List[str] = []
+    batch_bytes = 0
+    for path, size in files:
+        batch.append(path)
+        batch_bytes += size
+        if batch_bytes >= BATCH_BYTES or len(batch) >= BATCH_FILES:
+            yield batch
+            batch = []
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+def search_tree(
+    root: str,
+    regex: "re.Pattern[str]",
+    on_matches: Callable[[List[SearchMatch]], None],
+    cancelled: Callable[[], bool] = lambda: False,
+    max_matches: int = MAX_MATCHES,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> SearchStats:
+    """Search every file under ``root`` for ``regex``.
+
+    ``on_matches`` is called from this thread with each non-empty batch of
+    matches, in completion order. Passing an ``executor`` (e.g. a process
+    pool) overrides the default thread pool; ``workers`` should then be its
+    size, as it bounds how many batches are queued at once.
+    """
+    started = time.perf_counter()
+    searched_files = 0
+    searched_bytes = 0
+    found = 0
+    truncated = False
+    workers = workers or min(8, (os.cpu_count() or 1) + 2)
+    own_executor = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="text-search"
+        )
+    max_pending = 2 * workers
+    pending: "set[Future]" = set()
+    batches = _batches(iter_files(root, cancelled))
+
+    def collect(done: "set[Future]") -> None:
+        nonlocal found, truncated, searched_files, searched_bytes
+        for future in done:
+            matches, files, size = future.result()
+            searched_files += files
+            searched_bytes += size
+            if not matches or truncated:
+                continue
+            matches = matches[: max_matches - found]
+            found += len(matches)
+            if found >= max_matches:
+                truncated = True
+            on_matches(matches)
+
+    try:
+        for batch in batches:
+            if cancelled() or truncated:
+                break
+            pending.add(
+                executor.submit(
+                    search_batch, batch, regex.pattern, regex.flags, max_matches
+                )
+            )
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        while pending and not cancelled() and not truncated:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return SearchStats(
+        searched_files,
+        searched_bytes,
+        found,
+        time.perf_counter() - started,
+        truncated,
+    )
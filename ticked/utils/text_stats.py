@@ -0,0 +1,39 @@
+"""Word and character counts of an editor buffer, kept up to date from edits.
+
+Counting a large buffer on every keystroke is wasteful when an edit only
+touches a line or two. :class:`TextStats` counts the whole text once and
+then adjusts the counts by the difference an edit makes: characters from
+the removed and inserted text, words from the lines the edit touched before
+and after it. Words never span lines, so counting only those lines is exact.
+"""
+
+from typing import Iterable
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def count_line_words(lines: Iterable[str]) -> int:
+    return sum(len(line.split()) for line in lines)
+
+
+class TextStats:
+    def __init__(self, text: str = "") -> None:
+        self.reset(text)
+
+    def reset(self, text: str) -> None:
+        """Count ``text`` from scratch."""
+        self.words = count_words(text)
+        self.chars = len(text)
+
+    def apply_edit(
+        self, removed: str, inserted: str, old_line_words: int, new_line_words: int
+    ) -> None:
+        """Account for an edit replacing ``removed`` with ``inserted``.
+
+        ``old_line_words`` and ``new_line_words`` are the word counts of the
+        lines the edit touched, before and after it.
+        """
+        self.chars += len(inserted) - len(removed)
+        self.words += new_line_words - old_line_words
@@ -0,0 +1,322 @@
+"""Regex search and ``:substitute`` for the editor's vim layer.
+
+Patterns use Python regex syntax with a few vim additions: ``\\<`` and
+``\\>`` match word boundaries and ``\\c``/``\\C`` force case insensitive or
+sensitive matching. Otherwise matching uses smart case, like find in files.
+
+Searches run one compiled regex over the whole buffer and keep the match
+offsets of the last searched text, so repeated ``n``/``N`` only bisect. A
+substitution builds the new text for its whole range in a single ``subn``
+call so the editor can apply it as one edit.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .fuzzy import is_case_sensitive
+
+Location = Tuple[int, int]
+
+
+class LineIndex:
+    """Start offsets of the lines of a text, for offset <-> location mapping."""
+
+    def __init__(self, lines: Sequence[str]) -> None:
+        # Each line is followed by a one character newline
+        self.starts = [0]
+        self.starts.extend(accumulate(len(line) + 1 for line in lines))
+        self.starts.pop()
+
+    def offset(self, location: Location) -> int:
+        row, column = location
+        return self.starts[row] + column
+
+    def location(self, offset: int) -> Location:
+        row = bisect_right(self.starts, offset) - 1
+        return row, offset - self.starts[row]
+
+
+def compile_pattern(pattern: str) -> "re.Pattern[str]":
+    """Compile a vim search pattern; raises ``re.error`` if it is invalid."""
+    flags = re.MULTILINE
+    if "\\c" in pattern:
+        flags |= re.IGNORECASE
+    elif "\\C" not in pattern and not is_case_sensitive(pattern):
+        flags |= re.IGNORECASE
+    pattern = re.sub(r"\\[cC]", "", pattern)
+    pattern = re.sub(r"\\[<>]", r"\\b", pattern)
+    return re.compile(pattern, flags)
+
+
+def compile_replacement(replacement: str) -> Callable[["re.Match[str]"], str]:
+    """Build the expansion of a vim replacement string for a match.
+
+    Supports ``&`` and ``\\0`` for the whole match, ``\\1``-``\\9`` for
+    groups and ``\\r``/``\\n``/``\\t``; any other escaped character is taken
+    literally.
+    """
+    pieces: List[object] = []
+    literal: List[str] = []
+    i = 0
+    while i < len(replacement):
+        char = replacement[i]
+        if char == "\\" and i + 1 < len(replacement):
+            i += 1
+            char = replacement[i]
+            if char.isdigit():
+                pieces.append("".join(literal))
+                literal = []
+                pieces.append(int(char))
+            else:
+                literal.append({"r": "\n", "n": "\n", "t": "\t"}.get(char, char))
+        elif char == "&":
+            pieces.append("".join(literal))
+            literal = []
+            pieces.append(0)
+        else:
+            literal.append(char)
+        i += 1
+    pieces.append("".join(literal))
+
+    if len(pieces) == 1:
+        text = pieces[0]
+        return lambda match: text
+
+    def expand(match: "re.Match[str]") -> str:
+        return "".join(
+            piece if isinstance(piece, str) else (match.group(piece) or "")
+            for piece in pieces
+        )
+
+    return expand
+
+
+class SearchResult(NamedTuple):
+    location: Location
+    wrapped: bool
+    index: int  # 1-based index of the match
+    total: int
+
+
+class BufferSearch:
+    """A compiled search pattern and the match offsets of one buffer text."""
+
+    def __init__(self, pattern: str, backward: bool = False) -> None:
+        self.pattern = pattern
+        self.regex = compile_pattern(pattern)
+        self.backward = backward
+        self._text: Optional[str] = None
+        self._starts: List[int] = []
+
+    def match_starts(self, text: str) -> List[int]:
+        # Equal texts compare with a memcmp, far cheaper than searching again
+        if text is not self._text and text != self._text:
+            self._starts = [match.start() for match in self.regex.finditer(text)]
+            self._text = text
+        return self._starts
+
+    def find(
+        self,
+        lines: Sequence[str],
+        cursor: Location,
+        reverse: bool = False,
+        count: int = 1,
+    ) -> Optional[SearchResult]:
+        """Find the ``count``th match after ``cursor``, wrapping around the end.
+
+        Searches towards the start for ``?`` patterns; ``reverse`` flips the
+        direction, as ``N`` does.
+        """
+        text = "\n".join(lines)
+        starts = self.match_starts(text)
+        if not starts:
+            return None
+        index = LineIndex(lines)
+        offset = index.offset(cursor)
+        if self.backward != reverse:
+            position = bisect_left(starts, offset) - count
+            wrapped = position < 0
+        else:
+            position = bisect_right(starts, offset) + count - 1
+            wrapped = position >= len(starts)
+        position %= len(starts)
+        return SearchResult(
+            index.location(starts[position]), wrapped, position + 1, len(starts)
+        )
+
+    def line_spans(self, line: str) -> List[Tuple[int, int]]:
+        """Non-empty match spans within a single line, for highlighting."""
+        return [
+            match.span()
+            for match in self.regex.finditer(line)
+            if match.end() > match.start()
+        ]
+
+
+class Substitute(NamedTuple):
+    range: str
+    pattern: str
+    replacement: str
+    flags: str
+
+
+_SUBSTITUTE_RE = re.compile(r"^(?P<range>[^a-zA-Z]*)s(?:ubstitute)?(?=[^\w\s\\\"|])")
+
+
+def _split_delimited(text: str, delimiter: str) -> List[str]:
+    """Split on unescaped ``delimiter``; ``\\<delimiter>`` becomes the delimiter."""
+    parts = []
+    current: List[str] = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            if text[i + 1] == delimiter:
+                current.append(delimiter)
+            else:
+                current.append(text[i : i + 2])
+            i += 2
+            continue
+        if char == delimiter:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    parts.append("".join(current))
+    return parts
+
+
+def parse_substitute(command: str) -> Optional[Substitute]:
+    """Parse ``[range]s/pattern/replacement/[flags]``, or None if it isn't one."""
+    match = _SUBSTITUTE_RE.match(command)
+    if match is None:
+        return None
+    rest = command[match.end() :]
+    parts = _split_delimited(rest[1:], rest[0])
+    pattern = parts[0]
+    replacement = parts[1] if len(parts) > 1 else ""
+    flags = parts[2] if len(parts) > 2 else ""
+    return Substitute(match.group("range").strip(), pattern, replacement, flags)
+
+
+def _parse_address(
+    address: str, current: int, last: int, marks: Optional[Tuple[int, int]]
+) -> int:
+    match = re.fullmatch(r"(\d+|\.|\$|'<|'>)?((?:[+-]\d*)*)", address.strip())
+    if match is None:
+        raise ValueError(f"Invalid range: {address}")
+    base, offsets = match.groups()
+    if base is None or base == ".":
+        line = current
+    elif base == "$":
+        line = last
+    elif base in ("'<", "'>"):
+        if marks is None:
+            raise ValueError("No visual selection")
+        line = marks[0] if base == "'<" else marks[1]
+    else:
+        line = int(base) - 1
+    for sign, amount in re.findall(r"([+-])(\d*)", offsets):
+        step = int(amount) if amount else 1
+        line += step if sign == "+" else -step
+    return line
+
+
+def parse_range(
+    spec: str,
+    current: int,
+    last: int,
+    marks: Optional[Tuple[int, int]] = None,
+) -> Tuple[int, int]:
+    """0-based inclusive ``(first, last)`` rows of an ex range like ``%`` or ``.,$``.
+
+    Raises ``ValueError`` for malformed or out of range addresses.
+    """
+    spec = spec.strip()
+    if not spec:
+        return current, current
+    if spec == "%":
+        return 0, last
+    addresses = spec.split(",")
+    if len(addresses) > 2:
+        raise ValueError(f"Invalid range: {spec}")
+    first = _parse_address(addresses[0], current, last, marks)
+    second = (
+        _parse_address(addresses[1], current, last, marks)
+        if len(addresses) == 2
+        else first
+    )
+    if first > second:
+        first, second = second, first
+    if first < 0 or second > last:
+        raise ValueError("Invalid range")
+    return first, second
+
+
+class SubstituteResult(NamedTuple):
+    text: str  # new text of rows first_row-last_row
+    first_row: int  # first and last row that changed, inclusive
+    last_row: int
+    count: int
+    lines: int
+    cursor_row: int  # row of the last substitution, in the substituted text
+
+
+def substitute(
+    lines: Sequence[str],
+    first: int,
+    last: int,
+    regex: "re.Pattern[str]",
+    replacement: str,
+    replace_all: bool = False,
+) -> Optional[SubstituteResult]:
+    """Substitute in rows ``first``-``last``; None when nothing matched.
+
+    Without ``replace_all`` only the first match on each line is replaced,
+    like vim without the ``g`` flag. The result only spans the rows from the
+    first to the last substitution, so unchanged lines at the edges of the
+    range don't have to be replaced in the editor.
+    """
+    segment = "\n".join(lines[first : last + 1])
+    expand = compile_replacement(replacement)
+    state = {"line_end": -1, "lines": 0, "count": 0, "delta": 0}
+    spans = [0, 0, 0]  # first match start, last match start and end
+
+    def replace(match: "re.Match[str]") -> str:
+        start, end = match.span()
+        if start <= state["line_end"]:
+            if not replace_all:
+                return match.group(0)
+        else:
+            state["lines"] += 1
+            line_end = segment.find("\n", start)
+            state["line_end"] = len(segment) if line_end < 0 else line_end
+        if not state["count"]:
+            spans[0] = start
+        state["count"] += 1
+        expansion = expand(match)
+        # Where this match starts in the substituted text
+        spans[1] = start + state["delta"]
+        spans[2] = end
+        state["delta"] += len(expansion) - (end - start)
+        return expansion
+
+    text, _ = regex.subn(replace, segment)
+    if not state["count"]:
+        return None
+    first_start, last_start, last_end = spans
+    start = segment.rfind("\n", 0, first_start) + 1
+    end = segment.find("\n", last_end)
+    if end < 0:
+        end = len(segment)
+    return SubstituteResult(
+        text[start : end + state["delta"]],
+        first + segment.count("\n", 0, first_start),
+        first + segment.count("\n", 0, last_end),
+        state["count"],
+        state["lines"],
+        first + text.count("\n", 0, last_start),
+    )